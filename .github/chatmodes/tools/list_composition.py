@@ -1,12 +1,25 @@
 import argparse
+import codecs
+import fnmatch
 import json
+import os
+import re
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-WORKSPACE_ROOT = Path(__file__).parent[3]
+# tools -> chatmodes -> .github -> raiz do workspace
+WORKSPACE_ROOT = Path(__file__).resolve().parents[3]
 
 MAX_BYTES = 2_000_000  # 2MB
 
+MAX_TOTAL_BYTES = 50_000_000  # 50MB de conteúdo somado por listagem
+
+SNIFF_BYTES = 4096
+
+ALWAYS_IGNORED = {".git"}
+
 
 def secure_path(rel: str) -> Path:
     """
@@ -21,8 +34,10 @@ def secure_path(rel: str) -> Path:
 
     Comportamento e efeitos colaterais:
         - Concatena WORKSPACE_ROOT com o argumento rel e chama .resolve() para obter o caminho absoluto.
-        - Se o caminho resolvido não começar com WORKSPACE_ROOT, grava uma mensagem de erro em sys.stderr
+        - Se o caminho resolvido não estiver dentro de WORKSPACE_ROOT, grava uma mensagem de erro em sys.stderr
           e encerra o processo com sys.exit(1) (isto previne travessias de diretório fora do workspace).
+          A comparação é feita por componentes do caminho, então '/workspace2' não é aceito como
+          parte de '/workspace'.
         - Depende de variáveis/globals do módulo (por exemplo WORKSPACE_ROOT) e do módulo sys.
 
     Erros:
@@ -35,18 +50,32 @@ def secure_path(rel: str) -> Path:
         PosixPath('/caminho/absoluto/para/workspace/subdir/arquivo.txt')
     """
     p = (WORKSPACE_ROOT / rel).resolve()
-    if not str(p).startswith(str(WORKSPACE_ROOT)):
+    if p != WORKSPACE_ROOT and WORKSPACE_ROOT not in p.parents:
         print(f"Error: Path {rel} is outside the workspace root.", file=sys.stderr)
         sys.exit(1)
     return p
 
 
+def sniff_utf8(chunk: bytes) -> bool:
+    """
+    Retorna True se `chunk` (início de um arquivo) for UTF-8 válido.
+
+    Usa um decoder incremental sem finalizar, para que um caractere multibyte cortado no
+    limite do chunk não seja tratado como erro.
+    """
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(chunk, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
 def is_text(p: Path) -> bool:
     """
     Determina se o ficheiro apontado por `p` provavelmente é texto codificado em UTF-8.
 
-    Abre o caminho `p` em modo binário, lê até 4096 bytes e tenta decodificar esses bytes
-    como UTF-8. Se a decodificação for bem-sucedida, retorna True; caso contrário (incluindo
+    Abre o caminho `p` em modo binário, lê até SNIFF_BYTES bytes e verifica com sniff_utf8()
+    se esses bytes são UTF-8. Se forem, retorna True; caso contrário (incluindo
     quaisquer erros de I/O), retorna False.
 
     Parâmetros
@@ -68,78 +97,308 @@ def is_text(p: Path) -> bool:
     """
     try:
         with p.open("rb") as f:
-            chunk = f.read(4096)
-        chunk.decode("utf-8")
-        return True
-    except:
+            return sniff_utf8(f.read(SNIFF_BYTES))
+    except OSError:
+        return False
+
+
+def read_text_file(path: str):
+    """
+    Lê um arquivo de texto em uma única abertura: os primeiros SNIFF_BYTES bytes decidem se
+    ele é UTF-8 e apenas arquivos de texto são lidos até o fim.
+
+    Retorno:
+    - tuple[bool, str]: (is_text, conteúdo). Binários e erros de leitura retornam (False, "").
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            if not sniff_utf8(head):
+                return False, ""
+            return True, (head + f.read()).decode("utf-8", errors="replace")
+    except OSError:
+        return False, ""
+
+
+class IgnoreRules:
+    """
+    Subconjunto das regras de .gitignore/.dockerignore usado para filtrar a varredura.
+
+    Suporta comentários (#), negação (!), padrões só de diretório (terminados em '/'),
+    padrões ancorados (com '/' no meio ou no início, relativos ao diretório do arquivo de
+    ignore) e '**'. Padrões sem '/' casam com o nome em qualquer profundidade. Todas as
+    linhas de .dockerignore são ancoradas na raiz, como no Docker. Vale a última regra que
+    casar, como no git.
+    """
+
+    def __init__(self):
+        # (regex compilada, negação, apenas diretórios)
+        self.rules = []
+
+    def add_file(self, path: Path, base: str, anchored: bool = False):
+        """
+        Carrega as regras de `path`; `base` é o diretório do arquivo relativo à raiz ("" na raiz).
+        """
+        try:
+            lines = path.read_text(errors="replace").splitlines()
+        except OSError:
+            return
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.strip("/") if anchored else line.rstrip("/")
+            if not line:
+                continue
+            if anchored or "/" in line:
+                pattern = f"{base}/{line.lstrip('/')}" if base else line.lstrip("/")
+            else:
+                pattern = f"{base}/**/{line}" if base else f"**/{line}"
+            self.rules.append((self._compile(pattern), negate, dir_only))
+
+    @staticmethod
+    def _compile(pattern: str):
+        # '**/' casa zero ou mais diretórios; '*', '?' e '[...]' não atravessam '/'
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("**", i):
+                parts.append(".*")
+                i += 2
+            elif pattern[i] == "*":
+                parts.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                parts.append("[^/]")
+                i += 1
+            elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+                end = pattern.index("]", i + 2)
+                chars = pattern[i + 1:end]
+                if chars.startswith("!"):
+                    chars = "^" + chars[1:]
+                parts.append("[" + chars.replace("\\", "\\\\") + "]")
+                i = end + 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        # Um diretório ignorado também ignora tudo abaixo dele
+        return re.compile("".join(parts) + "(?:/.*)?$")
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        result = False
+        for regex, negate, dir_only in self.rules:
+            if regex.match(rel) and (not dir_only or is_dir or self._under_dir(regex, rel)):
+                result = not negate
+        return result
+
+    @staticmethod
+    def _under_dir(regex, rel: str) -> bool:
+        # Arquivo casa um padrão de diretório apenas se algum diretório pai casar
+        parent = rel
+        while "/" in parent:
+            parent = parent.rsplit("/", 1)[0]
+            if regex.match(parent):
+                return True
         return False
 
 
-def cmd_list(path: str, show_hidden: bool, include_content: bool = False):
+def matches_any(rel: str, name: str, patterns) -> bool:
+    """
+    True se o caminho relativo ou o nome casar com algum dos globs (fnmatch).
+    """
+    return any(fnmatch.fnmatch(rel, g) or fnmatch.fnmatch(name, g) for g in patterns)
+
+
+def scan(
+    root: Path,
+    recursive: bool = False,
+    show_hidden: bool = False,
+    include=(),
+    exclude=(),
+    use_ignore_files: bool = True,
+    max_depth: int = -1,
+):
     """
-    Lista o conteúdo de um diretório seguro e retorna metadados sobre cada entrada.
+    Percorre `root` com os.scandir e gera (os.DirEntry, caminho relativo, profundidade) em
+    ordem alfabética, diretório a diretório.
+
+    Parâmetros:
+    - root (Path): Diretório inicial (já validado por secure_path).
+    - recursive (bool): Desce nos subdiretórios. Links simbólicos para diretórios não são seguidos.
+    - show_hidden (bool): Quando False, ignora entradas cujo nome começa com '.'.
+    - include (Iterable[str]): Globs; se informados, apenas arquivos que casarem são emitidos
+      (diretórios continuam sendo percorridos).
+    - exclude (Iterable[str]): Globs de arquivos e diretórios a ignorar.
+    - use_ignore_files (bool): Respeita .gitignore (da raiz e de cada subdiretório) e o .dockerignore da raiz.
+    - max_depth (int): Profundidade máxima na recursão; -1 sem limite.
+
+    Observações:
+    - Cada DirEntry guarda o resultado de is_dir()/stat(), então nenhum arquivo recebe mais de um stat.
+    - Apenas as entradas de um diretório por nível da pilha ficam em memória.
+    - O diretório .git é sempre ignorado.
+    """
+    rules = IgnoreRules()
+    if use_ignore_files:
+        rules.add_file(WORKSPACE_ROOT / ".gitignore", "")
+        rules.add_file(WORKSPACE_ROOT / ".dockerignore", "", anchored=True)
+    start = str(root.relative_to(WORKSPACE_ROOT)).replace("\\", "/")
+    stack = [(str(root), "" if start == "." else start, 0)]
+    while stack:
+        path, rel_dir, depth = stack.pop()
+        if use_ignore_files and rel_dir and recursive:
+            rules.add_file(Path(path) / ".gitignore", rel_dir)
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.name in ALWAYS_IGNORED or (not show_hidden and entry.name.startswith(".")):
+                continue
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if rules.rules and rules.ignored(rel, is_dir):
+                continue
+            if exclude and matches_any(rel, entry.name, exclude):
+                continue
+            if is_dir and recursive and (max_depth < 0 or depth < max_depth):
+                subdirs.append((entry.path, rel, depth + 1))
+            if include and (is_dir or not matches_any(rel, entry.name, include)):
+                continue
+            yield entry, rel, depth
+        # Pilha LIFO: empilha em ordem reversa para visitar em ordem alfabética
+        stack.extend(reversed(subdirs))
+
+
+def iter_items(entries, include_content: bool, max_bytes: int, max_total_bytes: int, workers: int):
+    """
+    Converte as entradas de scan() em dicionários de saída, lendo o conteúdo em paralelo.
+
+    Comportamento:
+    - "size" vem do stat em cache do DirEntry (None para diretórios).
+    - Com include_content, arquivos até max_bytes são lidos por um pool de `workers` threads;
+      a ordem de saída é preservada e no máximo workers * 4 leituras ficam pendentes, então
+      a memória não cresce com o tamanho do workspace.
+    - O orçamento max_total_bytes é reservado pelo tamanho do arquivo antes da leitura;
+      arquivos que não cabem saem com "content": "" e "skipped": "budget".
+    """
+    remaining = max_total_bytes
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for entry, rel, _ in entries:
+            is_file = entry.is_file(follow_symlinks=False)
+            try:
+                size = entry.stat(follow_symlinks=False).st_size if is_file else None
+            except OSError:
+                size = None
+            item = {"name": entry.name, "path": rel, "size": size}
+            future = None
+            if include_content and is_file:
+                item["is_text"] = False
+                item["content"] = ""
+                if size is None or size > max_bytes:
+                    item["skipped"] = "size"
+                elif size > remaining:
+                    item["skipped"] = "budget"
+                else:
+                    remaining -= size
+                    future = pool.submit(read_text_file, entry.path)
+            pending.append((item, future))
+            while len(pending) > workers * 4 or (pending and pending[0][1] is None):
+                yield _finish(*pending.popleft())
+        while pending:
+            yield _finish(*pending.popleft())
+
+
+def _finish(item: dict, future):
+    if future is not None:
+        item["is_text"], item["content"] = future.result()
+    return item
+
+
+def cmd_list(
+    path: str,
+    show_hidden: bool,
+    include_content: bool = False,
+    recursive: bool = False,
+    include=(),
+    exclude=(),
+    use_ignore_files: bool = True,
+    max_depth: int = -1,
+    max_bytes: int = MAX_BYTES,
+    max_total_bytes: int = MAX_TOTAL_BYTES,
+    ndjson: bool = False,
+    workers: int = 8,
+    out=None,
+):
+    """
+    Lista o conteúdo de um diretório seguro e escreve metadados sobre cada entrada em `out` (padrão: stdout).
 
     Parâmetros:
     - path (str): Caminho relativo ou absoluto do diretório a listar. Será normalizado/validado por secure_path().
     - show_hidden (bool): Quando False, ignora entradas cujo nome começa com '.'.
     - include_content (bool, opcional): Se True, para arquivos pequenos de texto inclui também o conteúdo e um flag indicando que é texto. Padrão: False.
+    - recursive, include, exclude, use_ignore_files, max_depth: Repassados para scan().
+    - max_bytes (int, opcional): Tamanho máximo de cada arquivo com conteúdo incluído. Padrão: MAX_BYTES.
+    - max_total_bytes (int, opcional): Orçamento de bytes de conteúdo somados. Padrão: MAX_TOTAL_BYTES.
+    - ndjson (bool, opcional): Um objeto JSON por linha em vez de um array JSON.
+    - workers (int, opcional): Threads de leitura de conteúdo. Padrão: 8.
 
     Comportamento:
-    - Valida o caminho com secure_path(path). Se o caminho não existir ou não for um diretório (checado por is_idr()), imprime um JSON de erro no formato {"error": "..."} e retorna None.
-    - Percorre as entradas do diretório em ordem alfabética.
-    - Para cada entrada cria um dicionário com as chaves:
+    - Valida o caminho com secure_path(path). Se o caminho não existir ou não for um diretório, imprime um JSON de erro no formato {"error": "..."} e retorna None.
+    - Percorre as entradas do diretório em ordem alfabética (recursivamente com recursive=True).
+    - Para cada entrada escreve um dicionário com as chaves:
         - "name": nome da entrada (str).
         - "path": caminho relativo a WORKSPACE_ROOT com barras '/' (str).
         - "size": tamanho em bytes se for arquivo, caso contrário None.
-    - Se include_content for True e a entrada for um arquivo:
-        - Se o tamanho for menor ou igual a MAX_BYTES e is_text(file) for True, tenta ler o conteúdo com read_text(errors="replace") e define:
-            - "is_text": True
-            - "content": conteúdo do arquivo (str). Em caso de erro na leitura, usa string vazia.
-        - Caso contrário define:
-            - "is_text": False
-            - "content": "" (string vazia)
+    - Se include_content for True e a entrada for um arquivo, acrescenta "is_text" e "content"
+      (string vazia para binários, arquivos acima de max_bytes ou fora do orçamento, indicados em "skipped").
+    - A saída é escrita à medida que as entradas são produzidas (o array JSON também é
+      emitido em streaming), então workspaces grandes não ficam inteiros em memória.
 
     Retorno:
-    - list[dict]: lista de dicionários com os metadados e, opcionalmente, conteúdo dos arquivos quando aplicável.
+    - int: quantidade de entradas escritas.
     - None: se o caminho não existir ou não for um diretório (após imprimir o erro em JSON).
-
-    Observações:
-    - Suprime exceções ao ler o conteúdo dos arquivos, retornando conteúdo vazio em caso de falha.
-    - Depende de variáveis/funcionalidades externas: secure_path, WORKSPACE_ROOT, MAX_BYTES e is_text.
     """
+    out = out or sys.stdout
     p = secure_path(path or "")
-    if not p.exists() or not p.is_idr():
+    if not p.is_dir():
         print(
-            json.dumps({"error": f"Path {path} does not exist or is not a directory."})
+            json.dumps({"error": f"Path {path} does not exist or is not a directory."}),
+            file=out,
         )
-        return
-    items = []
-    for c in sorted(p.iterdir()):
-        if not show_hidden and c.name.startswith("."):
-            continue
-        item = {
-            "name": c.name,
-            "path": str(c.relative_to(WORKSPACE_ROOT)).replace("\\", "/"),
-            "size": c.stat().st_size if c.is_file() else None,
-        }
-        if include_content and c.is_file():
-            size = c.stat().st_size
-            if size <= MAX_BYTES and is_text(c):
-                try:
-                    content = c.read_text(errors="replace")
-                except Exception as e:
-                    content = ""
-                item["is_text"] = True
-                item["content"] = content
-            else:
-                item["is_text"] = False
-                item["content"] = ""
-        items.append(item)
+        return None
+    entries = scan(p, recursive, show_hidden, include, exclude, use_ignore_files, max_depth)
+    count = 0
+    if not ndjson:
+        out.write("[")
+    for item in iter_items(entries, include_content, max_bytes, max_total_bytes, workers):
+        line = json.dumps(item, ensure_ascii=False)
+        if ndjson:
+            out.write(line + "\n")
+        else:
+            out.write(("," if count else "") + line)
+        count += 1
+    if not ndjson:
+        out.write("]\n")
+    out.flush()
+    return count
 
 
 def cmd_read(path: str, max_bytes: int = MAX_BYTES):
     """
-    Lê o conteúdo de um ficheiro de forma segura e trata erros imprimindo mensagens JSON.
+    Lê o conteúdo de um ficheiro de forma segura e imprime o resultado (ou o erro) em JSON.
 
     Parâmetros:
         path (str): Caminho para o ficheiro a ler. Obrigatório.
@@ -153,28 +412,19 @@ def cmd_read(path: str, max_bytes: int = MAX_BYTES):
           {"error": f"Path {path} does not exist or is not a file."} e retorna.
         - Obtém o tamanho do ficheiro; se exceder max_bytes imprime
           {"error": f"File {path} is too large to read ({size} bytes). Max allowed is {max_bytes} bytes."} e retorna.
-        - Se is_text(p) for True, lê o conteúdo com p.read_text(errors="replace") e guarda em 'text';
-          se for False, define 'text' como None.
+        - Lê o ficheiro com read_text_file() (uma única abertura) e imprime
+          {"path", "size", "is_text", "content"}; 'content' é None para binários.
 
     Retorno:
-        None. A função não devolve explicitamente o conteúdo; apenas imprime mensagens de erro em formato JSON
-        em stdout quando ocorrem falhas.
-
-    Efeitos secundários:
-        - Imprime mensagens de erro em JSON no stdout.
-        - Depende de secure_path() e is_text() para validações de segurança e deteção de ficheiros de texto.
-
-    Observações:
-        - Se o objetivo for obter o conteúdo lido, a função deverá ser alterada para devolver 'text' ou para expor
-          o valor lido de outra forma.
+        str | None: O conteúdo lido (None para binários ou em caso de erro).
     """
     if not path:
         print(json.dumps({"error": "Path is required for read command."}))
-        return
+        return None
     p = secure_path(path)
-    if not p.exists() or not p.is_file():
+    if not p.is_file():
         print(json.dumps({"error": f"Path {path} does not exist or is not a file."}))
-        return
+        return None
     size = p.stat().st_size
     if size > max_bytes:
         print(
@@ -184,8 +434,17 @@ def cmd_read(path: str, max_bytes: int = MAX_BYTES):
                 }
             )
         )
-        return
-    text = p.read_text(errors="replace") if is_text(p) else None
+        return None
+    text_file, content = read_text_file(str(p))
+    text = content if text_file else None
+    rel = str(p.relative_to(WORKSPACE_ROOT)).replace("\\", "/")
+    print(
+        json.dumps(
+            {"path": rel, "size": size, "is_text": text_file, "content": text},
+            ensure_ascii=False,
+        )
+    )
+    return text
 
 
 def main():
@@ -197,17 +456,24 @@ def main():
         --path (str): caminho relativo a listar. Padrão: raiz do workspace ("").
         --show-hidden (flag): inclui arquivos e diretórios ocultos na listagem.
         --include-content (flag): inclui o conteúdo de arquivos de texto que estejam abaixo do limite de tamanho.
+        --recursive (flag) / --max-depth (int): percorre os subdiretórios.
+        --include / --exclude (glob, repetíveis): filtros de arquivos.
+        --no-ignore (flag): não aplica .gitignore/.dockerignore.
+        --max-bytes / --max-total-bytes (int): limites por arquivo e total de conteúdo.
+        --ndjson (flag): um objeto JSON por linha.
+        --workers (int): threads de leitura de conteúdo.
     - read: leitura de um arquivo.
         path (str): caminho relativo do arquivo a ser lido.
         --max-bytes (int): tamanho máximo em bytes para leitura do arquivo. Padrão: MAX_BYTES (aprox. 2MB).
     Comportamento e efeitos colaterais:
-    - Ao receber o comando "list", chama cmd_list(path, show_hidden, include_content).
+    - Ao receber o comando "list", chama cmd_list(...) com as opções acima.
     - Ao receber o comando "read", chama cmd_read(path, max_bytes).
     - O argparse lida com validação/ajuda e pode encerrar o programa com SystemExit em caso de argumentos inválidos.
     Retorno:
     - None
     Exemplos de uso:
     - list_composition list --path src --show-hidden
+    - list_composition list --recursive --include "*.py" --include-content --ndjson
     - list_composition read src/app.py --max-bytes 1048576
     """
     ap = argparse.ArgumentParser(prog="list_composition")
@@ -229,6 +495,57 @@ def main():
         action="store_true",
         help="Include file content for text files under size limit.",
     )
+    l.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Walk subdirectories.",
+    )
+    l.add_argument(
+        "--max-depth",
+        type=int,
+        default=-1,
+        help="Maximum recursion depth. Defaults to unlimited.",
+    )
+    l.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        help="Glob of files to list (repeatable).",
+    )
+    l.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Glob of files and directories to skip (repeatable).",
+    )
+    l.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help="Do not honor .gitignore/.dockerignore.",
+    )
+    l.add_argument(
+        "--max-bytes",
+        type=int,
+        default=MAX_BYTES,
+        help="Maximum size of each file whose content is included. Defaults to 2MB.",
+    )
+    l.add_argument(
+        "--max-total-bytes",
+        type=int,
+        default=MAX_TOTAL_BYTES,
+        help="Budget of content bytes for the whole listing. Defaults to 50MB.",
+    )
+    l.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Write one JSON object per line instead of a JSON array.",
+    )
+    l.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Threads used to read file contents.",
+    )
 
     r = sub.add_parser("read")
     r.add_argument("path", type=str, help="Relative path to the file to read.")
@@ -241,7 +558,20 @@ def main():
 
     args = ap.parse_args()
     if args.cmd == "list":
-        cmd_list(args.path, args.show_hidden, args.include_content)
+        cmd_list(
+            args.path,
+            args.show_hidden,
+            args.include_content,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            use_ignore_files=not args.no_ignore,
+            max_depth=args.max_depth,
+            max_bytes=args.max_bytes,
+            max_total_bytes=args.max_total_bytes,
+            ndjson=args.ndjson,
+            workers=args.workers,
+        )
     elif args.cmd == "read":
         cmd_read(args.path, args.max_bytes)
 
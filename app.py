@@ -1,16 +1,35 @@
+# Componentes (primeiro: o startup_profiler mede os imports abaixo)
+from components.startup import startup_profiler, STARTUP_PROFILE
+
 # Flask
-from flask import Flask, Blueprint, request
-from flask_jwt_extended import JWTManager
-from flask_cors import CORS
-from flask_restx import Api
-import logging
+with startup_profiler.imports_phase("import flask"):
+
+    from flask import Flask, Blueprint, request
+    from flask_cors import CORS
+    from flask_restx import Api
+    import logging
 
 # Componentes
-from components.secrets import get_secret
-from components.logger import handler_log
+with startup_profiler.imports_phase("import components"):
+
+    from components.discovery import discover_namespaces
+    from components.secrets import get_secret, secret_store
+    from components.serializer import output_json
+    from components.swagger import cache_swagger
+    from components.logger import handler_log, logger, LOG_LEVEL
+    from components.metrics import init_metrics
+    from components.compression import init_compression
+    from components.ratelimit import init_rate_limit
+    from components.timer import start_periodic_flush
+    from components.tracing import init_tracing
+    from components.profiler import init_profiler
+    from components.pool import prewarm_pools
+    from components.validation import init_validation
+
+# Source
+with startup_profiler.imports_phase("import src"):
 
-# Routes
-from routes.healthy import api as healthy
+    from src.login import CachedJWTManager
 
 
 def handle_app(testing=False):
@@ -28,15 +47,27 @@ def handle_app(testing=False):
     ---------
     Esta função monta e retorna uma aplicação Flask com as configurações e integrações necessárias para a API:
     - Cria a instância Flask.
+    - Pré-carrega as secrets de 'private/' (secret_store.preload) e inicia a verificação de rotação (SECRETS_WATCH_INTERVAL).
     - Define a chave secreta do JWT obtida via get_secret('jwt_secret_key').
     - Ativa opções da interface Swagger (SWAGGER_UI_REQUEST_DURATION e SWAGGER_UI_OPERATION_ID).
     - Seta a flag de TESTING conforme o parâmetro.
-    - Configura o logger 'werkzeug' adicionando um handler (handler_log()) e ajustando o nível para DEBUG.
-    - Adiciona o namespace da API (healthy).
+    - Configura o logger 'werkzeug' adicionando um handler (handler_log()) e ajustando o nível conforme LOG_LEVEL.
     - Cria um Blueprint chamado 'api' e instancia um objeto Api com metadata (version, title, description e rota de documentação '/doc').
+    - Substitui a representação JSON do Api por output_json (orjson com fallback para a stdlib).
+    - Descobre e adiciona os namespaces definidos em routes/ (discover_namespaces).
+    - Compila uma vez os schemas dos modelos do Api e recusa corpos acima de MAX_CONTENT_LENGTH antes do parse (init_validation).
+    - Substitui as views de swagger.json e /doc por versões cacheadas (cache_swagger).
     - Registra o blueprint na aplicação.
     - Habilita CORS para a aplicação.
-    - Inicializa o JWTManager com a aplicação.
+    - Inicializa o CachedJWTManager (src/login.py): cache de tokens verificados, blocklist e múltiplas chaves por kid, resolvidas via get_secret para que rotações entrem em vigor sem restart.
+    - Registra o tempo de cada fase no startup_profiler (zerado a cada chamada; os imports de app.py são medidos uma vez, na importação) e loga o relatório se STARTUP_PROFILE=1.
+    - Propaga X-Request-ID/traceparent e registra spans por requisição (init_tracing), incluindo request_id e trace_id nos logs do werkzeug e dos componentes.
+    - Captura as pilhas das requisições acima de PROFILER_SLOW_MS (init_profiler), consultadas em /profiler/slow.
+    - Instrumenta as requisições para o endpoint /metrics (init_metrics).
+    - Comprime as respostas conforme Accept-Encoding (init_compression).
+    - Aplica rate limit por cliente e limite de concorrência (init_rate_limit), com os namespaces healthy e metrics isentos.
+    - Pré-aquece os pools de conexão registrados com components.pool.register_pool (prewarm_pools).
+    - Inicia o flush periódico das estatísticas de components.timer (se TIMER_FLUSH_INTERVAL > 0).
     Efeitos colaterais
     ------------------
     - Lê segredos externos (get_secret).
@@ -44,12 +75,22 @@ def handle_app(testing=False):
     - Registra blueprints e namespaces na aplicação Flask.
     Erros
     -----
-    Podem ser propagadas exceções originadas por get_secret, pela criação/configuração dos componentes (handler_log, Api, CORS, JWTManager) ou por falhas na inicialização do Flask.
+    Podem ser propagadas exceções originadas por get_secret, pela criação/configuração dos componentes (handler_log, Api, CORS, CachedJWTManager) ou por falhas na inicialização do Flask.
     """
 
-    app = Flask(__name__)
+    startup_profiler.reset()
+
+    with startup_profiler.phase("flask"):
+
+        app = Flask(__name__)
+
+    with startup_profiler.phase("secrets"):
+
+        secret_store.preload()
 
-    app.config["JWT_SECRET_KEY"] = get_secret("jwt_secret_key")
+        secret_store.start_watcher()
+
+        app.config["JWT_SECRET_KEY"] = get_secret("jwt_secret_key")
 
     app.config.SWAGGER_UI_REQUEST_DURATION = True
 
@@ -61,19 +102,55 @@ def handle_app(testing=False):
 
     werkzeug_logger.addHandler(handler_log())
 
-    werkzeug_logger.setLevel(logging.DEBUG)
-
-    api.add_namespace(healthy)
+    werkzeug_logger.setLevel(LOG_LEVEL)
 
     main_route = Blueprint("api", __name__)
 
     api = Api(main_route, version="1.0", title="API", description="API", doc="/doc")
 
-    app.register_blueprint(main_route)
+    api.representations["application/json"] = output_json
+
+    for namespace in discover_namespaces():
+
+        api.add_namespace(namespace)
+
+    with startup_profiler.phase("validation"):
+
+        init_validation(app, api)
+
+    with startup_profiler.phase("register_blueprint"):
+
+        app.register_blueprint(main_route)
+
+    with startup_profiler.phase("swagger"):
+
+        cache_swagger(app, api)
+
+    with startup_profiler.phase("extensions"):
+
+        CORS(app)
+
+        init_tracing(app, logger, werkzeug_logger)
+
+        init_profiler(app)
+
+        CachedJWTManager(app)
+
+        init_metrics(app)
+
+        init_rate_limit(app)
+
+        init_compression(app)
+
+        start_periodic_flush()
+
+    with startup_profiler.phase("pools"):
+
+        prewarm_pools()
 
-    CORS(app)
+    if STARTUP_PROFILE:
 
-    JWTManager(app)
+        startup_profiler.log_report()
 
     return app
 
@@ -0,0 +1,68 @@
+"""
+Benchmark de verificações de JWT por segundo com e sem o cache de tokens do
+CachedJWTManager (src/login.py).
+
+Uso:
+    python -m benchmarks.bench_jwt [--requests 20000] [--tokens 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("jwt_secret_key", "benchmark-secret")
+
+from flask import Flask  # noqa: E402
+from flask_jwt_extended import create_access_token, decode_token  # noqa: E402
+
+from src.login import CachedJWTManager  # noqa: E402
+
+
+def run(cache_size: int, requests: int, tokens: int) -> float:
+
+    app = Flask(__name__)
+
+    app.config["JWT_SECRET_KEY"] = os.environ["jwt_secret_key"]
+
+    CachedJWTManager(app, cache_size=cache_size)
+
+    with app.app_context():
+
+        issued = [create_access_token(identity=f"user-{i}") for i in range(tokens)]
+
+        start = time.perf_counter()
+
+        for i in range(requests):
+
+            decode_token(issued[i % tokens])
+
+        elapsed = time.perf_counter() - start
+
+    return requests / elapsed
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="bench_jwt")
+
+    ap.add_argument("--requests", type=int, default=20_000)
+
+    ap.add_argument("--tokens", type=int, default=100, help="Tokens distintos em rotação.")
+
+    args = ap.parse_args()
+
+    without_cache = run(0, args.requests, args.tokens)
+
+    with_cache = run(10_000, args.requests, args.tokens)
+
+    print(f"sem cache: {without_cache:>10.0f} verificações/s")
+
+    print(f"com cache: {with_cache:>10.0f} verificações/s ({with_cache / without_cache:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
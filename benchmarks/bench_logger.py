@@ -0,0 +1,125 @@
+"""
+Micro-benchmark da latência por chamada de logger.info na thread chamadora.
+Compara o handler síncrono (modo "dev") com o pipeline em fila (modo "production").
+
+Uso:
+    python -m benchmarks.bench_logger [--calls 50000] [--write-delay-us 0]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from components.logger import BatchStreamHandler, LogPipeline, PipelineHandler, console_formatter  # noqa: E402
+
+
+class SlowStream:
+    """
+    Stream que simula um destino lento (ex.: stderr de container com backpressure).
+    """
+
+    def __init__(self, delay_us: int):
+
+        self.target = open(os.devnull, "w")
+
+        self.delay = delay_us / 1_000_000
+
+    def write(self, data: str):
+
+        if self.delay:
+
+            time.sleep(self.delay)
+
+        return self.target.write(data)
+
+    def flush(self):
+
+        self.target.flush()
+
+    def isatty(self) -> bool:
+
+        return False
+
+
+def measure(logger: logging.Logger, calls: int) -> dict:
+
+    samples = []
+
+    for i in range(calls):
+
+        start = time.perf_counter_ns()
+
+        logger.info("requisição %s processada", i)
+
+        samples.append(time.perf_counter_ns() - start)
+
+    samples.sort()
+
+    return {
+        "mean_ns": sum(samples) // len(samples),
+        "p50_ns": samples[len(samples) // 2],
+        "p99_ns": samples[int(len(samples) * 0.99)],
+        "max_ns": samples[-1],
+    }
+
+
+def build_logger(name: str, handler: logging.Handler) -> logging.Logger:
+
+    logger = logging.getLogger(name)
+
+    logger.handlers.clear()
+
+    logger.propagate = False
+
+    logger.setLevel(logging.INFO)
+
+    logger.addHandler(handler)
+
+    return logger
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="bench_logger")
+
+    ap.add_argument("--calls", type=int, default=50_000)
+
+    ap.add_argument("--write-delay-us", type=int, default=0)
+
+    args = ap.parse_args()
+
+    sync_handler = logging.StreamHandler(SlowStream(args.write_delay_us))
+
+    sync_handler.setFormatter(console_formatter(sync_handler.stream))
+
+    sync_result = measure(build_logger("bench.sync", sync_handler), args.calls)
+
+    sink = BatchStreamHandler(SlowStream(args.write_delay_us))
+
+    sink.setFormatter(console_formatter(sink.stream))
+
+    pipeline = LogPipeline(sink, maxsize=args.calls + 1, overflow="block")
+
+    async_result = measure(
+        build_logger("bench.pipeline", PipelineHandler(pipeline)), args.calls
+    )
+
+    pipeline.stop()
+
+    print(f"{'modo':<12}{'média':>10}{'p50':>10}{'p99':>10}{'max':>12}  (ns)")
+
+    for label, result in (("síncrono", sync_result), ("pipeline", async_result)):
+
+        print(
+            f"{label:<12}{result['mean_ns']:>10}{result['p50_ns']:>10}"
+            f"{result['p99_ns']:>10}{result['max_ns']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de serialização JSON: representação padrão do flask-restx (json da stdlib,
+str -> bytes) contra components.serializer.dumps em payloads de tamanhos variados.
+
+Uso:
+    python -m benchmarks.bench_serializer [--repeat 200]
+"""
+
+import argparse
+import datetime
+import decimal
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from components.serializer import BACKEND, dumps  # noqa: E402
+
+
+def build_payloads() -> dict:
+
+    row = {
+        "id": 123,
+        "name": "Usuário de teste",
+        "active": True,
+        "score": 98.5,
+        "tags": ["a", "b", "c"],
+        "address": {"street": "Rua X", "number": 42, "city": "São Paulo"},
+    }
+
+    return {
+        "pequeno (healthy)": {"message": "API is healthy and get method is working"},
+        "médio (100 itens)": {"items": [dict(row, id=i) for i in range(100)]},
+        "grande (10k itens)": {"items": [dict(row, id=i) for i in range(10_000)]},
+    }
+
+
+def restx_default(data) -> bytes:
+
+    # Equivalente ao output_json padrão do flask-restx: dumps + "\n", depois encode na Response
+    return (json.dumps(data) + "\n").encode()
+
+
+def measure(function, data, repeat: int) -> dict:
+
+    samples = []
+
+    for _ in range(repeat):
+
+        start = time.perf_counter_ns()
+
+        body = function(data)
+
+        samples.append(time.perf_counter_ns() - start)
+
+    samples.sort()
+
+    total_s = sum(samples) / 1e9
+
+    return {
+        "p50_us": samples[len(samples) // 2] / 1e3,
+        "p99_us": samples[int(len(samples) * 0.99)] / 1e3,
+        "mb_s": len(body) * repeat / total_s / 1e6,
+    }
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="bench_serializer")
+
+    ap.add_argument("--repeat", type=int, default=200)
+
+    args = ap.parse_args()
+
+    print(f"backend do serializer: {BACKEND}")
+
+    print(f"{'payload':<22}{'engine':<10}{'p50 µs':>10}{'p99 µs':>10}{'MB/s':>10}")
+
+    for label, data in build_payloads().items():
+
+        for engine, function in (("stdlib", restx_default), ("serializer", dumps)):
+
+            result = measure(function, data, args.repeat)
+
+            print(
+                f"{label:<22}{engine:<10}{result['p50_us']:>10.1f}"
+                f"{result['p99_us']:>10.1f}{result['mb_s']:>10.1f}"
+            )
+
+    extra = {"when": datetime.datetime(2024, 1, 1, 12, 0), "price": decimal.Decimal("9.90")}
+
+    print(f"tipos estendidos: {dumps(extra).decode()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de memória das respostas grandes e do custo da paginação.
+
+1. Pico de memória (tracemalloc) para gerar N linhas: corpo materializado com dumps()
+   contra stream_json/stream_ndjson (components.streaming) consumindo um gerador.
+2. Tempo para buscar a última página de uma tabela SQLite com N linhas: OFFSET contra
+   keyset (keyset_where).
+
+Uso:
+    python -m benchmarks.bench_streaming [--rows 1000000] [--page 100]
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from components.serializer import dumps  # noqa: E402
+from components.streaming import keyset_where, stream_json, stream_ndjson  # noqa: E402
+
+
+def rows(count: int):
+
+    for i in range(count):
+
+        yield {"id": i, "name": f"usuario-{i}", "active": i % 2 == 0, "score": i * 0.5}
+
+
+def peak_memory(function) -> tuple:
+
+    tracemalloc.start()
+
+    start = time.perf_counter()
+
+    size = function()
+
+    elapsed = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    return size, peak, elapsed
+
+
+def consume(response) -> int:
+
+    return sum(len(chunk) for chunk in response.response)
+
+
+def bench_memory(count: int):
+
+    cases = {
+        "materializado": lambda: len(dumps(list(rows(count)))),
+        "stream_json": lambda: consume(stream_json(rows(count))),
+        "stream_ndjson": lambda: consume(stream_ndjson(rows(count))),
+    }
+
+    print(f"{'modo':<16}{'bytes':>14}{'pico MB':>10}{'tempo s':>10}")
+
+    for label, function in cases.items():
+
+        size, peak, elapsed = peak_memory(function)
+
+        print(f"{label:<16}{size:>14}{peak / 1e6:>10.1f}{elapsed:>10.2f}")
+
+
+def bench_pagination(count: int, page: int):
+
+    conn = sqlite3.connect(":memory:")
+
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?)", ((i, f"usuario-{i}") for i in range(count))
+    )
+
+    offset = count - page
+
+    start = time.perf_counter()
+
+    conn.execute(
+        "SELECT id, name FROM users ORDER BY id LIMIT ? OFFSET ?", (page, offset)
+    ).fetchall()
+
+    offset_elapsed = time.perf_counter() - start
+
+    where, params = keyset_where(("id",), (offset - 1,))
+
+    start = time.perf_counter()
+
+    conn.execute(
+        f"SELECT id, name FROM users WHERE {where} ORDER BY id LIMIT ?", params + [page]
+    ).fetchall()
+
+    keyset_elapsed = time.perf_counter() - start
+
+    print(
+        f"última página: OFFSET {offset_elapsed * 1000:.2f}ms, "
+        f"keyset {keyset_elapsed * 1000:.2f}ms"
+    )
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="bench_streaming")
+
+    ap.add_argument("--rows", type=int, default=1_000_000)
+
+    ap.add_argument("--page", type=int, default=100)
+
+    args = ap.parse_args()
+
+    bench_memory(args.rows)
+
+    bench_pagination(args.rows, args.page)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark de validação de payloads aninhados: ModelBase.validate do flask-restx (schema
+e validador refeitos a cada chamada) contra components.validation.CompiledSchema com os
+backends jsonschema e fastjsonschema (quando instalado).
+
+Uso:
+    python -m benchmarks.bench_validation [--repeat 50]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from flask import Blueprint, Flask
+from flask_restx import Api, Namespace, fields
+from werkzeug.exceptions import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from components.validation import CompiledSchema, fastjsonschema  # noqa: E402
+
+
+def build_models():
+
+    ns = Namespace("bench")
+
+    address = ns.model(
+        "Address",
+        {
+            "street": fields.String(required=True),
+            "number": fields.Integer(min=0),
+            "city": fields.String(required=True),
+            "zip": fields.String(pattern=r"^\d{5}-?\d{3}$"),
+        },
+    )
+
+    item = ns.model(
+        "Item",
+        {
+            "sku": fields.String(required=True),
+            "quantity": fields.Integer(required=True, min=1),
+            "price": fields.Float(required=True),
+            "tags": fields.List(fields.String),
+            "ship_to": fields.Nested(address),
+        },
+    )
+
+    order = ns.model(
+        "Order",
+        {
+            "id": fields.Integer(required=True),
+            "customer": fields.Nested(address, required=True),
+            "items": fields.List(fields.Nested(item), required=True),
+            "notes": fields.String,
+        },
+    )
+
+    app = Flask(__name__)
+
+    blueprint = Blueprint("bench", __name__)
+
+    api = Api(blueprint)
+
+    api.add_namespace(ns)
+
+    app.register_blueprint(blueprint)
+
+    return app, api, order
+
+
+def build_payload(items: int) -> dict:
+
+    address = {"street": "Rua X", "number": 42, "city": "São Paulo", "zip": "01310-100"}
+
+    return {
+        "id": 1,
+        "customer": address,
+        "items": [
+            {
+                "sku": f"SKU-{i}",
+                "quantity": 1 + i % 5,
+                "price": 9.9,
+                "tags": ["a", "b"],
+                "ship_to": address,
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def measure(function, data, repeat: int) -> dict:
+
+    samples = []
+
+    for _ in range(repeat):
+
+        start = time.perf_counter_ns()
+
+        function(data)
+
+        samples.append(time.perf_counter_ns() - start)
+
+    samples.sort()
+
+    return {
+        "p50_us": samples[len(samples) // 2] / 1e3,
+        "p99_us": samples[int(len(samples) * 0.99)] / 1e3,
+    }
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="bench_validation")
+
+    ap.add_argument("--repeat", type=int, default=50)
+
+    args = ap.parse_args()
+
+    app, api, order = build_models()
+
+    engines = {}
+
+    with app.test_request_context():
+
+        resolver = api.refresolver
+
+    # Caminho do Resource do flask-restx: expect.validate(data, api.refresolver, None)
+    engines["restx"] = lambda data: order.validate(data, resolver, None)
+
+    start = time.perf_counter_ns()
+
+    compiled = CompiledSchema(order, backend="jsonschema")
+
+    print(f"compilação jsonschema: {(time.perf_counter_ns() - start) / 1e6:.2f} ms")
+
+    engines["jsonschema"] = compiled.errors
+
+    if fastjsonschema is not None:
+
+        start = time.perf_counter_ns()
+
+        compiled_fast = CompiledSchema(order, backend="fastjsonschema")
+
+        print(f"compilação fastjsonschema: {(time.perf_counter_ns() - start) / 1e6:.2f} ms")
+
+        engines["fastjsonschema"] = compiled_fast.errors
+
+    else:
+
+        print("fastjsonschema não instalado: backend omitido")
+
+    print(f"{'payload':<24}{'engine':<16}{'p50 µs':>10}{'p99 µs':>10}")
+
+    for items in (1, 10, 100, 1000):
+
+        valid = build_payload(items)
+
+        invalid = build_payload(items)
+
+        invalid["items"][-1]["quantity"] = 0
+
+        for label, data in ((f"{items} itens", valid), (f"{items} itens (inválido)", invalid)):
+
+            for engine, function in engines.items():
+
+                def run(payload, function=function):
+
+                    try:
+
+                        function(payload)
+
+                    except HTTPException:
+
+                        pass
+
+                with app.test_request_context():
+
+                    result = measure(run, data, args.repeat)
+
+                print(f"{label:<24}{engine:<16}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
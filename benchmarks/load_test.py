@@ -0,0 +1,204 @@
+"""
+Harness de carga comparando o servidor de desenvolvimento (app.run) com o servidor
+de produção (serve.py / gunicorn pre-fork).
+
+Cada modo é iniciado em um subprocesso, aguardado até responder em /healthy e então
+exercitado por N clientes concorrentes com conexões keep-alive durante D segundos.
+
+Uso:
+    python -m benchmarks.load_test [--modes dev prod] [--clients 32] [--duration 10]
+    python -m benchmarks.load_test --url http://localhost:5000/healthy  # servidor já em execução
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEV_COMMAND = [
+    sys.executable,
+    "-c",
+    "import os; from app import handle_app; "
+    "handle_app().run(host='127.0.0.1', port=int(os.environ['PORT']), "
+    "debug=True, use_reloader=False, threaded=True)",
+]
+
+PROD_COMMAND = [sys.executable, "serve.py"]
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+
+    parts = urlsplit(url)
+
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+
+        try:
+
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=1)
+
+            conn.request("GET", parts.path)
+
+            if conn.getresponse().status == 200:
+
+                return
+
+        except OSError:
+
+            pass
+
+        time.sleep(0.2)
+
+    raise TimeoutError(f"{url} não respondeu em {timeout}s")
+
+
+def run_load(url: str, clients: int, duration: float) -> dict:
+    """
+    Dispara requisições GET com `clients` threads, cada uma reutilizando sua conexão.
+    Retorna:
+        dict: requisições/s, erros e percentis de latência em ms.
+    """
+
+    parts = urlsplit(url)
+
+    latencies = [[] for _ in range(clients)]
+
+    errors = [0] * clients
+
+    stop_at = time.monotonic() + duration
+
+    def client(index: int):
+
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+
+        samples = latencies[index]
+
+        while time.monotonic() < stop_at:
+
+            start = time.perf_counter_ns()
+
+            try:
+
+                conn.request("GET", parts.path)
+
+                response = conn.getresponse()
+
+                response.read()
+
+                if response.status != 200:
+
+                    errors[index] += 1
+
+            except (OSError, http.client.HTTPException):
+
+                errors[index] += 1
+
+                conn.close()
+
+                conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+
+                continue
+
+            samples.append(time.perf_counter_ns() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+
+    started = time.monotonic()
+
+    for thread in threads:
+
+        thread.start()
+
+    for thread in threads:
+
+        thread.join()
+
+    elapsed = time.monotonic() - started
+
+    merged = sorted(sample for samples in latencies for sample in samples)
+
+    def percentile(q: float) -> float:
+
+        return merged[min(int(q * len(merged)), len(merged) - 1)] / 1e6 if merged else 0.0
+
+    return {
+        "requests": len(merged),
+        "errors": sum(errors),
+        "rps": len(merged) / elapsed,
+        "p50_ms": percentile(0.5),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def run_mode(mode: str, port: int, clients: int, duration: float) -> dict:
+
+    env = dict(os.environ, PORT=str(port), HOST="127.0.0.1", LOG_LEVEL="WARNING")
+
+    command = DEV_COMMAND if mode == "dev" else PROD_COMMAND
+
+    process = subprocess.Popen(
+        command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    url = f"http://127.0.0.1:{port}/healthy"
+
+    try:
+
+        wait_ready(url)
+
+        return run_load(url, clients, duration)
+
+    finally:
+
+        process.terminate()
+
+        process.wait(timeout=30)
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="load_test")
+
+    ap.add_argument("--modes", nargs="+", default=["dev", "prod"], choices=["dev", "prod"])
+
+    ap.add_argument("--url", type=str, default="", help="Usa um servidor já em execução.")
+
+    ap.add_argument("--port", type=int, default=5055)
+
+    ap.add_argument("--clients", type=int, default=32)
+
+    ap.add_argument("--duration", type=float, default=10.0)
+
+    args = ap.parse_args()
+
+    if args.url:
+
+        results = {"url": run_load(args.url, args.clients, args.duration)}
+
+    else:
+
+        results = {
+            mode: run_mode(mode, args.port, args.clients, args.duration)
+            for mode in args.modes
+        }
+
+    print(f"{'modo':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'erros':>8}")
+
+    for mode, result in results.items():
+
+        print(
+            f"{mode:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
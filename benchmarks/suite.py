@@ -0,0 +1,419 @@
+"""
+Suíte de benchmarks da API: latência/throughput das rotas (em processo e via socket),
+overhead dos componentes, cold start e memória por worker.
+
+Os resultados são gravados em JSON; com --baseline cada métrica é comparada ao arquivo
+de referência e as que pioraram além de --tolerance são marcadas como regressão.
+
+Uso:
+    python -m benchmarks.suite [--quick] [--output resultados.json]
+    python -m benchmarks.suite --baseline benchmarks/baseline.json [--tolerance 0.15] [--fail-on-regression]
+    python -m benchmarks.suite --only routes_inprocess overhead --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("jwt_secret_key", "benchmark-secret")
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+METHODS = ("get", "post", "put", "delete", "patch")
+
+ROUTE = "/healthy"
+
+# Sufixos das métricas em que valores maiores são melhores; nas demais, menores são melhores
+HIGHER_IS_BETTER = ("rps", "per_s")
+
+
+def summarize(samples_ns: list, elapsed_s: float) -> dict:
+
+    samples_ns.sort()
+
+    count = len(samples_ns)
+
+    def percentile(q: float) -> float:
+
+        return samples_ns[min(int(q * count), count - 1)] / 1e6
+
+    return {
+        "rps": count / elapsed_s,
+        "mean_ms": sum(samples_ns) / count / 1e6,
+        "p50_ms": percentile(0.5),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def bench_routes_inprocess(iterations: int) -> dict:
+    """
+    Chama cada método de TestResource pelo test_client do Flask (sem socket).
+    """
+
+    from app import handle_app
+
+    client = handle_app(testing=True).test_client()
+
+    results = {}
+
+    for method in METHODS:
+
+        call = getattr(client, method)
+
+        for _ in range(min(iterations, 100)):
+
+            call(ROUTE)
+
+        samples = []
+
+        started = time.perf_counter()
+
+        for _ in range(iterations):
+
+            start = time.perf_counter_ns()
+
+            call(ROUTE)
+
+            samples.append(time.perf_counter_ns() - start)
+
+        results[method] = summarize(samples, time.perf_counter() - started)
+
+    return results
+
+
+def bench_routes_socket(iterations: int) -> dict:
+    """
+    Chama cada método de TestResource por HTTP, com conexão keep-alive, em um servidor
+    werkzeug local iniciado em uma thread.
+    """
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    from app import handle_app
+
+    # HTTP/1.1 para que a conexão seja reaproveitada entre as requisições
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+
+    server = make_server("127.0.0.1", 0, handle_app(), threaded=True)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+
+    thread.start()
+
+    results = {}
+
+    try:
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+
+        for method in METHODS:
+
+            verb = method.upper()
+
+            samples = []
+
+            started = time.perf_counter()
+
+            for _ in range(iterations):
+
+                start = time.perf_counter_ns()
+
+                conn.request(verb, ROUTE)
+
+                conn.getresponse().read()
+
+                samples.append(time.perf_counter_ns() - start)
+
+            results[method] = summarize(samples, time.perf_counter() - started)
+
+        conn.close()
+
+    finally:
+
+        server.shutdown()
+
+    return results
+
+
+def per_call_ns(function, calls: int) -> float:
+
+    start = time.perf_counter_ns()
+
+    for _ in range(calls):
+
+        function()
+
+    return (time.perf_counter_ns() - start) / calls
+
+
+def bench_overhead(calls: int) -> dict:
+    """
+    Custo por chamada (ns) de timer, logger e get_secret, descontada a chamada vazia.
+    """
+
+    from components.logger import BatchStreamHandler, LogPipeline, PipelineHandler
+    from components.secrets import get_secret
+    from components.timer import timer
+
+    from benchmarks.bench_logger import SlowStream, build_logger
+
+    def noop():
+
+        return None
+
+    timed = timer("bench.noop")(noop)
+
+    sampled = timer("bench.noop_sampled", sample_rate=0.1)(noop)
+
+    baseline = per_call_ns(noop, calls)
+
+    sink = BatchStreamHandler(SlowStream(0))
+
+    pipeline = LogPipeline(sink, maxsize=calls + 1, overflow="block")
+
+    pipeline_logger = build_logger("bench.suite.pipeline", PipelineHandler(pipeline))
+
+    sync_logger = build_logger("bench.suite.sync", logging.StreamHandler(SlowStream(0)))
+
+    results = {
+        "timer_ns": per_call_ns(timed, calls) - baseline,
+        "timer_sampled_ns": per_call_ns(sampled, calls) - baseline,
+        "logger_sync_ns": per_call_ns(lambda: sync_logger.info("requisição processada"), calls),
+        "logger_pipeline_ns": per_call_ns(
+            lambda: pipeline_logger.info("requisição processada"), calls
+        ),
+        "logger_disabled_ns": per_call_ns(lambda: pipeline_logger.debug("descartado"), calls),
+        "get_secret_ns": per_call_ns(lambda: get_secret("jwt_secret_key"), calls),
+    }
+
+    pipeline.stop()
+
+    return results
+
+
+COLD_START_SCRIPT = (
+    "import time; start = time.perf_counter(); "
+    "from app import handle_app; handle_app(testing=True); "
+    "print(time.perf_counter() - start)"
+)
+
+MEMORY_SCRIPT = (
+    "import resource, sys; from app import handle_app; "
+    "client = handle_app(testing=True).test_client(); "
+    "boot = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss; "
+    "[client.get('/healthy') for _ in range(int(sys.argv[1]))]; "
+    "print(boot, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def bench_cold_start(runs: int) -> dict:
+    """
+    Tempo de import + handle_app() em um interpretador novo (mediana de `runs` execuções),
+    incluindo o próprio processo Python.
+    """
+
+    imports, totals = [], []
+
+    for _ in range(runs):
+
+        start = time.perf_counter()
+
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        totals.append(time.perf_counter() - start)
+
+        imports.append(float(output.strip().splitlines()[-1]))
+
+    imports.sort()
+
+    totals.sort()
+
+    return {"handle_app_s": imports[runs // 2], "process_s": totals[runs // 2]}
+
+
+def bench_memory(requests: int) -> dict:
+    """
+    Pico de RSS (KB) de um processo equivalente a um worker: após handle_app() e após
+    servir `requests` requisições. Com preload no gunicorn parte dessa memória é
+    compartilhada (copy-on-write), então o valor é um limite superior por worker.
+    """
+
+    output = subprocess.run(
+        [sys.executable, "-c", MEMORY_SCRIPT, str(requests)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    boot, served = (int(value) for value in output.strip().splitlines()[-1].split())
+
+    return {"boot_rss_kb": boot, "served_rss_kb": served}
+
+
+def run_suite(only: list, quick: bool) -> dict:
+
+    scale = 0.1 if quick else 1
+
+    groups = {
+        "routes_inprocess": lambda: bench_routes_inprocess(int(5000 * scale)),
+        "routes_socket": lambda: bench_routes_socket(int(2000 * scale)),
+        "overhead": lambda: bench_overhead(int(200_000 * scale)),
+        "cold_start": lambda: bench_cold_start(3 if quick else 7),
+        "memory": lambda: bench_memory(int(5000 * scale)),
+    }
+
+    results = {}
+
+    for name, bench in groups.items():
+
+        if only and name not in only:
+
+            continue
+
+        print(f"executando {name}...", file=sys.stderr)
+
+        results[name] = bench()
+
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+
+    flat = {}
+
+    for key, value in results.items():
+
+        name = f"{prefix}{key}"
+
+        if isinstance(value, dict):
+
+            flat.update(flatten(value, f"{name}."))
+
+        else:
+
+            flat[name] = value
+
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compara as métricas presentes nos dois resultados.
+    Retorna:
+        list: (métrica, baseline, atual, variação relativa, regressão) por métrica, onde a
+        variação é positiva quando o valor piorou.
+    """
+
+    current, reference = flatten(results), flatten(baseline)
+
+    rows = []
+
+    for name, value in current.items():
+
+        base = reference.get(name)
+
+        if not base:
+
+            continue
+
+        change = (value - base) / abs(base)
+
+        if name.endswith(HIGHER_IS_BETTER):
+
+            change = -change
+
+        rows.append((name, base, value, change, change > tolerance))
+
+    return rows
+
+
+def main():
+
+    ap = argparse.ArgumentParser(prog="suite")
+
+    ap.add_argument(
+        "--only",
+        nargs="+",
+        default=[],
+        choices=["routes_inprocess", "routes_socket", "overhead", "cold_start", "memory"],
+    )
+
+    ap.add_argument("--quick", action="store_true", help="10%% das iterações (CI/smoke).")
+
+    ap.add_argument("--output", type=str, default="", help="Grava os resultados em JSON.")
+
+    ap.add_argument("--baseline", type=str, default="", help="JSON de referência para comparar.")
+
+    ap.add_argument("--save-baseline", type=str, default="", help="Grava os resultados como referência.")
+
+    ap.add_argument("--tolerance", type=float, default=0.15, help="Piora relativa tolerada.")
+
+    ap.add_argument("--fail-on-regression", action="store_true")
+
+    args = ap.parse_args()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.time(),
+            "quick": args.quick,
+        },
+        "results": run_suite(args.only, args.quick),
+    }
+
+    for path in (args.output, args.save_baseline):
+
+        if path:
+
+            Path(path).write_text(json.dumps(report, indent=2))
+
+    if not args.baseline:
+
+        print(json.dumps(report["results"], indent=2))
+
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text())["results"]
+
+    rows = compare(report["results"], baseline, args.tolerance)
+
+    print(f"{'métrica':<40}{'baseline':>14}{'atual':>14}{'variação':>10}")
+
+    for name, base, value, change, regressed in rows:
+
+        flag = "  REGRESSÃO" if regressed else ""
+
+        print(f"{name:<40}{base:>14.3f}{value:>14.3f}{change:>+10.1%}{flag}")
+
+    regressions = sum(1 for row in rows if row[4])
+
+    print(f"{regressions} regressão(ões) acima de {args.tolerance:.0%}")
+
+    if regressions and args.fail_on_regression:
+
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from flask import Response, request
+
+from components.metrics import registry
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "30"))
+
+
+class CachedResponse:
+    """
+    Resposta serializada armazenada no cache.
+    `expires_at` é um timestamp de relógio de parede (time.time()), comparável entre
+    processos e hosts que compartilham um backend.
+    """
+
+    __slots__ = ("body", "status", "headers", "etag", "tags", "expires_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        status: int,
+        headers: list,
+        etag: str,
+        tags: Tuple[str, ...],
+        expires_at: float,
+    ):
+
+        self.body = body
+
+        self.status = status
+
+        self.headers = headers
+
+        self.etag = etag
+
+        self.tags = tags
+
+        self.expires_at = expires_at
+
+
+class CacheBackend:
+    """
+    Interface dos backends de cache de respostas.
+    Implementações compartilhadas (ex.: Redis, memcached) devem implementar estes métodos;
+    LRUCache é a implementação em processo e serve de referência/stand-in nos testes.
+    """
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+
+        raise NotImplementedError
+
+    def set(self, key: str, value: CachedResponse):
+
+        raise NotImplementedError
+
+    def delete(self, key: str):
+
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+
+        raise NotImplementedError
+
+    def clear(self):
+
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Cache LRU em memória limitado por quantidade de entradas e por bytes.
+    Parâmetros:
+        max_entries (int): Máximo de respostas armazenadas. Padrão: CACHE_MAX_ENTRIES.
+        max_bytes (int): Máximo de bytes de corpo armazenados. Padrão: CACHE_MAX_BYTES.
+    Observações:
+        - Entradas expiradas são descartadas na leitura.
+        - Mantém um índice tag -> chaves para invalidação por tag em O(chaves da tag).
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+
+        self.max_entries = max_entries
+
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+        self._tags: Dict[str, Set[str]] = {}
+
+        self._bytes = 0
+
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str):
+
+        entry = self._entries.pop(key, None)
+
+        if entry is None:
+
+            return
+
+        self._bytes -= len(entry.body)
+
+        for tag in entry.tags:
+
+            keys = self._tags.get(tag)
+
+            if keys is not None:
+
+                keys.discard(key)
+
+                if not keys:
+
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+
+                return None
+
+            if entry.expires_at <= time.time():
+
+                self._remove(key)
+
+                return None
+
+            self._entries.move_to_end(key)
+
+            return entry
+
+    def set(self, key: str, value: CachedResponse):
+
+        if len(value.body) > self.max_bytes:
+
+            return
+
+        with self._lock:
+
+            self._remove(key)
+
+            self._entries[key] = value
+
+            self._bytes += len(value.body)
+
+            for tag in value.tags:
+
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str):
+
+        with self._lock:
+
+            self._remove(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+
+        removed = 0
+
+        with self._lock:
+
+            for tag in tags:
+
+                for key in list(self._tags.get(tag, ())):
+
+                    self._remove(key)
+
+                    removed += 1
+
+        return removed
+
+    def clear(self):
+
+        with self._lock:
+
+            self._entries.clear()
+
+            self._tags.clear()
+
+            self._bytes = 0
+
+
+_backend: CacheBackend = LRUCache()
+
+_counters = {"hit": 0, "miss": 0, "not_modified": 0}
+
+_counters_lock = threading.Lock()
+
+
+def set_cache_backend(backend: CacheBackend):
+    """
+    Substitui o backend padrão (LRUCache em processo) por outro, ex.: um backend compartilhado.
+    """
+
+    global _backend
+
+    _backend = backend
+
+
+def get_cache_backend() -> CacheBackend:
+
+    return _backend
+
+
+def invalidate_tags(*tags: str) -> int:
+    """
+    Remove do cache todas as respostas associadas às tags informadas.
+    Retorna:
+        int: Quantidade de respostas removidas.
+    """
+
+    return _backend.invalidate_tags(tags)
+
+
+def cache_stats() -> dict:
+    """
+    Retorna os contadores do processo atual: {"hit", "miss", "not_modified"}.
+    Os mesmos valores são exportados em /metrics como http_response_cache_total.
+    """
+
+    with _counters_lock:
+
+        return dict(_counters)
+
+
+def _count(result: str):
+
+    with _counters_lock:
+
+        _counters[result] += 1
+
+    registry.inc("http_response_cache_total", (("result", result),))
+
+
+def _cache_key(vary: Tuple[str, ...]) -> str:
+
+    # Codificação sem ambiguidade: "?a=1&b=2" e "?a=1%26b%3D2" geram chaves diferentes, e
+    # um header ausente difere de um header vazio
+    query = urlencode(sorted(request.args.items(multi=True)))
+
+    headers = json.dumps([request.headers.get(name) for name in vary])
+
+    return f"{request.method} {request.path}?{query} {headers}"
+
+
+def etag_matches(etag: str) -> bool:
+    """
+    Compara o If-None-Match da requisição com `etag` usando comparação fraca (ignora o
+    prefixo W/), como exigido para If-None-Match; ETags de respostas comprimidas por
+    components.compression são fracos.
+    """
+
+    header = request.headers.get("If-None-Match")
+
+    if not header:
+
+        return False
+
+    if header.strip() == "*":
+
+        return True
+
+    etag = etag[2:] if etag.startswith("W/") else etag
+
+    for tag in header.split(","):
+
+        tag = tag.strip()
+
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+
+            return True
+
+    return False
+
+
+def _not_modified(etag: str, vary: Tuple[str, ...]) -> Response:
+
+    _count("not_modified")
+
+    response = Response(status=304)
+
+    response.headers["ETag"] = etag
+
+    response.vary.update(vary)
+
+    return response
+
+
+def cached(
+    ttl: float = CACHE_DEFAULT_TTL,
+    tags: Iterable[str] = (),
+    vary: Iterable[str] = ("Accept",),
+):
+    """
+    Decorator de cache para métodos GET de Resources do flask-restx.
+    Parâmetros:
+        ttl (float, opcional): Validade em segundos. Padrão: CACHE_DEFAULT_TTL.
+        tags (Iterable[str], opcional): Tags para invalidação com invalidate_tags().
+        vary (Iterable[str], opcional): Headers que fazem parte da chave, além de
+            método, path e query string. Padrão: ("Accept",). Inclua "Authorization"
+            em recursos cujo conteúdo depende do usuário.
+    Comportamento:
+        - No miss, serializa o retorno do método pela representação do Api
+          (self.api.make_response) e armazena o corpo, status e headers apenas se o status
+          for 200.
+        - Toda resposta cacheável recebe um ETag forte (hash do corpo) e o header Vary
+          com os headers de `vary`; If-None-Match correspondente gera 304 Not Modified
+          sem corpo.
+        - Hits, misses e 304 são contados em cache_stats() e em /metrics.
+    Exemplo:
+        @cached(ttl=10, tags=("usuarios",))
+        def get(self): ...
+    """
+
+    tags = tuple(tags)
+
+    vary = tuple(vary)
+
+    def decorator(function):
+
+        @wraps(function)
+        def wrapper(resource, *args, **kwargs):
+
+            key = _cache_key(vary)
+
+            entry = _backend.get(key)
+
+            if entry is not None:
+
+                if etag_matches(entry.etag):
+
+                    return _not_modified(entry.etag, vary)
+
+                _count("hit")
+
+                response = Response(entry.body, status=entry.status, headers=entry.headers)
+
+                response.headers["X-Cache"] = "HIT"
+
+                return response
+
+            _count("miss")
+
+            result = function(resource, *args, **kwargs)
+
+            if isinstance(result, Response):
+
+                response = result
+
+            elif isinstance(result, tuple):
+
+                response = resource.api.make_response(*result)
+
+            else:
+
+                response = resource.api.make_response(result, 200)
+
+            if response.status_code != 200 or response.is_streamed:
+
+                return response
+
+            body = response.get_data()
+
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+            response.headers["ETag"] = etag
+
+            # Caches intermediários precisam saber que a representação depende destes headers
+            response.vary.update(vary)
+
+            _backend.set(
+                key,
+                CachedResponse(
+                    body,
+                    response.status_code,
+                    list(response.headers.items()),
+                    etag,
+                    tags,
+                    time.time() + ttl,
+                ),
+            )
+
+            if etag_matches(etag):
+
+                return _not_modified(etag, vary)
+
+            response.headers["X-Cache"] = "MISS"
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,378 @@
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional, Tuple
+
+from flask import Flask, Response, request
+
+try:
+
+    import brotli
+
+except ImportError:  # pragma: no cover - dependência opcional
+
+    brotli = None
+
+try:
+
+    import zstandard
+
+except ImportError:  # pragma: no cover - dependência opcional
+
+    zstandard = None
+
+# Corpos menores que isso (bytes) não são comprimidos
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+COMPRESS_LEVEL_GZIP = int(os.getenv("COMPRESS_LEVEL_GZIP", "6"))
+
+COMPRESS_LEVEL_BR = int(os.getenv("COMPRESS_LEVEL_BR", "5"))
+
+COMPRESS_LEVEL_ZSTD = int(os.getenv("COMPRESS_LEVEL_ZSTD", "3"))
+
+# Bytes máximos das variantes pré-comprimidas mantidas em memória
+COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Endpoints de conteúdo estático (sem o prefixo do blueprint) pré-comprimidos no nível máximo:
+# arquivos estáticos, assets do Swagger UI, swagger.json e a página /doc
+COMPRESS_MAX_LEVEL_ENDPOINTS = frozenset(
+    name
+    for name in os.getenv("COMPRESS_MAX_LEVEL_ENDPOINTS", "static,specs,doc").split(",")
+    if name
+)
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    Codificações suportadas no ambiente, em ordem de preferência do servidor.
+    """
+
+    encodings = []
+
+    if zstandard is not None:
+
+        encodings.append("zstd")
+
+    if brotli is not None:
+
+        encodings.append("br")
+
+    encodings.append("gzip")
+
+    return tuple(encodings)
+
+
+ENCODINGS = available_encodings()
+
+
+def negotiate(accept_encoding: str, encodings: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """
+    Escolhe a codificação a partir do header Accept-Encoding.
+    Parâmetros:
+        accept_encoding (str): Valor do header.
+        encodings (Iterable[str], opcional): Codificações disponíveis, em ordem de preferência.
+    Retorna:
+        Optional[str]: A codificação aceita de maior q (empate resolvido pela preferência
+        do servidor) ou None.
+    """
+
+    if not accept_encoding:
+
+        return None
+
+    weights = {}
+
+    for part in accept_encoding.split(","):
+
+        name, _, params = part.strip().partition(";")
+
+        q = 1.0
+
+        params = params.strip()
+
+        if params.startswith("q="):
+
+            try:
+
+                q = float(params[2:])
+
+            except ValueError:
+
+                q = 0.0
+
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+
+    for encoding in encodings:
+
+        q = weights.get(encoding, weights.get("*", 0.0))
+
+        if q > best_q:
+
+            best, best_q = encoding, q
+
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Comprime `data` de uma vez com a codificação informada.
+    Parâmetros:
+        level (int, opcional): Nível de compressão; padrão conforme COMPRESS_LEVEL_*.
+    """
+
+    if encoding == "gzip":
+
+        compressor = zlib.compressobj(level or COMPRESS_LEVEL_GZIP, zlib.DEFLATED, 31)
+
+        return compressor.compress(data) + compressor.flush()
+
+    if encoding == "br":
+
+        return brotli.compress(data, quality=level or COMPRESS_LEVEL_BR)
+
+    if encoding == "zstd":
+
+        return zstandard.ZstdCompressor(level=level or COMPRESS_LEVEL_ZSTD).compress(data)
+
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Comprime um corpo em streaming, emitindo cada chunk assim que ele é produzido
+    (flush por chunk), sem acumular a resposta inteira.
+    """
+
+    chunks = (chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks)
+
+    if encoding == "gzip":
+
+        compressor = zlib.compressobj(COMPRESS_LEVEL_GZIP, zlib.DEFLATED, 31)
+
+        for chunk in chunks:
+
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+            if data:
+
+                yield data
+
+        yield compressor.flush()
+
+    elif encoding == "br":
+
+        compressor = brotli.Compressor(quality=COMPRESS_LEVEL_BR)
+
+        for chunk in chunks:
+
+            data = compressor.process(chunk) + compressor.flush()
+
+            if data:
+
+                yield data
+
+        yield compressor.finish()
+
+    elif encoding == "zstd":
+
+        compressor = zstandard.ZstdCompressor(level=COMPRESS_LEVEL_ZSTD).compressobj()
+
+        flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+        for chunk in chunks:
+
+            data = compressor.compress(chunk) + compressor.flush(flush_block)
+
+            if data:
+
+                yield data
+
+        yield compressor.flush()
+
+    else:
+
+        raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+class PrecompressedCache:
+    """
+    LRU das variantes comprimidas de respostas com ETag, indexado por (path, ETag,
+    codificação); cada variante é gerada uma vez e reaproveitada enquanto o ETag não muda.
+    Observações:
+        - max_level=True usa MAX_LEVELS (gzip 9, br 11, zstd 19), dezenas a centenas de
+          vezes mais lento que os níveis padrão: reservado a conteúdo estático, que só é
+          comprimido uma vez por processo. Respostas dinâmicas com ETag (components.cache)
+          expiram e são invalidadas, então usam os níveis COMPRESS_LEVEL_*.
+    """
+
+    MAX_LEVELS = {"gzip": 9, "br": 11, "zstd": 19}
+
+    def __init__(self, max_bytes: int = COMPRESS_CACHE_BYTES):
+
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+        self._bytes = 0
+
+        self._lock = threading.Lock()
+
+    def get_or_compress(
+        self, key: tuple, data: bytes, encoding: str, max_level: bool = False
+    ) -> bytes:
+
+        with self._lock:
+
+            body = self._entries.get(key)
+
+            if body is not None:
+
+                self._entries.move_to_end(key)
+
+                return body
+
+        body = compress(data, encoding, self.MAX_LEVELS[encoding] if max_level else None)
+
+        with self._lock:
+
+            if key not in self._entries and len(body) <= self.max_bytes:
+
+                self._entries[key] = body
+
+                self._bytes += len(body)
+
+                while self._bytes > self.max_bytes:
+
+                    _, evicted = self._entries.popitem(last=False)
+
+                    self._bytes -= len(evicted)
+
+        return body
+
+
+precompressed = PrecompressedCache()
+
+
+def weak_etag(etag: str) -> str:
+    """
+    Converte um ETag forte em fraco: o corpo comprimido difere byte a byte do original,
+    mas é semanticamente equivalente, o que permite a comparação fraca em If-None-Match.
+    """
+
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def _compressible(response: Response) -> bool:
+
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+
+        return False
+
+    if "Content-Encoding" in response.headers:
+
+        return False
+
+    mimetype = response.mimetype or ""
+
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _static_content() -> bool:
+
+    endpoint = request.endpoint
+
+    return bool(endpoint) and endpoint.rsplit(".", 1)[-1] in COMPRESS_MAX_LEVEL_ENDPOINTS
+
+
+def _after_request(response: Response) -> Response:
+
+    if not _compressible(response):
+
+        return response
+
+    encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+
+    response.vary.add("Accept-Encoding")
+
+    if encoding is None:
+
+        return response
+
+    if response.is_streamed and not response.direct_passthrough:
+
+        response.response = compress_stream(response.response, encoding)
+
+        response.headers.pop("Content-Length", None)
+
+    else:
+
+        length = response.content_length
+
+        if length is not None and length < COMPRESS_MIN_SIZE:
+
+            return response
+
+        # Arquivos estáticos (send_file) chegam em passthrough; lê o conteúdo para comprimir
+        response.direct_passthrough = False
+
+        data = response.get_data()
+
+        if len(data) < COMPRESS_MIN_SIZE:
+
+            return response
+
+        etag = response.headers.get("ETag")
+
+        if etag:
+
+            key = (request.path, etag, encoding)
+
+            body = precompressed.get_or_compress(key, data, encoding, _static_content())
+
+        else:
+
+            body = compress(data, encoding)
+
+        response.set_data(body)
+
+    etag = response.headers.get("ETag")
+
+    if etag:
+
+        response.headers["ETag"] = weak_etag(etag)
+
+    response.headers["Content-Encoding"] = encoding
+
+    return response
+
+
+def init_compression(app: Flask):
+    """
+    Habilita a compressão das respostas (zstd, br ou gzip, conforme Accept-Encoding e as
+    bibliotecas instaladas).
+    Comportamento:
+        - Apenas tipos textuais (JSON, HTML, JS, CSS, SVG...) acima de COMPRESS_MIN_SIZE bytes.
+        - Respostas em streaming são comprimidas chunk a chunk.
+        - Respostas com ETag (arquivos estáticos do Swagger UI, swagger.json, respostas de
+          components.cache) têm a variante comprimida guardada em PrecompressedCache, sem
+          recomprimir os mesmos bytes a cada requisição; o ETag passa a ser fraco.
+        - Apenas endpoints em COMPRESS_MAX_LEVEL_ENDPOINTS usam o nível máximo; as demais
+          respostas usam COMPRESS_LEVEL_*, para não pesar na latência de um cache frio.
+    Observações:
+        - brotli e zstandard são opcionais; sem eles apenas gzip é oferecido.
+        - Deve ser registrado após init_metrics para que o tamanho medido seja o comprimido.
+    """
+
+    app.after_request(_after_request)
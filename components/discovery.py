@@ -0,0 +1,54 @@
+import importlib
+import pkgutil
+from pathlib import Path
+from typing import List
+
+from flask_restx import Namespace
+
+from components.logger import logger
+from components.startup import startup_profiler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def discover_namespaces(package: str = "routes") -> List[Namespace]:
+    """
+    Importa os módulos de `package` e retorna os Namespaces expostos por eles.
+    Parâmetros:
+        package (str, opcional): Pacote (diretório na raiz do projeto) com as rotas.
+            Padrão: "routes".
+    Retorna:
+        List[Namespace]: Namespaces encontrados na variável `api` de cada módulo, em
+        ordem alfabética do nome do arquivo.
+    Observações:
+        - Módulos iniciados com "_" são ignorados.
+        - O tempo e a memória de cada import são registrados no startup_profiler.
+        - Basta criar um arquivo em routes/ com `api = Namespace(...)`; não é necessário
+          registrá-lo no app.py.
+    """
+
+    namespaces = []
+
+    for module_info in sorted(pkgutil.iter_modules([str(ROOT / package)]), key=lambda m: m.name):
+
+        if module_info.name.startswith("_"):
+
+            continue
+
+        module_name = f"{package}.{module_info.name}"
+
+        with startup_profiler.phase(f"import {module_name}"):
+
+            module = importlib.import_module(module_name)
+
+        namespace = getattr(module, "api", None)
+
+        if isinstance(namespace, Namespace):
+
+            namespaces.append(namespace)
+
+        else:
+
+            logger.debug("%s não expõe um Namespace em 'api'", module_name)
+
+    return namespaces
@@ -0,0 +1,270 @@
+import asyncio
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+from components.logger import logger
+from components.timer import record
+
+# Timeout padrão (s) de cada probe
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2.0"))
+
+# Janela (s) em que o último resultado é reaproveitado
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "2.0"))
+
+HEALTH_MAX_WORKERS = int(os.getenv("HEALTH_MAX_WORKERS", "8"))
+
+
+class Probe:
+    """
+    Verificação de uma dependência (banco, fila, serviço externo...).
+    Parâmetros:
+        name (str): Identificador exibido na resposta.
+        check (Callable): Função sync ou async. Sucesso quando retorna sem exceção e o
+            retorno não é False; um dict retornado é incluído em "details".
+        timeout (float): Tempo máximo de espera pelo resultado.
+        critical (bool): Se False, uma falha não deixa a aplicação "not ready".
+    """
+
+    def __init__(self, name: str, check: Callable, timeout: float, critical: bool):
+
+        self.name = name
+
+        self.check = check
+
+        self.timeout = timeout
+
+        self.critical = critical
+
+        # Execução anterior ainda pendente (ex.: após um timeout)
+        self.pending: Optional[Future] = None
+
+    def run(self) -> dict:
+
+        start = time.perf_counter_ns()
+
+        if inspect.iscoroutinefunction(self.check):
+
+            result = asyncio.run(self.check())
+
+        else:
+
+            result = self.check()
+
+        elapsed = time.perf_counter_ns() - start
+
+        record(f"health.{self.name}", elapsed)
+
+        if result is False:
+
+            raise RuntimeError("check retornou False")
+
+        outcome = {"status": "ok", "latency_ms": round(elapsed / 1e6, 3)}
+
+        if isinstance(result, dict):
+
+            outcome["details"] = result
+
+        return outcome
+
+
+class HealthRegistry:
+    """
+    Registro de probes executadas em paralelo, com cache de resultado.
+    Parâmetros:
+        cache_ttl (float): Segundos em que o último resultado é reaproveitado.
+        max_workers (int): Tamanho do pool de threads que executa as probes.
+    Comportamento:
+        - Todas as probes são submetidas juntas ao pool e aguardadas até o próprio timeout,
+          contado a partir do início da rodada; a latência de cada uma vem na resposta.
+        - Uma probe que estourou o timeout não é submetida de novo enquanto a execução
+          anterior não terminar, evitando acumular threads presas em uma dependência lenta.
+        - Requisições concorrentes durante uma rodada aguardam o mesmo resultado
+          (single-flight), e polls dentro de cache_ttl não chegam às dependências.
+    """
+
+    def __init__(self, cache_ttl: float = HEALTH_CACHE_TTL, max_workers: int = HEALTH_MAX_WORKERS):
+
+        self.cache_ttl = cache_ttl
+
+        self.max_workers = max_workers
+
+        self.probes: Dict[str, Probe] = {}
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._lock = threading.Lock()
+
+        self._cached: Optional[dict] = None
+
+        self._cached_at = float("-inf")
+
+    def register(
+        self,
+        name: str,
+        check: Optional[Callable] = None,
+        timeout: float = HEALTH_PROBE_TIMEOUT,
+        critical: bool = True,
+    ):
+        """
+        Registra uma probe. Pode ser usado diretamente ou como decorator:
+            health.register("database", ping_database)
+
+            @health.register("cache", timeout=0.5, critical=False)
+            def ping_cache(): ...
+        """
+
+        def decorator(function: Callable) -> Callable:
+
+            self.probes[name] = Probe(name, function, timeout, critical)
+
+            self.invalidate()
+
+            return function
+
+        if check is not None:
+
+            return decorator(check)
+
+        return decorator
+
+    def unregister(self, name: str):
+
+        self.probes.pop(name, None)
+
+        self.invalidate()
+
+    def invalidate(self):
+
+        self._cached = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+
+        if self._executor is None:
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="health-probe"
+            )
+
+        return self._executor
+
+    def _run_all(self) -> dict:
+
+        started = time.monotonic()
+
+        futures = {}
+
+        for name, probe in self.probes.items():
+
+            if probe.pending is not None and not probe.pending.done():
+
+                futures[name] = None
+
+                continue
+
+            probe.pending = futures[name] = self._pool().submit(probe.run)
+
+        checks = {}
+
+        healthy = True
+
+        for name, future in futures.items():
+
+            probe = self.probes[name]
+
+            remaining = max(0.0, probe.timeout - (time.monotonic() - started))
+
+            try:
+
+                if future is None:
+
+                    raise FutureTimeout()
+
+                checks[name] = future.result(timeout=remaining)
+
+            except FutureTimeout:
+
+                checks[name] = {"status": "timeout", "latency_ms": round(probe.timeout * 1000, 3)}
+
+            except Exception as e:
+
+                logger.error("Probe %s falhou: %s", name, e)
+
+                checks[name] = {"status": "fail", "error": str(e)}
+
+            checks[name]["critical"] = probe.critical
+
+            if probe.critical and checks[name]["status"] != "ok":
+
+                healthy = False
+
+        return {"status": "ok" if healthy else "fail", "checks": checks}
+
+    def check(self) -> dict:
+        """
+        Retorna o resultado das probes, usando o cache quando ainda válido.
+        Retorna:
+            dict: {"status": "ok" | "fail", "checks": {nome: {"status", "latency_ms",
+                   "critical", ...}}, "cached": bool}
+        """
+
+        cached = self._cached
+
+        if cached is not None and time.monotonic() - self._cached_at < self.cache_ttl:
+
+            return dict(cached, cached=True)
+
+        with self._lock:
+
+            if self._cached is not None and time.monotonic() - self._cached_at < self.cache_ttl:
+
+                return dict(self._cached, cached=True)
+
+            result = self._run_all()
+
+            self._cached = result
+
+            self._cached_at = time.monotonic()
+
+        return dict(result, cached=False)
+
+    def reinit_after_fork(self):
+
+        self._executor = None
+
+        self._lock = threading.Lock()
+
+        self._cached = None
+
+        for probe in self.probes.values():
+
+            probe.pending = None
+
+
+health = HealthRegistry()
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=health.reinit_after_fork)
+
+
+def register_probe(
+    name: str,
+    check: Optional[Callable] = None,
+    timeout: float = HEALTH_PROBE_TIMEOUT,
+    critical: bool = True,
+):
+    """
+    Registra uma probe de dependência no registro global usado por /healthy/ready.
+    Parâmetros:
+        name (str): Nome da dependência.
+        check (Callable, opcional): Função sync ou async de verificação. Se omitida,
+            retorna um decorator.
+        timeout (float, opcional): Timeout da probe. Padrão: HEALTH_PROBE_TIMEOUT.
+        critical (bool, opcional): Se a falha torna a aplicação "not ready". Padrão: True.
+    """
+
+    return health.register(name, check, timeout=timeout, critical=critical)
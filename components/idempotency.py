@@ -0,0 +1,479 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from components.metrics import registry
+from components.ratelimit import RATE_LIMIT_TRUST_PROXY
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Tempo (s) em que a resposta de uma chave é reaproveitada
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+
+# Máximo de respostas guardadas em memória
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+# Espera máxima (s) de uma requisição repetida pela execução em andamento da mesma chave
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "30"))
+
+# Validade (s) da reserva de uma chave em execução (protege contra processos que morrem)
+IDEMPOTENCY_LOCK_TTL = float(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))
+
+# Intervalo (s) de consulta ao backend enquanto outro processo executa a mesma chave
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.05"))
+
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse:
+    """
+    Resposta guardada para uma chave de idempotência.
+    `expires_at` é um timestamp de relógio de parede (time.time()), comparável entre
+    processos e máquinas que compartilhem o backend.
+    """
+
+    __slots__ = ("body", "status", "headers", "fingerprint", "expires_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        status: int,
+        headers: list,
+        fingerprint: str,
+        expires_at: float,
+    ):
+
+        self.body = body
+
+        self.status = status
+
+        self.headers = headers
+
+        self.fingerprint = fingerprint
+
+        self.expires_at = expires_at
+
+
+class IdempotencyBackend:
+    """
+    Interface do armazenamento das respostas por chave.
+    Implementações compartilhadas (ex.: Redis com SET NX e expiração) devem implementar
+    estes métodos para deduplicar entre workers; MemoryIdempotencyBackend é a implementação
+    em processo e o stand-in de testes.
+    """
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+
+        raise NotImplementedError
+
+    def set(self, key: str, value: StoredResponse):
+
+        raise NotImplementedError
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """
+        Reserva a chave para execução; False se outra execução já a reservou.
+        """
+
+        raise NotImplementedError
+
+    def release(self, key: str):
+
+        raise NotImplementedError
+
+
+class MemoryIdempotencyBackend(IdempotencyBackend):
+    """
+    Respostas em memória com TTL, limitadas a `max_entries` (LRU).
+    """
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+
+        self._claims: Dict[str, float] = {}
+
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+
+                return None
+
+            if entry.expires_at <= time.time():
+
+                del self._entries[key]
+
+                return None
+
+            self._entries.move_to_end(key)
+
+            return entry
+
+    def set(self, key: str, value: StoredResponse):
+
+        with self._lock:
+
+            self._entries[key] = value
+
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+
+                self._entries.popitem(last=False)
+
+    def claim(self, key: str, ttl: float) -> bool:
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            expires_at = self._claims.get(key)
+
+            if expires_at is not None and expires_at > now:
+
+                return False
+
+            self._claims[key] = now + ttl
+
+            return True
+
+    def release(self, key: str):
+
+        with self._lock:
+
+            self._claims.pop(key, None)
+
+
+class _Flight:
+    """
+    Execução em andamento de uma chave, aguardada pelas requisições repetidas do processo.
+    """
+
+    __slots__ = ("fingerprint", "event", "response")
+
+    def __init__(self, fingerprint: str):
+
+        self.fingerprint = fingerprint
+
+        self.event = threading.Event()
+
+        self.response: Optional[StoredResponse] = None
+
+
+_backend: IdempotencyBackend = MemoryIdempotencyBackend()
+
+_inflight: Dict[str, _Flight] = {}
+
+_inflight_lock = threading.Lock()
+
+
+def set_idempotency_backend(backend: IdempotencyBackend):
+    """
+    Substitui o backend padrão (em memória) por outro, ex.: um backend compartilhado.
+    """
+
+    global _backend
+
+    _backend = backend
+
+
+def _count(result: str):
+
+    registry.inc("http_idempotency_total", (("result", result),))
+
+
+def _scope_key(idempotency_key: str) -> str:
+
+    # A chave vale por cliente e rota, para que um cliente não receba a resposta de outro
+    # que tenha usado a mesma chave. Com um JWT válido o cliente é a identidade (como no
+    # components.ratelimit), de modo que renovar o token entre as tentativas não perde a
+    # deduplicação; outros esquemas de Authorization (ex.: API key) usam o hash do header
+    # e, sem Authorization, o cliente é o IP de origem
+    client = None
+
+    if "Authorization" in request.headers:
+
+        try:
+
+            verify_jwt_in_request(optional=True)
+
+            identity = get_jwt_identity()
+
+            if identity is not None:
+
+                client = f"user:{identity}"
+
+        except Exception:
+
+            pass
+
+        if client is None:
+
+            client = "auth:" + request.headers["Authorization"]
+
+    elif RATE_LIMIT_TRUST_PROXY and "X-Forwarded-For" in request.headers:
+
+        client = "ip:" + request.headers["X-Forwarded-For"].split(",", 1)[0].strip()
+
+    else:
+
+        client = f"ip:{request.remote_addr}"
+
+    client = hashlib.blake2b(client.encode(), digest_size=8).hexdigest()
+
+    return f"{request.method} {request.path} {client} {idempotency_key}"
+
+
+def _fingerprint() -> str:
+
+    hasher = hashlib.blake2b(digest_size=16)
+
+    hasher.update(request.query_string)
+
+    hasher.update(b"\0")
+
+    hasher.update(request.get_data(cache=True))
+
+    return hasher.hexdigest()
+
+
+def _error(message: str, status: int, retry_after: Optional[int] = None):
+
+    headers = {"Retry-After": str(retry_after)} if retry_after else {}
+
+    return {"message": message}, status, headers
+
+
+def _replay(stored: StoredResponse) -> Response:
+
+    response = Response(stored.body, status=stored.status, headers=stored.headers)
+
+    response.headers["Idempotent-Replayed"] = "true"
+
+    return response
+
+
+def idempotent(ttl: float = IDEMPOTENCY_TTL, wait: float = IDEMPOTENCY_WAIT):
+    """
+    Decorator de idempotência para métodos de escrita de Resources do flask-restx.
+    Parâmetros:
+        ttl (float, opcional): Validade em segundos da resposta guardada.
+            Padrão: IDEMPOTENCY_TTL.
+        wait (float, opcional): Espera máxima de uma repetição concorrente.
+            Padrão: IDEMPOTENCY_WAIT.
+    Comportamento:
+        - Sem o header Idempotency-Key a requisição é executada normalmente.
+        - A primeira requisição de uma chave é executada e a resposta (status < 500) é guardada;
+          repetições dentro do TTL recebem a mesma resposta com "Idempotent-Replayed: true",
+          sem executar o método de novo.
+        - Repetições que chegam enquanto a primeira ainda executa aguardam o resultado dela
+          (single-flight) em vez de duplicar o trabalho. Se a execução estiver em outro
+          processo (backend compartilhado), uma requisição do processo consulta o backend a
+          cada IDEMPOTENCY_POLL_INTERVAL e repassa a resposta às demais; se a reserva for
+          liberada sem resposta guardada (ex.: 5xx), ela executa o método. Sem resultado
+          em `wait`, a resposta é 409 com Retry-After.
+        - A mesma chave com outro corpo/query string responde 422.
+        - Respostas 5xx não são guardadas, para que o cliente possa tentar de novo.
+        - A chave vale por método, path e cliente: a identidade do JWT (sobrevive à
+          renovação do token), o hash do header Authorization para outros esquemas ou,
+          sem ele, o IP de origem (X-Forwarded-For com RATE_LIMIT_TRUST_PROXY=1).
+    Exemplo:
+        @idempotent()
+        def post(self): ...
+    """
+
+    def decorator(function):
+
+        @wraps(function)
+        def wrapper(resource, *args, **kwargs):
+
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+
+            if not idempotency_key:
+
+                return function(resource, *args, **kwargs)
+
+            if len(idempotency_key) > MAX_KEY_LENGTH:
+
+                return _error("Idempotency-Key muito longa", 400)
+
+            key = _scope_key(idempotency_key)
+
+            fingerprint = _fingerprint()
+
+            stored = _backend.get(key)
+
+            if stored is None:
+
+                with _inflight_lock:
+
+                    flight = _inflight.get(key)
+
+                    leader = flight is None
+
+                    if leader:
+
+                        flight = _inflight[key] = _Flight(fingerprint)
+
+                if not leader:
+
+                    if flight.fingerprint != fingerprint:
+
+                        _count("mismatch")
+
+                        return _error("Idempotency-Key reutilizada com outro conteúdo", 422)
+
+                    if not flight.event.wait(wait) or flight.response is None:
+
+                        _count("conflict")
+
+                        return _error("Requisição com esta Idempotency-Key em andamento", 409, 1)
+
+                    if flight.response.fingerprint == fingerprint:
+
+                        _count("coalesced")
+
+                        return _replay(flight.response)
+
+                    _count("mismatch")
+
+                    return _error("Idempotency-Key reutilizada com outro conteúdo", 422)
+
+                try:
+
+                    stored, claimed = _await_owner(key, wait)
+
+                    if claimed:
+
+                        return _execute(
+                            resource, function, args, kwargs, key, fingerprint, ttl, flight
+                        )
+
+                    if stored is None:
+
+                        _count("conflict")
+
+                        return _error("Requisição com esta Idempotency-Key em andamento", 409, 1)
+
+                    # Resposta do processo que detinha a reserva, repassada às repetições
+                    flight.response = stored
+
+                finally:
+
+                    with _inflight_lock:
+
+                        _inflight.pop(key, None)
+
+                    flight.event.set()
+
+            if stored.fingerprint != fingerprint:
+
+                _count("mismatch")
+
+                return _error("Idempotency-Key reutilizada com outro conteúdo", 422)
+
+            _count("replayed")
+
+            return _replay(stored)
+
+        return wrapper
+
+    return decorator
+
+
+def _await_owner(key: str, wait: float) -> Tuple[Optional[StoredResponse], bool]:
+    """
+    Reserva a chave ou, se outro processo a detém, espera a resposta guardada por ele.
+    Retorna:
+        Tuple[Optional[StoredResponse], bool]: (resposta guardada, chave reservada); ambos
+        vazios se nada mudar em `wait` segundos.
+    """
+
+    deadline = time.monotonic() + wait
+
+    while True:
+
+        # Outra execução pode ter terminado entre a primeira consulta e a reserva
+        stored = _backend.get(key)
+
+        if stored is not None:
+
+            return stored, False
+
+        if _backend.claim(key, IDEMPOTENCY_LOCK_TTL):
+
+            return None, True
+
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+
+            return None, False
+
+        time.sleep(min(IDEMPOTENCY_POLL_INTERVAL, remaining))
+
+
+def _execute(
+    resource,
+    function,
+    args,
+    kwargs,
+    key: str,
+    fingerprint: str,
+    ttl: float,
+    flight: _Flight,
+):
+
+    # A chave já foi reservada por _await_owner
+    try:
+
+        _count("executed")
+
+        result = function(resource, *args, **kwargs)
+
+        if isinstance(result, Response):
+
+            response = result
+
+        elif isinstance(result, tuple):
+
+            response = resource.api.make_response(*result)
+
+        else:
+
+            response = resource.api.make_response(result, 200)
+
+        if response.status_code < 500 and not response.is_streamed:
+
+            stored = StoredResponse(
+                response.get_data(),
+                response.status_code,
+                list(response.headers.items()),
+                fingerprint,
+                time.time() + ttl,
+            )
+
+            _backend.set(key, stored)
+
+            flight.response = stored
+
+        return response
+
+    finally:
+
+        _backend.release(key)
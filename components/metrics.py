@@ -0,0 +1,601 @@
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, g, request
+
+from components.logger import dropped_records, logger
+
+# Diretório compartilhado entre workers pre-fork; vazio = apenas o processo atual
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+
+# Intervalo (s) em que cada worker grava seu snapshot no diretório compartilhado
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+
+# Acumulador dos contadores e histogramas de workers encerrados (ver retire_worker)
+DEAD_WORKERS_FILE = "metrics_dead.json"
+
+# Ids de snapshots já somados ao acumulador, mantidos para descartar leituras atrasadas
+DEAD_WORKERS_MERGED = 256
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_DEFINITIONS = {
+    "http_requests_total": ("counter", "Total de requisições HTTP processadas."),
+    "http_requests_in_flight": ("gauge", "Requisições HTTP em andamento."),
+    "http_request_duration_seconds": ("histogram", "Latência das requisições HTTP."),
+    "http_response_size_bytes": ("histogram", "Tamanho das respostas HTTP."),
+    "http_response_cache_total": ("counter", "Consultas ao cache de respostas por resultado."),
+    "http_idempotency_total": ("counter", "Requisições com Idempotency-Key por resultado."),
+    "log_records_dropped_total": ("counter", "Registros de log descartados pela fila do pipeline."),
+    "pool_connections": ("gauge", "Conexões dos pools por estado (idle/in_use)."),
+    "pool_checkout_wait_seconds": ("histogram", "Espera para obter uma conexão do pool."),
+    "pool_checkout_timeouts_total": ("counter", "Checkouts que excederam o timeout do pool."),
+}
+
+_BUCKETS = {
+    "http_request_duration_seconds": LATENCY_BUCKETS,
+    "http_response_size_bytes": SIZE_BUCKETS,
+    "pool_checkout_wait_seconds": WAIT_BUCKETS,
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Armazena contadores, gauges e histogramas do processo atual.
+    Cada operação é O(1) (ou O(log n) na busca do bucket) sob um único lock.
+    Observações:
+        - snapshot() produz um dict serializável em JSON usado tanto para a exposição
+          quanto para a troca de dados entre workers via METRICS_MULTIPROC_DIR.
+        - Cada processo tem um id próprio (renovado no reset após o fork), que distingue
+          workers com o mesmo pid.
+    """
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+
+        self.reset()
+
+    def reset(self):
+
+        self.id = os.urandom(8).hex()
+
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+
+        self.histograms: Dict[Tuple[str, Labels], list] = {}
+
+    def inc(self, name: str, labels: Labels, value: float = 1.0):
+
+        key = (name, labels)
+
+        with self._lock:
+
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def add_gauge(self, name: str, labels: Labels, value: float):
+
+        key = (name, labels)
+
+        with self._lock:
+
+            self.gauges[key] = self.gauges.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Labels, value: float):
+
+        buckets = _BUCKETS[name]
+
+        index = bisect.bisect_left(buckets, value)
+
+        key = (name, labels)
+
+        with self._lock:
+
+            entry = self.histograms.get(key)
+
+            if entry is None:
+
+                # [contagens por bucket (+Inf no final), soma, total]
+                entry = self.histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+
+            entry[0][index] += 1
+
+            entry[1] += value
+
+            entry[2] += 1
+
+    def snapshot(self) -> dict:
+
+        # Contado pelo próprio pipeline de logging (components.logger não importa as métricas)
+        dropped = [["log_records_dropped_total", [], float(dropped_records())]]
+
+        with self._lock:
+
+            return {
+                "pid": os.getpid(),
+                "id": self.id,
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()] + dropped,
+                "gauges": [[n, list(l), v] for (n, l), v in self.gauges.items()],
+                "histograms": [
+                    [n, list(l), list(e[0]), e[1], e[2]]
+                    for (n, l), e in self.histograms.items()
+                ],
+            }
+
+
+registry = MetricsRegistry()
+
+
+def _snapshot_path(pid: int) -> str:
+
+    return os.path.join(METRICS_MULTIPROC_DIR, f"metrics_{pid}.json")
+
+
+def write_snapshot():
+    """
+    Grava o snapshot do processo atual em METRICS_MULTIPROC_DIR de forma atômica
+    (arquivo temporário + rename). Sem efeito quando o diretório não está configurado.
+    """
+
+    if not METRICS_MULTIPROC_DIR:
+
+        return
+
+    path = _snapshot_path(os.getpid())
+
+    try:
+
+        _write_json(path, registry.snapshot())
+
+    except OSError as e:
+
+        logger.error("Erro ao gravar métricas em %s: %s", path, e)
+
+
+def _pid_alive(pid: int) -> bool:
+
+    try:
+
+        os.kill(pid, 0)
+
+    except ProcessLookupError:
+
+        return False
+
+    except PermissionError:
+
+        return True
+
+    return True
+
+
+def _read_json(path: str) -> Optional[dict]:
+
+    try:
+
+        with open(path) as f:
+
+            return json.load(f)
+
+    except FileNotFoundError:
+
+        return None
+
+    except (OSError, ValueError) as e:
+
+        logger.error("Erro ao ler métricas de %s: %s", path, e)
+
+        return None
+
+
+def _write_json(path: str, data: dict):
+
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "w") as f:
+
+        json.dump(data, f)
+
+    os.replace(tmp_path, path)
+
+
+def _load_snapshots() -> list:
+
+    if not METRICS_MULTIPROC_DIR:
+
+        return [registry.snapshot()]
+
+    write_snapshot()
+
+    snapshots = []
+
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+
+        if name == DEAD_WORKERS_FILE or not (
+            name.startswith("metrics_") and name.endswith(".json")
+        ):
+
+            continue
+
+        snapshot = _read_json(os.path.join(METRICS_MULTIPROC_DIR, name))
+
+        if snapshot is not None:
+
+            snapshots.append(snapshot)
+
+    # Lido por último: retire_worker grava o acumulador antes de apagar o arquivo do
+    # worker, então um snapshot já somado é reconhecido pelo id e nunca falta nem duplica
+    dead = _read_json(os.path.join(METRICS_MULTIPROC_DIR, DEAD_WORKERS_FILE))
+
+    if dead is not None:
+
+        merged = set(dead["merged"])
+
+        snapshots = [item for item in snapshots if item.get("id") not in merged]
+
+        snapshots.append(dead)
+
+    return snapshots
+
+
+def retire_worker(pid: int):
+    """
+    Soma os contadores e histogramas do worker `pid`, já encerrado, ao acumulador
+    DEAD_WORKERS_FILE e apaga o snapshot dele.
+    Observações:
+        - Chamado pelo master (hook child_exit do gunicorn em serve.py), um worker por vez,
+          inclusive para workers mortos sem gravar o snapshot final (SIGKILL, timeout).
+        - Mantém o diretório com um arquivo por worker vivo mais o acumulador, os
+          contadores nunca diminuem quando um worker é reciclado e um novo worker com o
+          mesmo pid não sobrescreve os valores do anterior.
+        - Gauges do worker encerrado são descartados.
+    """
+
+    if not METRICS_MULTIPROC_DIR:
+
+        return
+
+    path = _snapshot_path(pid)
+
+    snapshot = _read_json(path)
+
+    if snapshot is None:
+
+        return
+
+    dead_path = os.path.join(METRICS_MULTIPROC_DIR, DEAD_WORKERS_FILE)
+
+    dead = _read_json(dead_path) or {
+        "pid": 0,
+        "id": "dead",
+        "counters": [],
+        "gauges": [],
+        "histograms": [],
+        "merged": [],
+    }
+
+    if snapshot.get("id") not in dead["merged"]:
+
+        counters = {
+            (name, json.dumps(labels)): value for name, labels, value in dead["counters"]
+        }
+
+        for name, labels, value in snapshot["counters"]:
+
+            key = (name, json.dumps(labels))
+
+            counters[key] = counters.get(key, 0.0) + value
+
+        histograms = {
+            (name, json.dumps(labels)): [buckets, total, count]
+            for name, labels, buckets, total, count in dead["histograms"]
+        }
+
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+
+            key = (name, json.dumps(labels))
+
+            entry = histograms.get(key)
+
+            if entry is None:
+
+                histograms[key] = [list(buckets), total, count]
+
+                continue
+
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+
+            entry[1] += total
+
+            entry[2] += count
+
+        dead["counters"] = [
+            [name, json.loads(labels), value] for (name, labels), value in counters.items()
+        ]
+
+        dead["histograms"] = [
+            [name, json.loads(labels), *entry] for (name, labels), entry in histograms.items()
+        ]
+
+        dead["merged"] = (dead["merged"] + [snapshot.get("id")])[-DEAD_WORKERS_MERGED:]
+
+    try:
+
+        _write_json(dead_path, dead)
+
+        os.remove(path)
+
+    except OSError as e:
+
+        logger.error("Erro ao consolidar métricas do worker %s: %s", pid, e)
+
+
+def aggregate() -> dict:
+    """
+    Soma os snapshots de todos os workers.
+    Retorna:
+        dict: {"counters": {...}, "gauges": {...}, "histograms": {...}} indexados por
+        (nome, labels).
+    Observações:
+        - Contadores e histogramas de workers encerrados continuam somando (são cumulativos),
+          a partir do acumulador DEAD_WORKERS_FILE.
+        - Gauges consideram apenas processos vivos, para que requisições em andamento de
+          um worker morto não fiquem presas no valor.
+    """
+
+    counters: Dict[Tuple[str, Labels], float] = {}
+
+    gauges: Dict[Tuple[str, Labels], float] = {}
+
+    histograms: Dict[Tuple[str, Labels], list] = {}
+
+    for snapshot in _load_snapshots():
+
+        for name, labels, value in snapshot["counters"]:
+
+            key = (name, tuple(map(tuple, labels)))
+
+            counters[key] = counters.get(key, 0.0) + value
+
+        if snapshot["pid"] == os.getpid() or _pid_alive(snapshot["pid"]):
+
+            for name, labels, value in snapshot["gauges"]:
+
+                key = (name, tuple(map(tuple, labels)))
+
+                gauges[key] = gauges.get(key, 0.0) + value
+
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+
+            key = (name, tuple(map(tuple, labels)))
+
+            entry = histograms.get(key)
+
+            if entry is None:
+
+                histograms[key] = [list(buckets), total, count]
+
+                continue
+
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+
+            entry[1] += total
+
+            entry[2] += count
+
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+
+def _escape(value: str) -> str:
+
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+
+    pairs = list(labels) + ([extra] if extra else [])
+
+    if not pairs:
+
+        return ""
+
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+
+    if value == float("inf"):
+
+        return "+Inf"
+
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_metrics() -> str:
+    """
+    Gera a exposição em formato texto do Prometheus (versão 0.0.4) com as métricas
+    agregadas de todos os workers.
+    Retorna:
+        str: Conteúdo pronto para ser servido em /metrics.
+    """
+
+    data = aggregate()
+
+    lines = []
+
+    for metric, (kind, description) in _DEFINITIONS.items():
+
+        lines.append(f"# HELP {metric} {description}")
+
+        lines.append(f"# TYPE {metric} {kind}")
+
+        if kind == "histogram":
+
+            bounds = _BUCKETS[metric] + (float("inf"),)
+
+            for (name, labels), (buckets, total, count) in sorted(data["histograms"].items()):
+
+                if name != metric:
+
+                    continue
+
+                cumulative = 0
+
+                for bound, value in zip(bounds, buckets):
+
+                    cumulative += value
+
+                    le = _format_labels(labels, ("le", _format_value(bound)))
+
+                    lines.append(f"{metric}_bucket{le} {cumulative}")
+
+                lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(total)}")
+
+                lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+
+            continue
+
+        source = data["counters"] if kind == "counter" else data["gauges"]
+
+        for (name, labels), value in sorted(source.items()):
+
+            if name == metric:
+
+                lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _endpoint_name() -> str:
+
+    # "api.healthy_test_resource" -> "healthy_test_resource"
+    endpoint = request.endpoint
+
+    return endpoint.rsplit(".", 1)[-1] if endpoint else "unmatched"
+
+
+def _before_request():
+
+    labels = (("endpoint", _endpoint_name()), ("method", request.method))
+
+    g.metrics_labels = labels
+
+    g.metrics_start = time.perf_counter_ns()
+
+    registry.add_gauge("http_requests_in_flight", labels, 1)
+
+
+def _after_request(response):
+
+    labels = getattr(g, "metrics_labels", None)
+
+    if labels is None:
+
+        return response
+
+    elapsed = (time.perf_counter_ns() - g.metrics_start) / 1e9
+
+    registry.inc("http_requests_total", labels + (("status", str(response.status_code)),))
+
+    registry.observe("http_request_duration_seconds", labels, elapsed)
+
+    if response.content_length is not None:
+
+        registry.observe("http_response_size_bytes", labels, response.content_length)
+
+    return response
+
+
+def _teardown_request(exc):
+
+    labels = g.pop("metrics_labels", None)
+
+    if labels is not None:
+
+        registry.add_gauge("http_requests_in_flight", labels, -1)
+
+
+_flush_thread: Optional[threading.Thread] = None
+
+
+def _start_flush_thread():
+
+    global _flush_thread
+
+    if not METRICS_MULTIPROC_DIR or METRICS_FLUSH_INTERVAL <= 0:
+
+        return
+
+    def loop():
+
+        while True:
+
+            time.sleep(METRICS_FLUSH_INTERVAL)
+
+            write_snapshot()
+
+    _flush_thread = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+
+    _flush_thread.start()
+
+
+def _after_fork_in_child():
+
+    # O filho não deve herdar (e contar de novo) os valores do processo pai
+    registry.reset()
+
+    registry._lock = threading.Lock()
+
+    if _flush_thread is not None:
+
+        _start_flush_thread()
+
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def init_metrics(app: Flask):
+    """
+    Instrumenta a aplicação Flask para coletar métricas por requisição.
+    Parâmetros:
+        app (Flask): Aplicação a ser instrumentada.
+    Descrição:
+        - before_request: incrementa o gauge de requisições em andamento e marca o início.
+        - after_request: registra contagem por status, histograma de latência e de tamanho
+          da resposta, com labels endpoint (nome do Resource no flask-restx, sem o prefixo
+          do blueprint) e method.
+        - teardown_request: decrementa o gauge mesmo quando a requisição termina com exceção.
+    Efeitos colaterais:
+        - Com METRICS_MULTIPROC_DIR configurado, inicia uma thread que grava o snapshot do
+          worker periodicamente; o diretório deve ser limpo pelo servidor antes de iniciar
+          os workers.
+    """
+
+    if METRICS_MULTIPROC_DIR:
+
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+
+    app.before_request(_before_request)
+
+    app.after_request(_after_request)
+
+    app.teardown_request(_teardown_request)
+
+    if _flush_thread is None:
+
+        _start_flush_thread()
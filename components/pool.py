@@ -0,0 +1,633 @@
+import http.client
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from components.health import register_probe
+from components.logger import logger
+from components.metrics import registry
+from components.secrets import get_secret
+
+# Conexões mantidas abertas (pré-aquecidas) e limite por pool
+POOL_MIN_SIZE = int(os.getenv("POOL_MIN_SIZE", "1"))
+
+POOL_MAX_SIZE = int(os.getenv("POOL_MAX_SIZE", "10"))
+
+# Conexões ociosas há mais que isso (s) são fechadas, preservando POOL_MIN_SIZE
+POOL_IDLE_TIMEOUT = float(os.getenv("POOL_IDLE_TIMEOUT", "300"))
+
+# Espera máxima (s) por uma conexão livre antes de PoolTimeout
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("POOL_CHECKOUT_TIMEOUT", "5"))
+
+# Intervalo (s) da limpeza de conexões ociosas
+POOL_REAP_INTERVAL = float(os.getenv("POOL_REAP_INTERVAL", "30"))
+
+
+# Métodos repetidos automaticamente quando o keep-alive foi encerrado pelo servidor
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class PoolTimeout(Exception):
+    """
+    Nenhuma conexão ficou livre dentro do checkout_timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Pool genérico de conexões, thread-safe.
+    Parâmetros:
+        name (str): Nome do pool (label "pool" nas métricas e nome da probe de health).
+        factory (Callable): Cria uma nova conexão.
+        close (Callable, opcional): Fecha uma conexão. Padrão: conn.close().
+        reset (Callable, opcional): Chamado na devolução (ex.: rollback); se lançar
+            exceção, a conexão é descartada.
+        ping (Callable, opcional): Verificação usada pela probe de health.
+        min_size / max_size / idle_timeout / checkout_timeout: Padrão: POOL_*.
+    Comportamento:
+        - Conexões livres são reaproveitadas em ordem LIFO, mantendo as mais recentes
+          quentes e deixando as antigas expirarem por ociosidade.
+        - Sem conexão livre e com o pool cheio, o checkout espera até checkout_timeout e
+          então lança PoolTimeout. O tempo de espera vai para pool_checkout_wait_seconds.
+        - Após um fork as conexões herdadas nunca são fechadas nem finalizadas no filho (o
+          socket pertence ao processo pai) e o pool é recriado vazio.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable,
+        close: Optional[Callable] = None,
+        reset: Optional[Callable] = None,
+        ping: Optional[Callable] = None,
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+    ):
+
+        if not 0 <= min_size <= max_size or max_size < 1:
+
+            raise ValueError("É necessário 0 <= min_size <= max_size e max_size >= 1")
+
+        self.name = name
+
+        self.factory = factory
+
+        self._close = close or (lambda conn: conn.close())
+
+        self._reset = reset
+
+        self.ping = ping
+
+        self.min_size = min_size
+
+        self.max_size = max_size
+
+        self.idle_timeout = idle_timeout
+
+        self.checkout_timeout = checkout_timeout
+
+        self._labels = (("pool", name),)
+
+        self._init_state()
+
+    def _init_state(self):
+
+        # Conexões livres: (conexão, instante da devolução)
+        self._idle: deque = deque()
+
+        self._size = 0
+
+        self._waiting = 0
+
+        self._condition = threading.Condition(threading.Lock())
+
+    def _gauge(self, state: str, delta: int):
+
+        registry.add_gauge("pool_connections", self._labels + (("state", state),), delta)
+
+    def _discard(self, conn):
+
+        try:
+
+            self._close(conn)
+
+        except Exception as e:
+
+            logger.warning("Erro ao fechar conexão do pool %s: %s", self.name, e)
+
+    def _create(self):
+
+        try:
+
+            return self.factory()
+
+        except Exception:
+
+            with self._condition:
+
+                self._size -= 1
+
+                self._condition.notify()
+
+            raise
+
+    def prewarm(self):
+        """
+        Abre conexões até min_size.
+        """
+
+        while True:
+
+            with self._condition:
+
+                if self._size >= self.min_size:
+
+                    return
+
+                self._size += 1
+
+            conn = self._create()
+
+            self._gauge("idle", 1)
+
+            with self._condition:
+
+                self._idle.append((conn, time.monotonic()))
+
+                self._condition.notify()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Obtém uma conexão; deve ser devolvida com release(). Prefira connection().
+        """
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+
+        start = time.monotonic()
+
+        deadline = start + timeout
+
+        with self._condition:
+
+            while not self._idle and self._size >= self.max_size:
+
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+
+                    registry.inc("pool_checkout_timeouts_total", self._labels)
+
+                    raise PoolTimeout(f"Pool {self.name}: nenhuma conexão livre em {timeout}s")
+
+                self._waiting += 1
+
+                try:
+
+                    self._condition.wait(remaining)
+
+                finally:
+
+                    self._waiting -= 1
+
+            if self._idle:
+
+                conn, _ = self._idle.pop()
+
+                self._gauge("idle", -1)
+
+            else:
+
+                conn = None
+
+                self._size += 1
+
+        registry.observe("pool_checkout_wait_seconds", self._labels, time.monotonic() - start)
+
+        if conn is None:
+
+            conn = self._create()
+
+        self._gauge("in_use", 1)
+
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """
+        Devolve a conexão. Com discard=True (ou se reset falhar) ela é fechada.
+        """
+
+        self._gauge("in_use", -1)
+
+        if not discard and self._reset is not None:
+
+            try:
+
+                self._reset(conn)
+
+            except Exception:
+
+                discard = True
+
+        if discard:
+
+            self._discard(conn)
+
+            with self._condition:
+
+                self._size -= 1
+
+                self._condition.notify()
+
+            return
+
+        with self._condition:
+
+            self._idle.append((conn, time.monotonic()))
+
+            self._condition.notify()
+
+        self._gauge("idle", 1)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Context manager de checkout:
+            with pool.connection() as conn: ...
+        Após uma exceção dentro do bloco a conexão só volta ao pool se o reset (ex.:
+        rollback) funcionar; sem reset ela é descartada, pois pode estar em estado inválido.
+        """
+
+        conn = self.acquire(timeout)
+
+        try:
+
+            yield conn
+
+        except BaseException:
+
+            self.release(conn, discard=self._reset is None)
+
+            raise
+
+        self.release(conn)
+
+    def evict_idle(self) -> int:
+        """
+        Fecha conexões ociosas há mais de idle_timeout, mantendo ao menos min_size abertas.
+        Retorna:
+            int: Quantidade de conexões fechadas.
+        """
+
+        expired = []
+
+        limit = time.monotonic() - self.idle_timeout
+
+        with self._condition:
+
+            # As mais antigas ficam no início da deque (LIFO no checkout)
+            while self._idle and self._size > self.min_size and self._idle[0][1] < limit:
+
+                expired.append(self._idle.popleft()[0])
+
+                self._size -= 1
+
+        for conn in expired:
+
+            self._gauge("idle", -1)
+
+            self._discard(conn)
+
+        return len(expired)
+
+    def close(self):
+        """
+        Fecha todas as conexões livres (as em uso são fechadas ao serem devolvidas).
+        """
+
+        with self._condition:
+
+            idle, self._idle = list(self._idle), deque()
+
+            self._size -= len(idle)
+
+        for conn, _ in idle:
+
+            self._gauge("idle", -1)
+
+            self._discard(conn)
+
+    def stats(self) -> dict:
+
+        with self._condition:
+
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "max_size": self.max_size,
+            }
+
+    def check(self) -> dict:
+        """
+        Probe de health: faz checkout e, se houver, executa ping na conexão.
+        """
+
+        with self.connection(timeout=min(self.checkout_timeout, 1.0)) as conn:
+
+            if self.ping is not None:
+
+                self.ping(conn)
+
+        return self.stats()
+
+    def reinit_after_fork(self):
+
+        # As conexões herdadas continuam referenciadas: se fossem coletadas, o destrutor do
+        # driver (ex.: PQfinish no psycopg) encerraria a sessão pelo socket do processo pai
+        _inherited.extend(conn for conn, _ in self._idle)
+
+        self._init_state()
+
+
+def _rollback(conn):
+
+    conn.rollback()
+
+
+def _select_one(conn):
+
+    cursor = conn.cursor()
+
+    try:
+
+        cursor.execute("SELECT 1")
+
+        cursor.fetchall()
+
+    finally:
+
+        cursor.close()
+
+
+class DBPool(ConnectionPool):
+    """
+    Pool de conexões DB-API 2.0 (sqlite3, psycopg, pymysql...).
+    Parâmetros:
+        name (str): Nome do pool.
+        connect (Callable): Função connect do driver, chamada com o DSN.
+        dsn (str, opcional): Padrão: get_secret(f"{name}_dsn").
+        connect_kwargs (dict, opcional): Argumentos extras de connect().
+        **kwargs: Repassados para ConnectionPool.
+    Observações:
+        - Cada devolução executa rollback(), então nenhuma transação aberta volta ao pool;
+          faça commit() dentro do bloco.
+        - A probe de health executa "SELECT 1".
+    Exemplo:
+        pool = register_pool(
+            DBPool("database", sqlite3.connect, connect_kwargs={"check_same_thread": False})
+        )
+        with pool.connection() as conn:
+            conn.execute(...)
+            conn.commit()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable,
+        dsn: Optional[str] = None,
+        connect_kwargs: Optional[dict] = None,
+        **kwargs,
+    ):
+
+        self.dsn = dsn if dsn is not None else get_secret(f"{name}_dsn")
+
+        self.connect_kwargs = dict(connect_kwargs or {})
+
+        super().__init__(
+            name,
+            lambda: connect(self.dsn, **self.connect_kwargs),
+            reset=_rollback,
+            ping=_select_one,
+            **kwargs,
+        )
+
+
+class HTTPPool(ConnectionPool):
+    """
+    Pool de conexões HTTP/1.1 keep-alive para um serviço (http.client, sem dependências).
+    Parâmetros:
+        name (str): Nome do pool.
+        base_url (str, opcional): Padrão: get_secret(f"{name}_url").
+        timeout (float, opcional): Timeout de socket (s). Padrão: 10.
+        health_path (str, opcional): Path consultado pela probe de health. Padrão: "/".
+        **kwargs: Repassados para ConnectionPool.
+    Comportamento:
+        - Conexões reaproveitadas que foram fechadas pelo servidor (keep-alive expirado)
+          são recriadas e a requisição é repetida uma vez, apenas para métodos
+          idempotentes (IDEMPOTENT_METHODS) ou com retry=True: o servidor pode já ter
+          processado um POST/PATCH antes de fechar a conexão.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: Optional[str] = None,
+        timeout: float = 10.0,
+        health_path: str = "/",
+        **kwargs,
+    ):
+
+        self.base_url = (base_url if base_url is not None else get_secret(f"{name}_url")) or ""
+
+        parts = urlsplit(self.base_url)
+
+        self.prefix = parts.path.rstrip("/")
+
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+
+        self.health_path = health_path
+
+        super().__init__(
+            name,
+            lambda: connection_class(parts.hostname, parts.port, timeout=timeout),
+            ping=self._ping,
+            **kwargs,
+        )
+
+    def _send(self, conn, method: str, path: str, body, headers: dict) -> Tuple[int, dict, bytes]:
+
+        conn.request(method, self.prefix + path, body=body, headers=headers)
+
+        response = conn.getresponse()
+
+        return response.status, dict(response.getheaders()), response.read()
+
+    def _ping(self, conn):
+
+        status, _, _ = self._send(conn, "GET", self.health_path, None, {})
+
+        if status >= 500:
+
+            raise RuntimeError(f"{self.name} respondeu {status}")
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body=None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[bool] = None,
+    ) -> Tuple[int, dict, bytes]:
+        """
+        Executa uma requisição em uma conexão do pool.
+        Parâmetros:
+            retry (bool, opcional): Repete uma vez se a conexão reaproveitada tiver sido
+                fechada pelo servidor. Padrão: só para IDEMPOTENT_METHODS; passe True em
+                POST/PATCH seguros para repetir (ex.: com Idempotency-Key).
+        Retorna:
+            Tuple[int, dict, bytes]: (status, headers, corpo).
+        """
+
+        headers = headers or {}
+
+        if retry is None:
+
+            retry = method.upper() in IDEMPOTENT_METHODS
+
+        try:
+
+            with self.connection(timeout) as conn:
+
+                return self._send(conn, method, path, body, headers)
+
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+
+            if not retry:
+
+                raise
+
+            # Keep-alive encerrado pelo servidor; connection() já descartou a conexão
+            with self.connection(timeout) as conn:
+
+                return self._send(conn, method, path, body, headers)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+
+_reaper: Optional[threading.Thread] = None
+
+# Conexões livres herdadas do processo pai, mantidas vivas (e nunca usadas) no filho
+_inherited: list = []
+
+
+def register_pool(pool: ConnectionPool, probe: bool = True, critical: bool = True) -> ConnectionPool:
+    """
+    Registra o pool para pré-aquecimento (prewarm_pools), limpeza de ociosas e
+    recriação após fork; com probe=True também o registra em /healthy/ready.
+    """
+
+    _pools[pool.name] = pool
+
+    if probe:
+
+        register_probe(pool.name, pool.check, critical=critical)
+
+    _start_reaper()
+
+    return pool
+
+
+def get_pool(name: str) -> ConnectionPool:
+
+    return _pools[name]
+
+
+def pool_stats() -> dict:
+
+    return {name: pool.stats() for name, pool in _pools.items()}
+
+
+def prewarm_pools():
+    """
+    Abre min_size conexões de cada pool registrado. Falhas são logadas sem impedir a
+    inicialização; a probe de readiness reporta a dependência indisponível.
+    """
+
+    for pool in _pools.values():
+
+        try:
+
+            pool.prewarm()
+
+        except Exception as e:
+
+            logger.error("Falha ao pré-aquecer o pool %s: %s", pool.name, e)
+
+
+def _start_reaper():
+
+    global _reaper
+
+    if _reaper is not None and _reaper.is_alive() or POOL_REAP_INTERVAL <= 0:
+
+        return
+
+    def loop():
+
+        while True:
+
+            time.sleep(POOL_REAP_INTERVAL)
+
+            for pool in list(_pools.values()):
+
+                pool.evict_idle()
+
+    _reaper = threading.Thread(target=loop, name="pool-reaper", daemon=True)
+
+    _reaper.start()
+
+
+def init_worker_pools():
+    """
+    Reinicia a limpeza de ociosas e pré-aquece os pools em um worker recém-criado.
+    Chamado pelo hook post_fork do gunicorn (serve.py): outros filhos do processo, como os
+    do ProcessPoolExecutor de components.tasks, não abrem conexões nem threads por conta
+    própria.
+    """
+
+    if not _pools:
+
+        return
+
+    _start_reaper()
+
+    # Pré-aquece em background para não atrasar o boot do worker
+    threading.Thread(target=prewarm_pools, name="pool-prewarm", daemon=True).start()
+
+
+def _after_fork_in_child():
+
+    global _reaper
+
+    # Em qualquer filho: pools vazios e a thread de limpeza do pai não existe mais
+    for pool in _pools.values():
+
+        pool.reinit_after_fork()
+
+    _reaper = None
+
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,340 @@
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import wraps
+from typing import Dict, List, Optional
+
+from flask import Flask, g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_restx import abort
+from jwt import PyJWTError
+
+from components.logger import logger
+from components.timer import TIMER_SLOW_MS
+from components.tracing import current_request_id
+
+# Habilita as rotas de /profiler (opt-in)
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+
+# Intervalo (ms) entre amostras de pilha
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+
+# Duração máxima (s) de uma sessão de profiling sob demanda
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "30"))
+
+# Requisições acima deste tempo (ms) têm as pilhas capturadas; padrão: TIMER_SLOW_MS (0 desativa)
+PROFILER_SLOW_MS = float(os.getenv("PROFILER_SLOW_MS", str(TIMER_SLOW_MS)))
+
+# Quantidade de requisições lentas mantidas em memória
+PROFILER_SLOW_BUFFER = int(os.getenv("PROFILER_SLOW_BUFFER", "50"))
+
+# Profundidade máxima das pilhas amostradas
+PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", "128"))
+
+
+def collapse_frame(frame) -> str:
+    """
+    Converte a pilha de `frame` para o formato "collapsed" (raiz;...;folha), aceito por
+    flamegraph.pl, speedscope e similares.
+    """
+
+    names = []
+
+    while frame is not None and len(names) < PROFILER_MAX_DEPTH:
+
+        code = frame.f_code
+
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+
+        frame = frame.f_back
+
+    names.reverse()
+
+    return ";".join(names)
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """
+    Serializa as contagens de pilhas como texto "pilha contagem" (uma por linha).
+    """
+
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem: a cada PROFILER_INTERVAL_MS lê as pilhas de todas as threads
+    (sys._current_frames) e conta as pilhas iguais. Não instrumenta as funções, então o
+    custo é proporcional à frequência de amostragem e não à quantidade de chamadas.
+    Observações:
+        - Apenas uma sessão por processo por vez; profile() retorna None se houver outra.
+    """
+
+    def __init__(self, interval_ms: float = PROFILER_INTERVAL_MS):
+
+        self.interval = interval_ms / 1000
+
+        self._busy = threading.Lock()
+
+    def profile(self, seconds: float) -> Optional[Counter]:
+        """
+        Amostra todas as threads (exceto a chamadora) por `seconds` segundos.
+        Retorna:
+            Counter | None: pilha collapsed -> quantidade de amostras; None se outra
+            sessão já estiver em andamento.
+        """
+
+        if not self._busy.acquire(blocking=False):
+
+            return None
+
+        try:
+
+            stacks: Counter = Counter()
+
+            own = threading.get_ident()
+
+            deadline = time.monotonic() + seconds
+
+            while time.monotonic() < deadline:
+
+                for ident, frame in sys._current_frames().items():
+
+                    if ident != own:
+
+                        stacks[collapse_frame(frame)] += 1
+
+                time.sleep(self.interval)
+
+            return stacks
+
+        finally:
+
+            self._busy.release()
+
+
+profiler = SamplingProfiler()
+
+
+class SlowRequestRecorder:
+    """
+    Captura as pilhas de requisições que passam de `slow_ms`.
+    Comportamento:
+        - Um watchdog acompanha as requisições em andamento; quando uma delas passa do
+          limite, sua thread passa a ser amostrada a cada PROFILER_INTERVAL_MS até terminar.
+          Requisições rápidas custam apenas o registro de início/fim.
+        - Ao terminar, a requisição lenta é guardada (método, path, duração, request_id e
+          pilhas collapsed) em um buffer circular de `capacity` entradas.
+    """
+
+    def __init__(
+        self,
+        slow_ms: float = PROFILER_SLOW_MS,
+        capacity: int = PROFILER_SLOW_BUFFER,
+        interval_ms: float = PROFILER_INTERVAL_MS,
+    ):
+
+        self.slow_s = slow_ms / 1000
+
+        self.interval = interval_ms / 1000
+
+        self.entries: deque = deque(maxlen=capacity)
+
+        self._ids = itertools.count(1)
+
+        # ident da thread -> [início, Counter de pilhas]
+        self._active: Dict[int, list] = {}
+
+        self._lock = threading.Lock()
+
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+
+        if self._thread is not None and self._thread.is_alive():
+
+            return
+
+        self._thread = threading.Thread(target=self._loop, name="slow-request-watchdog", daemon=True)
+
+        self._thread.start()
+
+    def _loop(self):
+
+        while True:
+
+            time.sleep(self.interval)
+
+            now = time.monotonic()
+
+            with self._lock:
+
+                slow = [
+                    (ident, state)
+                    for ident, state in self._active.items()
+                    if now - state[0] >= self.slow_s
+                ]
+
+            if not slow:
+
+                continue
+
+            frames = sys._current_frames()
+
+            for ident, state in slow:
+
+                frame = frames.get(ident)
+
+                if frame is not None:
+
+                    state[1][collapse_frame(frame)] += 1
+
+    def begin(self):
+
+        with self._lock:
+
+            self._active[threading.get_ident()] = [time.monotonic(), Counter()]
+
+    def end(self, method: str, path: str, status: Optional[int]):
+
+        with self._lock:
+
+            state = self._active.pop(threading.get_ident(), None)
+
+        if state is None:
+
+            return
+
+        elapsed = time.monotonic() - state[0]
+
+        if elapsed < self.slow_s:
+
+            return
+
+        self.entries.append(
+            {
+                "id": next(self._ids),
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 3),
+                "request_id": current_request_id(),
+                "captured_at": time.time(),
+                "samples": sum(state[1].values()),
+                "stacks": render_collapsed(state[1]),
+            }
+        )
+
+    def summaries(self) -> List[dict]:
+
+        return [{k: v for k, v in entry.items() if k != "stacks"} for entry in self.entries]
+
+    def get(self, entry_id: int) -> Optional[dict]:
+
+        return next((entry for entry in self.entries if entry["id"] == entry_id), None)
+
+    def clear(self):
+
+        self.entries.clear()
+
+    def reinit_after_fork(self):
+
+        self._lock = threading.Lock()
+
+        self._active = {}
+
+        if self._thread is not None:
+
+            self._thread = None
+
+            self.start()
+
+
+slow_requests = SlowRequestRecorder()
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=slow_requests.reinit_after_fork)
+
+
+def admin_required(function):
+    """
+    Restringe um método de Resource a tokens JWT com a claim "admin": true.
+    Responde 404 enquanto PROFILER_ENABLED não estiver ativo, sem revelar a rota; 401 sem
+    token ou com token inválido/expirado e 403 para tokens válidos sem a claim.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+
+        if not PROFILER_ENABLED:
+
+            abort(404)
+
+        # O handle_error do flask-restx transformaria estas exceções em 500
+        try:
+
+            verify_jwt_in_request()
+
+        except (JWTExtendedException, PyJWTError):
+
+            abort(401, "Token de administrador ausente ou inválido")
+
+        if get_jwt().get("admin") is not True:
+
+            abort(403, "Acesso restrito a administradores")
+
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def _before_request():
+
+    slow_requests.begin()
+
+    g.profiler_tracked = True
+
+
+def _after_request(response):
+
+    g.profiler_status = response.status_code
+
+    return response
+
+
+def _teardown_request(exc):
+
+    if g.pop("profiler_tracked", False):
+
+        slow_requests.end(request.method, request.path, g.pop("profiler_status", None))
+
+
+def init_profiler(app: Flask):
+    """
+    Habilita a captura das pilhas de requisições lentas.
+    Comportamento:
+        - Ativa apenas se PROFILER_SLOW_MS > 0 (padrão: o mesmo limite de TIMER_SLOW_MS).
+        - As capturas ficam em slow_requests e são consultadas em /profiler/slow.
+    Observações:
+        - Deve ser registrado após init_tracing para que o request_id seja associado à
+          captura.
+    """
+
+    if PROFILER_SLOW_MS <= 0:
+
+        return
+
+    app.before_request(_before_request)
+
+    app.after_request(_after_request)
+
+    app.teardown_request(_teardown_request)
+
+    slow_requests.start()
+
+    logger.info("Captura de requisições lentas ativa (> %sms)", PROFILER_SLOW_MS)
@@ -0,0 +1,302 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from components.logger import logger
+
+# Taxa (requisições/s) e rajada por cliente; RATE_LIMIT_RATE=0 desativa o rate limit
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "0"))
+
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+
+# Máximo de clientes acompanhados em memória e tempo (s) até um cliente ocioso ser descartado
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+
+RATE_LIMIT_IDLE_TTL = float(os.getenv("RATE_LIMIT_IDLE_TTL", "300"))
+
+# Namespaces isentos (primeiro segmento do path)
+RATE_LIMIT_EXEMPT = tuple(
+    name for name in os.getenv("RATE_LIMIT_EXEMPT", "healthy,metrics").split(",") if name
+)
+
+# Usa o primeiro IP de X-Forwarded-For (somente atrás de um proxy confiável)
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+# Requisições simultâneas por processo; 0 desativa o load shedding
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "0"))
+
+Limit = Tuple[float, float]
+
+
+class RateLimitBackend:
+    """
+    Interface dos contadores de rate limit.
+    Implementações compartilhadas (ex.: Redis com script atômico) devem implementar
+    consume(); MemoryRateLimitBackend é a implementação em processo e o stand-in de testes.
+    """
+
+    def consume(
+        self, key: str, rate: float, burst: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        """
+        Consome `cost` tokens do bucket de `key`.
+        Retorna:
+            Tuple[bool, float]: (permitido, segundos até haver tokens suficientes).
+        """
+
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets em memória, O(1) por requisição.
+    Parâmetros:
+        max_clients (int): Máximo de buckets mantidos; o menos recente é descartado.
+        idle_ttl (float): Buckets sem uso há mais que isso são descartados.
+    Observações:
+        - Um bucket descartado equivale a um bucket cheio, então a eviction nunca
+          bloqueia um cliente indevidamente.
+        - A cada consumo, no máximo dois buckets ociosos são descartados, mantendo o custo
+          constante.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+        idle_ttl: float = RATE_LIMIT_IDLE_TTL,
+    ):
+
+        self.max_clients = max_clients
+
+        self.idle_ttl = idle_ttl
+
+        # chave -> [tokens, último acesso]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+        self._lock = threading.Lock()
+
+    def consume(
+        self, key: str, rate: float, burst: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+
+                bucket = self._buckets[key] = [burst, now]
+
+            else:
+
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+                bucket[1] = now
+
+                self._buckets.move_to_end(key)
+
+            self._evict(now)
+
+            if bucket[0] >= cost:
+
+                bucket[0] -= cost
+
+                return True, 0.0
+
+            return False, (cost - bucket[0]) / rate if rate else float("inf")
+
+    def _evict(self, now: float):
+
+        buckets = self._buckets
+
+        if len(buckets) > self.max_clients:
+
+            buckets.popitem(last=False)
+
+        for _ in range(2):
+
+            oldest = next(iter(buckets.values()), None)
+
+            if oldest is None or now - oldest[1] < self.idle_ttl:
+
+                break
+
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Rate limit por cliente e controle de admissão (load shedding) para a aplicação Flask.
+    Parâmetros:
+        default (Limit, opcional): (taxa por segundo, rajada) aplicado a todos os namespaces.
+            None desativa o rate limit padrão.
+        namespaces (dict, opcional): Limites por namespace (primeiro segmento do path);
+            None isenta o namespace do rate limit e do limite de concorrência.
+        backend (RateLimitBackend, opcional): Armazenamento dos buckets.
+        max_concurrent (int, opcional): Requisições simultâneas por processo; 0 desativa.
+    Comportamento:
+        - O cliente é identificado pela identidade do JWT, quando houver um token válido,
+          ou pelo IP.
+        - Acima do limite responde 429 com Retry-After; acima da concorrência máxima
+          responde 503 com Retry-After, sem enfileirar a requisição.
+    """
+
+    def __init__(
+        self,
+        default: Optional[Limit] = None,
+        namespaces: Optional[Dict[str, Optional[Limit]]] = None,
+        backend: Optional[RateLimitBackend] = None,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+    ):
+
+        self.default = default
+
+        self.namespaces = dict(namespaces or {})
+
+        self.backend = backend or MemoryRateLimitBackend()
+
+        self.max_concurrent = max_concurrent
+
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def limit_for(self, path: str) -> Tuple[bool, Optional[Limit]]:
+        """
+        Retorna (isento, limite) para o namespace do path.
+        """
+
+        namespace = path.lstrip("/").split("/", 1)[0]
+
+        if namespace in self.namespaces:
+
+            limit = self.namespaces[namespace]
+
+            return limit is None, limit
+
+        return False, self.default
+
+    def client_key(self) -> str:
+
+        if "Authorization" in request.headers:
+
+            try:
+
+                verify_jwt_in_request(optional=True)
+
+                identity = get_jwt_identity()
+
+                if identity is not None:
+
+                    return f"user:{identity}"
+
+            except Exception:
+
+                pass
+
+        if RATE_LIMIT_TRUST_PROXY and "X-Forwarded-For" in request.headers:
+
+            return "ip:" + request.headers["X-Forwarded-For"].split(",", 1)[0].strip()
+
+        return f"ip:{request.remote_addr}"
+
+    def _reject(self, status: int, message: str, retry_after: float):
+
+        response = jsonify({"message": message})
+
+        response.status_code = status
+
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+
+        return response
+
+    def before_request(self):
+
+        exempt, limit = self.limit_for(request.path)
+
+        if exempt:
+
+            return None
+
+        if self._slots is not None:
+
+            if not self._slots.acquire(blocking=False):
+
+                return self._reject(503, "Servidor sobrecarregado, tente novamente", 1)
+
+            g.rate_limit_slot = True
+
+        if limit is None:
+
+            return None
+
+        rate, burst = limit
+
+        allowed, retry_after = self.backend.consume(self.client_key(), rate, burst)
+
+        if not allowed:
+
+            return self._reject(429, "Limite de requisições excedido", retry_after)
+
+        return None
+
+    def teardown_request(self, exc):
+
+        if g.pop("rate_limit_slot", False):
+
+            self._slots.release()
+
+    def init_app(self, app: Flask):
+
+        app.before_request(self.before_request)
+
+        app.teardown_request(self.teardown_request)
+
+
+def init_rate_limit(
+    app: Flask,
+    namespaces: Optional[Dict[str, Optional[Limit]]] = None,
+    backend: Optional[RateLimitBackend] = None,
+) -> RateLimiter:
+    """
+    Configura o rate limit e o load shedding a partir das variáveis de ambiente.
+    Parâmetros:
+        app (Flask): Aplicação a proteger.
+        namespaces (dict, opcional): Limites por namespace que sobrescrevem os padrões.
+        backend (RateLimitBackend, opcional): Backend compartilhado de contadores.
+    Retorna:
+        RateLimiter: O limitador instalado.
+    Observações:
+        - RATE_LIMIT_RATE/RATE_LIMIT_BURST definem o limite padrão (0 desativa).
+        - Namespaces em RATE_LIMIT_EXEMPT (padrão: healthy,metrics) ficam isentos.
+        - MAX_CONCURRENT_REQUESTS limita requisições simultâneas por processo.
+        - Deve ser chamado após init_metrics para que as rejeições apareçam em /metrics.
+    """
+
+    limits: Dict[str, Optional[Limit]] = {name: None for name in RATE_LIMIT_EXEMPT}
+
+    limits.update(namespaces or {})
+
+    default = (RATE_LIMIT_RATE, RATE_LIMIT_BURST) if RATE_LIMIT_RATE > 0 else None
+
+    limiter = RateLimiter(default, limits, backend)
+
+    limiter.init_app(app)
+
+    if default or limiter.max_concurrent:
+
+        logger.info(
+            "Rate limit: padrão=%s concorrência máxima=%s", default, limiter.max_concurrent
+        )
+
+    return limiter
@@ -1,32 +1,304 @@
 import os
-from typing import Union
+import threading
+import time
+from typing import Dict, Iterable, Optional, Union
 
 from components.logger import logger
 
+SECRETS_DIR = os.getenv("SECRETS_DIR", "private")
 
-def get_secret(secret_key: str) -> Union[str, bool]:
+# Tempo (s) até uma secret em cache ser revalidada (stat do arquivo)
+SECRETS_TTL = float(os.getenv("SECRETS_TTL", "30"))
+
+# Intervalo (s) da verificação de mtime em background; 0 desativa
+SECRETS_WATCH_INTERVAL = float(os.getenv("SECRETS_WATCH_INTERVAL", "0"))
+
+
+class _Entry:
+
+    __slots__ = ("value", "version", "checked_at")
+
+    def __init__(self, value: Union[str, bool], version: Optional[tuple], checked_at: float):
+
+        self.value = value
+
+        self.version = version
+
+        self.checked_at = checked_at
+
+
+class SecretStore:
+    """
+    Cache em memória das secrets lidas do diretório 'private/'.
+    Parâmetros:
+        directory (str): Diretório dos arquivos de secrets. Padrão: SECRETS_DIR ("private").
+        ttl (float): Segundos até uma entrada ser revalidada. Padrão: SECRETS_TTL.
+    Comportamento:
+        - Variáveis de ambiente têm precedência e não são cacheadas (leitura de dict).
+        - Arquivos são lidos uma vez; após o TTL a entrada é revalidada com um stat() e só é
+          relida se o mtime mudou. Ausências também são cacheadas para evitar syscalls em
+          sequência para uma secret inexistente.
+        - A thread opcional de watch (start_watcher) revalida todas as entradas pelo mtime,
+          de modo que rotações (ex.: jwt_secret_key) entram em vigor sem restart.
+        - Leituras não usam lock; cargas e invalidações são serializadas por um RLock.
+    """
+
+    def __init__(self, directory: str = SECRETS_DIR, ttl: float = SECRETS_TTL):
+
+        self.directory = directory
+
+        self.ttl = ttl
+
+        self._entries: Dict[str, _Entry] = {}
+
+        self._lock = threading.RLock()
+
+        self._watcher: Optional[threading.Thread] = None
+
+        self._watch_interval = SECRETS_WATCH_INTERVAL
+
+    def _path(self, secret_key: str) -> str:
+
+        return os.path.join(self.directory, secret_key)
+
+    def _load(
+        self, secret_key: str, previous: Optional[_Entry] = None, optional: bool = False
+    ) -> _Entry:
+
+        path = self._path(secret_key)
+
+        now = time.monotonic()
+
+        try:
+
+            stat = os.stat(path)
+
+        except FileNotFoundError:
+
+            if previous is None or previous.version is not None:
+
+                # Secrets opcionais (ex.: jwt_keys) ausentes são uma configuração válida
+                (logger.debug if optional else logger.error)("%s não encontrado", secret_key)
+
+            return _Entry(False, None, now)
+
+        except Exception as e:
+
+            logger.error("Erro ao tentar abrir %s: %s", secret_key, e)
+
+            return _Entry(False, None, now)
+
+        # mtime sozinho pode não mudar em sistemas de arquivos com baixa resolução
+        version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        if previous is not None and previous.version == version:
+
+            previous.checked_at = now
+
+            return previous
+
+        try:
+
+            with open(path) as f:
+
+                value = f.read().strip()
+
+        except Exception as e:
+
+            logger.error("Erro ao tentar abrir %s: %s", secret_key, e)
+
+            return _Entry(False, None, now)
+
+        if previous is not None and previous.version is not None:
+
+            logger.info("%s recarregada", secret_key)
+
+        else:
+
+            logger.debug("%s encontrada com sucesso", secret_key)
+
+        return _Entry(value, version, now)
+
+    def _refresh(self, secret_key: str, optional: bool = False) -> _Entry:
+
+        with self._lock:
+
+            entry = self._entries.get(secret_key)
+
+            # Outra thread pode ter recarregado enquanto esperávamos o lock
+            if entry is None or time.monotonic() - entry.checked_at >= self.ttl:
+
+                entry = self._entries[secret_key] = self._load(secret_key, entry, optional)
+
+            return entry
+
+    def get(self, secret_key: str, optional: bool = False) -> Union[str, bool]:
+        """
+        Retorna a secret (variável de ambiente ou arquivo em cache) ou False se não existir.
+        Com optional=True a ausência é registrada em DEBUG em vez de ERROR.
+        """
+
+        if not secret_key:
+
+            logger.error("Chave de senha não fornecida")
+
+            return False
+
+        value = os.environ.get(secret_key)
+
+        if value is not None:
+
+            return value
+
+        entry = self._entries.get(secret_key)
+
+        if entry is None or time.monotonic() - entry.checked_at >= self.ttl:
+
+            entry = self._refresh(secret_key, optional)
+
+        return entry.value
+
+    def invalidate(self, secret_key: Optional[str] = None):
+        """
+        Remove uma secret do cache (ou todas, se secret_key for None); a próxima leitura
+        volta ao disco.
+        """
+
+        with self._lock:
+
+            if secret_key is None:
+
+                self._entries.clear()
+
+            else:
+
+                self._entries.pop(secret_key, None)
+
+    def preload(self, keys: Optional[Iterable[str]] = None) -> int:
+        """
+        Carrega em lote as secrets informadas ou, por padrão, todos os arquivos do diretório.
+        Retorna:
+            int: Quantidade de secrets carregadas com sucesso.
+        """
+
+        if keys is None:
+
+            try:
+
+                keys = [
+                    entry.name for entry in os.scandir(self.directory) if entry.is_file()
+                ]
+
+            except FileNotFoundError:
+
+                return 0
+
+        loaded = 0
+
+        with self._lock:
+
+            for key in keys:
+
+                entry = self._entries[key] = self._load(key, self._entries.get(key))
+
+                loaded += entry.value is not False
+
+        logger.debug("%d secrets pré-carregadas de %s", loaded, self.directory)
+
+        return loaded
+
+    def reload_changed(self):
+        """
+        Revalida pelo mtime todas as secrets em cache, relendo apenas as alteradas.
+        """
+
+        with self._lock:
+
+            for key, entry in list(self._entries.items()):
+
+                self._entries[key] = self._load(key, entry)
+
+    def start_watcher(self, interval: Optional[float] = None):
+        """
+        Inicia uma thread daemon que chama reload_changed() a cada `interval` segundos.
+        Observações:
+            - Usa polling de mtime (portável e sem dependências) em vez de inotify.
+            - Idempotente; valores <= 0 não iniciam nada.
+            - Padrão de interval: variável de ambiente SECRETS_WATCH_INTERVAL.
+        """
+
+        interval = self._watch_interval = (
+            SECRETS_WATCH_INTERVAL if interval is None else interval
+        )
+
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+
+            return
+
+        def loop():
+
+            while True:
+
+                time.sleep(interval)
+
+                try:
+
+                    self.reload_changed()
+
+                except Exception as e:
+
+                    logger.error("Erro ao recarregar secrets: %s", e)
+
+        self._watcher = threading.Thread(target=loop, name="secrets-watcher", daemon=True)
+
+        self._watcher.start()
+
+    def reinit_after_fork(self):
+        """
+        Recria lock e thread de watch no processo filho (pre-fork com preload).
+        """
+
+        self._lock = threading.RLock()
+
+        if self._watcher is not None:
+
+            self._watcher = None
+
+            self.start_watcher(self._watch_interval)
+
+
+secret_store = SecretStore()
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=secret_store.reinit_after_fork)
+
+
+def get_secret(secret_key: str, optional: bool = False) -> Union[str, bool]:
     """
     Recupera uma "secret" (segredo) a partir de uma variável de ambiente ou de um arquivo.
     Fluxo:
     1. Se secret_key for falsy (None, string vazia, etc.), registra um erro e retorna False.
     2. Verifica se existe uma variável de ambiente com o nome secret_key:
-        - se existir (ou seja, os.getenv(secret_key) não é None), retorna o valor (pode ser string vazia).
-    3. Caso contrário, tenta abrir o arquivo 'private/{secret_key}' relativo ao diretório de trabalho atual:
-        - se o arquivo existir, lê seu conteúdo, faz strip() e retorna a string resultante.
-        - se o arquivo não for encontrado, registra erro e retorna False.
-        - em caso de qualquer outra exceção ao abrir/ler, registra o erro com a exceção e retorna False.
+        - se existir, retorna o valor (pode ser string vazia).
+    3. Caso contrário, consulta o SecretStore global, que lê 'private/{secret_key}' relativo
+       ao diretório de trabalho atual apenas na primeira chamada:
+        - se o arquivo existir, retorna seu conteúdo com strip().
+        - se o arquivo não for encontrado ou não puder ser lido, registra erro e retorna False.
+       Após SECRETS_TTL segundos a entrada é revalidada pelo mtime do arquivo.
     Parâmetros:
          secret_key (str): Nome da chave/arquivo a ser buscado. Deve ser uma string representando o nome da variável de ambiente ou o nome do arquivo dentro do diretório 'private'.
+         optional (bool, opcional): Secret opcional; se não for encontrada, registra em DEBUG em vez de ERROR. Padrão: False.
     Retorno:
          Union[str, bool]:
               - str: o segredo encontrado (valor da variável de ambiente ou conteúdo do arquivo, com espaços em branco nas extremidades removidos).
               - False: em caso de erro, chave não fornecida, arquivo não encontrado ou outra exceção durante a leitura.
     Efeitos colaterais:
-         - Registra mensagens de debug e erro usando o logger (por exemplo: "encontrada com sucesso", "não encontrado", "Erro ao tentar abrir ...").
-         - Lê arquivos do sistema de arquivos (diretório 'private').
+         - Registra mensagens apenas quando a secret é carregada, recarregada ou não encontrada
+           (leituras servidas pelo cache não geram log).
     Observações:
          - Uma variável de ambiente definida com valor vazio será considerada presente e retornará a string vazia.
-         - O caminho do arquivo é formado sem validação adicional: 'private/{secret_key}'.
+         - Use secret_store.invalidate() para forçar a releitura imediata.
          - Não lança exceções externas; todos os erros são tratados internamente e resultam em retorno False.
     Exemplo de uso:
          secret = get_secret("MY_SECRET")
@@ -36,35 +308,4 @@ def get_secret(secret_key: str) -> Union[str, bool]:
               # tratar erro / segredo não encontrado
     """
 
-    # Validando que recebeu uma secret key
-    if not secret_key:
-
-        logger.error("Chave de senha não fornecida")
-
-        return False
-
-    if os.getenv(secret_key) is not None:
-
-        logger.debug(f"{secret_key} encontrada com sucesso")
-
-        return os.getenv(secret_key)
-
-    try:
-
-        with open(f"private/{secret_key}") as f:
-
-            logger.debug(f"{secret_key} encontrada com sucesso")
-
-            return f.read().strip()
-
-    except FileNotFoundError:
-
-        logger.error(f"{secret_key} não encontrado")
-
-        return False
-
-    except Exception as e:
-
-        logger.error(f"Erro ao tentar abrir {secret_key}: {e}")
-
-        return False
+    return secret_store.get(secret_key, optional)
@@ -0,0 +1,176 @@
+import dataclasses
+import datetime
+import decimal
+import itertools
+import json
+import os
+import uuid
+from typing import Iterator
+
+from flask import Response, current_app, has_app_context
+
+try:
+
+    import orjson
+
+except ImportError:  # pragma: no cover - dependência opcional
+
+    orjson = None
+
+# Listas com mais itens que isso são enviadas em streaming; 0 desativa
+JSON_STREAM_THRESHOLD = int(os.getenv("JSON_STREAM_THRESHOLD", "0"))
+
+# Itens serializados por chunk no streaming
+JSON_STREAM_CHUNK = int(os.getenv("JSON_STREAM_CHUNK", "1000"))
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(value):
+    """
+    Converte tipos não nativos do JSON. Mesmas regras nos dois backends, para que a
+    saída não dependa de o orjson estar instalado.
+    """
+
+    if isinstance(value, decimal.Decimal):
+
+        return str(value)
+
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+
+        return value.isoformat()
+
+    if isinstance(value, uuid.UUID):
+
+        return str(value)
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+
+        return dataclasses.asdict(value)
+
+    if isinstance(value, (set, frozenset)):
+
+        return list(value)
+
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
+_stdlib_encoder = json.JSONEncoder(
+    default=_default, ensure_ascii=False, separators=(",", ":")
+)
+
+
+def dumps(data) -> bytes:
+    """
+    Serializa `data` diretamente para bytes UTF-8.
+    Parâmetros:
+        data: Estrutura a serializar (dict, list, dataclass, datetime, Decimal, UUID...).
+    Retorna:
+        bytes: JSON compacto.
+    Observações:
+        - Usa orjson quando disponível (datetimes e dataclasses nativos, sem str
+          intermediária); caso contrário, json da stdlib com o mesmo tratamento de tipos.
+        - Decimal vira string para não perder precisão, como no provider padrão do Flask.
+        - O orjson não aceita inteiros acima de 64 bits (e não chama `default` para eles):
+          nesses casos, e em qualquer outro TypeError do orjson, a stdlib é usada.
+    """
+
+    if orjson is not None:
+
+        try:
+
+            return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+        except TypeError:
+
+            pass
+
+    return _stdlib_encoder.encode(data).encode()
+
+
+def iter_json_array(items, chunk_size: int = JSON_STREAM_CHUNK) -> Iterator[bytes]:
+    """
+    Gera um array JSON em pedaços de `chunk_size` itens, sem montar o corpo completo.
+    Parâmetros:
+        items (Iterable): Sequência ou gerador de itens serializáveis.
+        chunk_size (int, opcional): Itens por chunk. Padrão: JSON_STREAM_CHUNK.
+    """
+
+    yield b"["
+
+    first = True
+
+    batch = []
+
+    for item in items:
+
+        batch.append(item)
+
+        if len(batch) >= chunk_size:
+
+            body = dumps(batch)[1:-1]
+
+            yield body if first else b"," + body
+
+            first = False
+
+            batch = []
+
+    if batch:
+
+        body = dumps(batch)[1:-1]
+
+        yield body if first else b"," + body
+
+    yield b"]"
+
+
+def output_json(data, code: int, headers=None) -> Response:
+    """
+    Representação "application/json" para o Api do flask-restx.
+    Parâmetros:
+        data: Conteúdo retornado pelo Resource.
+        code (int): Status HTTP.
+        headers (dict, opcional): Headers adicionais.
+    Retorna:
+        flask.Response: Corpo em bytes gerado por dumps(); listas maiores que
+        JSON_STREAM_THRESHOLD são enviadas em streaming (chunked) via iter_json_array().
+    Observações:
+        - Como a representação padrão do flask-restx, o corpo termina com "\n" e as
+          opções de RESTX_JSON (e indent=4 em modo debug) são respeitadas; com opções
+          definidas a serialização usa json.dumps da stdlib com elas.
+    Uso:
+        api.representations["application/json"] = output_json
+    """
+
+    settings = {}
+
+    if has_app_context():
+
+        settings = dict(current_app.config.get("RESTX_JSON", {}))
+
+        if current_app.debug:
+
+            settings.setdefault("indent", 4)
+
+    if settings:
+
+        body = (json.dumps(data, default=_default, **settings) + "\n").encode()
+
+        response = Response(body, status=code, mimetype="application/json")
+
+    elif JSON_STREAM_THRESHOLD and isinstance(data, list) and len(data) > JSON_STREAM_THRESHOLD:
+
+        chunks = itertools.chain(iter_json_array(data), (b"\n",))
+
+        response = Response(chunks, status=code, mimetype="application/json")
+
+    else:
+
+        response = Response(dumps(data) + b"\n", status=code, mimetype="application/json")
+
+    if headers:
+
+        response.headers.extend(headers)
+
+    return response
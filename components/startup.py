@@ -0,0 +1,111 @@
+import os
+import time
+from contextlib import contextmanager
+
+# Sem imports de components aqui: app.py importa este módulo antes dos demais para medi-los
+try:
+
+    import resource
+
+except ImportError:  # pragma: no cover - indisponível no Windows
+
+    resource = None
+
+# Se "1", handle_app() loga o relatório de inicialização ao final
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "0") == "1"
+
+
+def _max_rss_kb() -> int:
+
+    if resource is None:
+
+        return 0
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class StartupProfiler:
+    """
+    Mede o tempo e o crescimento de memória (RSS máximo) de cada fase da inicialização.
+    Uso:
+        with startup_profiler.phase("import routes.healthy"):
+            import routes.healthy
+    Comportamento:
+        - imports(): fases dos imports de nível de módulo (ex.: topo do app.py), que
+          acontecem uma vez por processo e são mantidas entre chamadas de handle_app().
+        - phase(): fases de handle_app(); reset() as descarta no início de cada chamada,
+          para que chamadas repetidas (testes, benchmarks) não somem os tempos.
+    Observações:
+        - O RSS máximo vem de resource.getrusage (KB no Linux); em plataformas sem o
+          módulo resource apenas os tempos são reportados.
+        - Para o detalhamento de cada import, combine com `python -X importtime`.
+    """
+
+    def __init__(self):
+
+        self.imports = []
+
+        self.phases = []
+
+    def reset(self):
+
+        self.phases = []
+
+    @contextmanager
+    def imports_phase(self, name: str):
+
+        with self._measure(name, self.imports):
+
+            yield
+
+    @contextmanager
+    def phase(self, name: str):
+
+        with self._measure(name, self.phases):
+
+            yield
+
+    @contextmanager
+    def _measure(self, name: str, target: list):
+
+        rss_before = _max_rss_kb()
+
+        start = time.perf_counter_ns()
+
+        try:
+
+            yield
+
+        finally:
+
+            target.append(
+                {
+                    "phase": name,
+                    "ms": (time.perf_counter_ns() - start) / 1e6,
+                    "rss_delta_kb": _max_rss_kb() - rss_before,
+                }
+            )
+
+    def report(self) -> list:
+        """
+        Retorna as fases ordenadas da mais lenta para a mais rápida.
+        """
+
+        return sorted(self.imports + self.phases, key=lambda item: item["ms"], reverse=True)
+
+    def log_report(self):
+
+        from components.logger import logger
+
+        total = sum(item["ms"] for item in self.imports + self.phases)
+
+        logger.info("Inicialização: %.1fms, RSS máximo %dKB", total, _max_rss_kb())
+
+        for item in self.report():
+
+            logger.info(
+                "  %-40s %8.1fms %+8dKB", item["phase"], item["ms"], item["rss_delta_kb"]
+            )
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,240 @@
+import base64
+import binascii
+import json
+import os
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from flask import Response, has_request_context, request, stream_with_context
+from flask_restx import abort
+
+from components.serializer import JSON_STREAM_CHUNK, dumps, iter_json_array
+
+# Tamanho padrão e máximo de página na paginação por cursor
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "50"))
+
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "1000"))
+
+# Tipos aceitos em um cursor: os valores vão direto como parâmetros do SQL
+_CURSOR_TYPES = (str, int, float, bool, type(None))
+
+
+def iter_ndjson(items: Iterable, chunk_size: int = JSON_STREAM_CHUNK) -> Iterator[bytes]:
+    """
+    Gera NDJSON (um documento JSON por linha), agrupando `chunk_size` linhas por chunk
+    para não emitir um write por item.
+    """
+
+    batch = []
+
+    for item in items:
+
+        batch.append(dumps(item))
+
+        if len(batch) >= chunk_size:
+
+            batch.append(b"")
+
+            yield b"\n".join(batch)
+
+            batch = []
+
+    if batch:
+
+        batch.append(b"")
+
+        yield b"\n".join(batch)
+
+
+def _stream(chunks: Iterator[bytes], mimetype: str, status: int, headers) -> Response:
+
+    # Mantém o contexto da requisição disponível enquanto o gerador é consumido
+    if has_request_context():
+
+        chunks = stream_with_context(chunks)
+
+    response = Response(chunks, status=status, mimetype=mimetype)
+
+    if headers:
+
+        response.headers.extend(headers)
+
+    return response
+
+
+def stream_json(
+    items: Iterable, status: int = 200, headers=None, chunk_size: int = JSON_STREAM_CHUNK
+) -> Response:
+    """
+    Resposta com um array JSON gerado sob demanda (Transfer-Encoding: chunked).
+    Parâmetros:
+        items (Iterable): Gerador/cursor de itens serializáveis.
+        status (int, opcional): Status HTTP. Padrão: 200.
+        headers (dict, opcional): Headers adicionais.
+        chunk_size (int, opcional): Itens por chunk. Padrão: JSON_STREAM_CHUNK.
+    Retorna:
+        flask.Response: Pode ser retornada diretamente por um Resource do flask-restx.
+    Observações:
+        - A memória por requisição fica limitada a um chunk, independente do total.
+        - Erros após o primeiro chunk não mudam mais o status (já enviado): a conexão é
+          interrompida e o cliente recebe um JSON incompleto.
+    Exemplo:
+        def get(self):
+            return stream_json(row_to_dict(row) for row in cursor)
+    """
+
+    return _stream(iter_json_array(items, chunk_size), "application/json", status, headers)
+
+
+def stream_ndjson(
+    items: Iterable, status: int = 200, headers=None, chunk_size: int = JSON_STREAM_CHUNK
+) -> Response:
+    """
+    Como stream_json, mas em NDJSON (application/x-ndjson): o cliente pode processar cada
+    linha assim que chega, sem um parser JSON incremental.
+    """
+
+    return _stream(iter_ndjson(items, chunk_size), "application/x-ndjson", status, headers)
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Codifica os valores da chave do último item da página em um cursor opaco
+    (base64 url-safe de um array JSON).
+    """
+
+    return base64.urlsafe_b64encode(dumps(list(values))).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Inverso de encode_cursor.
+    Erros:
+        ValueError: Cursor malformado ou com valores não escalares (listas/objetos), que
+            chegariam ao driver do banco como parâmetros inválidos.
+    """
+
+    try:
+
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+    except (binascii.Error, ValueError, UnicodeDecodeError) as e:
+
+        raise ValueError("Cursor inválido") from e
+
+    if not isinstance(values, list) or not all(isinstance(v, _CURSOR_TYPES) for v in values):
+
+        raise ValueError("Cursor inválido")
+
+    return tuple(values)
+
+
+def page_args(
+    default_limit: int = PAGE_DEFAULT_LIMIT, max_limit: int = PAGE_MAX_LIMIT
+) -> Tuple[int, Optional[tuple]]:
+    """
+    Lê ?limit= e ?cursor= da requisição.
+    Retorna:
+        Tuple[int, Optional[tuple]]: (limite entre 1 e max_limit, chave após a qual a página
+        começa ou None na primeira página).
+    Erros:
+        Responde 400 (flask_restx.abort) para limit não numérico ou cursor inválido.
+    """
+
+    try:
+
+        limit = int(request.args.get("limit", default_limit))
+
+    except ValueError:
+
+        abort(400, "limit deve ser um inteiro")
+
+    cursor = request.args.get("cursor")
+
+    after = None
+
+    if cursor:
+
+        try:
+
+            after = decode_cursor(cursor)
+
+        except ValueError:
+
+            abort(400, "cursor inválido")
+
+    return min(max(limit, 1), max_limit), after
+
+
+def keyset_where(
+    columns: Sequence[str],
+    after: Optional[tuple],
+    descending: bool = False,
+    placeholder: str = "?",
+) -> Tuple[str, list]:
+    """
+    Monta o filtro de paginação por chave (keyset) para SQL, no lugar de OFFSET.
+    Parâmetros:
+        columns (Sequence[str]): Colunas da ordenação, terminando em uma coluna única
+            (ex.: ("created_at", "id")). Devem vir do código, nunca do cliente.
+        after (tuple, opcional): Valores do último item da página anterior.
+        descending (bool, opcional): Ordenação decrescente.
+        placeholder (str, opcional): Placeholder do driver ("?" ou "%s").
+    Retorna:
+        Tuple[str, list]: (condição, parâmetros); ("1=1", []) na primeira página.
+    Erros:
+        Responde 400 se o cursor não tiver um valor por coluna.
+    Observações:
+        - Usa comparação de tuplas "(a, b) > (?, ?)" (SQLite >= 3.15, PostgreSQL, MySQL),
+          que aproveita um índice composto nas mesmas colunas: o custo de cada página
+          independe da sua posição, ao contrário de OFFSET.
+        - Use o mesmo ORDER BY: "ORDER BY created_at, id" (ou DESC em todas).
+    Exemplo:
+        where, params = keyset_where(("created_at", "id"), after)
+        sql = f"SELECT ... WHERE {where} ORDER BY created_at, id LIMIT {limit + 1}"
+    """
+
+    if not after:
+
+        return "1=1", []
+
+    if len(after) != len(columns):
+
+        abort(400, "cursor inválido")
+
+    operator = "<" if descending else ">"
+
+    marks = ", ".join([placeholder] * len(columns))
+
+    return f"({', '.join(columns)}) {operator} ({marks})", list(after)
+
+
+def paginate(
+    fetch: Callable[[Optional[tuple], int], Sequence],
+    key: Callable[[object], Sequence],
+    limit: int,
+    after: Optional[tuple] = None,
+) -> dict:
+    """
+    Busca uma página por keyset.
+    Parâmetros:
+        fetch (Callable): fetch(after, n) retorna até n itens a partir da chave `after`.
+        key (Callable): Extrai do item os valores da chave (mesma ordem das colunas).
+        limit (int): Itens por página.
+        after (tuple, opcional): Chave vinda do cursor (page_args()).
+    Retorna:
+        dict: {"items": [...], "next_cursor": str | None}. Busca limit + 1 itens para saber
+        se há próxima página sem um COUNT.
+    Exemplo:
+        limit, after = page_args()
+        return paginate(lambda a, n: repo.list_after(a, n), lambda u: (u["id"],), limit, after)
+    """
+
+    rows = list(fetch(after, limit + 1))
+
+    has_more = len(rows) > limit
+
+    rows = rows[:limit]
+
+    next_cursor = encode_cursor(key(rows[-1])) if has_more and rows else None
+
+    return {"items": rows, "next_cursor": next_cursor}
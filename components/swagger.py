@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, Response, request
+from flask_restx import Api
+
+from components.cache import etag_matches
+from components.serializer import dumps
+
+# Se "1", a especificação é gerada durante handle_app() (antes do fork em produção)
+SWAGGER_PREBUILD = os.getenv("SWAGGER_PREBUILD", "0") == "1"
+
+
+class SwaggerCache:
+    """
+    Cache da especificação (swagger.json) e da página /doc do flask-restx.
+    Parâmetros:
+        api (Api): Instância do Api cuja especificação será servida.
+    Comportamento:
+        - O swagger.json é gerado e serializado uma única vez (na primeira requisição ou em
+          prebuild()) e servido como bytes com ETag; If-None-Match correspondente gera 304.
+        - A página /doc é renderizada uma vez por host (a URL da especificação é absoluta).
+    """
+
+    def __init__(self, api: Api):
+
+        self.api = api
+
+        self._spec: Optional[Tuple[bytes, str]] = None
+
+        self._docs: Dict[str, str] = {}
+
+        self._lock = threading.Lock()
+
+    def spec(self) -> Tuple[bytes, str]:
+
+        if self._spec is None:
+
+            with self._lock:
+
+                if self._spec is None:
+
+                    body = dumps(self.api.__schema__)
+
+                    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+                    self._spec = (body, etag)
+
+        return self._spec
+
+    def prebuild(self, app: Flask):
+        """
+        Gera a especificação antecipadamente dentro de um request context de teste.
+        """
+
+        with app.test_request_context():
+
+            self.spec()
+
+    def spec_view(self):
+
+        body, etag = self.spec()
+
+        if etag_matches(etag):
+
+            return Response(status=304, headers={"ETag": etag})
+
+        return Response(body, mimetype="application/json", headers={"ETag": etag})
+
+    def doc_view(self, render):
+
+        def view(*args, **kwargs):
+
+            key = request.host_url
+
+            html = self._docs.get(key)
+
+            if html is None:
+
+                html = render(*args, **kwargs)
+
+                # Limita o cache a poucos hosts (ex.: interno e externo)
+                if len(self._docs) < 8:
+
+                    self._docs[key] = html
+
+            return html
+
+        return view
+
+
+def cache_swagger(app: Flask, api: Api, blueprint: str = "api") -> SwaggerCache:
+    """
+    Substitui as views de especificação e documentação do flask-restx por versões cacheadas.
+    Parâmetros:
+        app (Flask): Aplicação com o blueprint do Api já registrado.
+        api (Api): Instância do Api.
+        blueprint (str, opcional): Nome do blueprint do Api. Padrão: "api".
+    Retorna:
+        SwaggerCache: O cache instalado (útil para prebuild ou inspeção).
+    Observações:
+        - Deve ser chamado após app.register_blueprint.
+        - Com SWAGGER_PREBUILD=1 a especificação é gerada imediatamente.
+    """
+
+    swagger_cache = SwaggerCache(api)
+
+    specs_endpoint = f"{blueprint}.specs"
+
+    doc_endpoint = f"{blueprint}.doc"
+
+    if specs_endpoint in app.view_functions:
+
+        app.view_functions[specs_endpoint] = swagger_cache.spec_view
+
+    if doc_endpoint in app.view_functions:
+
+        app.view_functions[doc_endpoint] = swagger_cache.doc_view(
+            app.view_functions[doc_endpoint]
+        )
+
+    if SWAGGER_PREBUILD:
+
+        swagger_cache.prebuild(app)
+
+    return swagger_cache
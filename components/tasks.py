@@ -0,0 +1,457 @@
+import importlib
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from flask import request
+
+from components.logger import logger
+from components.timer import record, timer
+from components.tracing import wrap_context
+
+# "thread" para trabalho de I/O; "process" para trabalho de CPU (funções precisam ser picklable)
+TASKS_BACKEND = os.getenv("TASKS_BACKEND", "thread").lower()
+
+TASKS_WORKERS = int(os.getenv("TASKS_WORKERS", "4"))
+
+# Tarefas aguardando além das em execução; acima disso o envio é recusado (503)
+TASKS_QUEUE_SIZE = int(os.getenv("TASKS_QUEUE_SIZE", "100"))
+
+# Tempo (s) em que o status/resultado de uma tarefa concluída fica disponível
+TASKS_RESULT_TTL = float(os.getenv("TASKS_RESULT_TTL", "3600"))
+
+TASKS_MAX_RESULTS = int(os.getenv("TASKS_MAX_RESULTS", "10000"))
+
+PENDING = ("queued", "running")
+
+
+class QueueFull(Exception):
+    """
+    A fila do executor está cheia; o cliente deve tentar novamente mais tarde.
+    """
+
+
+class ResultStore:
+    """
+    Interface do armazenamento de status/resultados das tarefas (dicts serializáveis).
+    Com vários workers a consulta pode cair em outro processo: use uma implementação
+    compartilhada (ex.: Redis com expiração); MemoryResultStore é a implementação em
+    processo e o stand-in de testes.
+    """
+
+    def get(self, task_id: str) -> Optional[dict]:
+
+        raise NotImplementedError
+
+    def set(self, task_id: str, state: dict, ttl: float):
+
+        raise NotImplementedError
+
+
+class MemoryResultStore(ResultStore):
+    """
+    Estados em memória com TTL, limitado a `max_entries` (os mais antigos são descartados).
+    """
+
+    def __init__(self, max_entries: int = TASKS_MAX_RESULTS):
+
+        self.max_entries = max_entries
+
+        # id -> (estado, expira_em)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self._lock = threading.Lock()
+
+    def get(self, task_id: str) -> Optional[dict]:
+
+        with self._lock:
+
+            entry = self._entries.get(task_id)
+
+            if entry is None:
+
+                return None
+
+            if entry[1] <= time.monotonic():
+
+                del self._entries[task_id]
+
+                return None
+
+            return dict(entry[0])
+
+    def set(self, task_id: str, state: dict, ttl: float):
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            self._entries.pop(task_id, None)
+
+            self._entries[task_id] = (dict(state), now + ttl)
+
+            # TTL único por store na prática: a entrada mais antiga é a primeira a expirar
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or next(iter(self._entries.values()))[1] <= now
+            ):
+
+                self._entries.popitem(last=False)
+
+    def reinit_after_fork(self):
+
+        self._lock = threading.Lock()
+
+
+def _check_picklable(function: Callable):
+
+    # Falha no envio e não de forma assíncrona na thread de alimentação do ProcessPoolExecutor
+    try:
+
+        pickle.dumps(function)
+
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+
+        raise TypeError(
+            f"{getattr(function, '__qualname__', function)!r} não pode ser enviada ao backend "
+            f"'process': use uma função de nível de módulo ({e})"
+        ) from e
+
+
+def _run_in_process(function: Callable, args: tuple, kwargs: dict):
+
+    # Executado no processo filho: a duração é medida lá e registrada no processo pai
+    started = time.time()
+
+    start = time.perf_counter_ns()
+
+    result = function(*args, **kwargs)
+
+    return result, started, time.perf_counter_ns() - start
+
+
+class TaskExecutor:
+    """
+    Executa funções fora da thread da requisição.
+    Parâmetros:
+        backend (str): "thread" ou "process". Padrão: TASKS_BACKEND.
+        workers (int): Tarefas em paralelo. Padrão: TASKS_WORKERS.
+        queue_size (int): Tarefas aguardando além das em execução. Padrão: TASKS_QUEUE_SIZE.
+        store (ResultStore, opcional): Padrão: MemoryResultStore().
+        result_ttl (float): Padrão: TASKS_RESULT_TTL.
+    Comportamento:
+        - submit() é não bloqueante: com workers + queue_size tarefas pendentes lança
+          QueueFull (back-pressure) em vez de acumular trabalho sem limite.
+        - Estados: queued -> running -> succeeded | failed (no backend "process" o estado
+          running não é publicado, pois a tarefa roda em outro processo).
+        - A duração de cada tarefa vai para components.timer como "task.<nome>" e a espera
+          na fila como "task.<nome>.queue".
+        - No backend "thread" a tarefa herda o request ID/trace da requisição que a criou.
+        - O pool é criado sob demanda e recriado após fork.
+    """
+
+    def __init__(
+        self,
+        backend: str = TASKS_BACKEND,
+        workers: int = TASKS_WORKERS,
+        queue_size: int = TASKS_QUEUE_SIZE,
+        store: Optional[ResultStore] = None,
+        result_ttl: float = TASKS_RESULT_TTL,
+    ):
+
+        if backend not in ("thread", "process"):
+
+            raise ValueError("backend deve ser 'thread' ou 'process'")
+
+        self.backend = backend
+
+        self.workers = workers
+
+        self.queue_size = queue_size
+
+        self.store = store or MemoryResultStore()
+
+        self.result_ttl = result_ttl
+
+        self._init_state()
+
+    def _init_state(self):
+
+        self._executor: Optional[Executor] = None
+
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Executor:
+
+        if self._executor is None:
+
+            with self._lock:
+
+                if self._executor is None:
+
+                    if self.backend == "process":
+
+                        self._executor = ProcessPoolExecutor(self.workers)
+
+                    else:
+
+                        self._executor = ThreadPoolExecutor(
+                            self.workers, thread_name_prefix="task"
+                        )
+
+        return self._executor
+
+    def _update(self, task_id: str, state: dict, **changes):
+
+        state.update(changes)
+
+        self.store.set(task_id, state, self.result_ttl)
+
+    def submit(self, function: Callable, *args, name: Optional[str] = None, **kwargs) -> str:
+        """
+        Enfileira `function(*args, **kwargs)`.
+        Retorna:
+            str: ID da tarefa, consultado com status().
+        Erros:
+            QueueFull: Se não houver espaço na fila.
+            TypeError: No backend "process", se a função não puder ser serializada (pickle),
+                ex.: lambdas e funções aninhadas.
+        """
+
+        if self.backend == "process":
+
+            _check_picklable(function)
+
+        if not self._slots.acquire(blocking=False):
+
+            raise QueueFull("Fila de tarefas cheia")
+
+        name = name or function.__name__
+
+        task_id = uuid.uuid4().hex
+
+        state = {"id": task_id, "name": name, "status": "queued", "submitted_at": time.time()}
+
+        self.store.set(task_id, state, self.result_ttl)
+
+        try:
+
+            if self.backend == "process":
+
+                future = self._pool().submit(_run_in_process, function, args, kwargs)
+
+                future.add_done_callback(lambda f: self._process_done(task_id, state, f))
+
+            else:
+
+                self._pool().submit(
+                    wrap_context(self._run), task_id, state, function, args, kwargs
+                )
+
+        except Exception:
+
+            self._slots.release()
+
+            raise
+
+        return task_id
+
+    def _run(self, task_id: str, state: dict, function: Callable, args: tuple, kwargs: dict):
+
+        name = state["name"]
+
+        try:
+
+            started = time.time()
+
+            record(f"task.{name}.queue", int((started - state["submitted_at"]) * 1e9))
+
+            self._update(task_id, state, status="running", started_at=started)
+
+            with timer(f"task.{name}"):
+
+                result = function(*args, **kwargs)
+
+            self._update(
+                task_id, state, status="succeeded", finished_at=time.time(), result=result
+            )
+
+        except Exception as e:
+
+            self._fail(task_id, state, e)
+
+        finally:
+
+            self._slots.release()
+
+    def _process_done(self, task_id: str, state: dict, future):
+
+        try:
+
+            result, started, elapsed_ns = future.result()
+
+            name = state["name"]
+
+            record(f"task.{name}.queue", int((started - state["submitted_at"]) * 1e9))
+
+            record(f"task.{name}", elapsed_ns)
+
+            self._update(
+                task_id,
+                state,
+                status="succeeded",
+                started_at=started,
+                finished_at=time.time(),
+                result=result,
+            )
+
+        except Exception as e:
+
+            self._fail(task_id, state, e)
+
+        finally:
+
+            self._slots.release()
+
+    def _fail(self, task_id: str, state: dict, error: Exception):
+
+        # Chamado dentro do except: o traceback vai junto no log
+        logger.exception("Tarefa %s (%s) falhou: %s", state["name"], task_id, error)
+
+        self._update(
+            task_id,
+            state,
+            status="failed",
+            finished_at=time.time(),
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    def status(self, task_id: str) -> Optional[dict]:
+
+        return self.store.get(task_id)
+
+    def shutdown(self, wait: bool = True):
+
+        if self._executor is not None:
+
+            self._executor.shutdown(wait=wait)
+
+            self._executor = None
+
+    def reinit_after_fork(self):
+
+        # O pool do processo pai não existe no filho; um novo é criado no primeiro submit
+        self._init_state()
+
+        if isinstance(self.store, MemoryResultStore):
+
+            self.store.reinit_after_fork()
+
+
+executor = TaskExecutor()
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=executor.reinit_after_fork)
+
+
+def _resolve(module: str, qualname: str):
+
+    target = importlib.import_module(module)
+
+    for part in qualname.split("."):
+
+        target = getattr(target, part)
+
+    return target
+
+
+def status_url(task_id: str) -> str:
+
+    return f"{request.script_root}/tasks/{task_id}"
+
+
+class BackgroundTask:
+    """
+    Função registrada com @background_task. Chamá-la diretamente executa de forma síncrona.
+    No backend "process" é enviada por referência (módulo + nome) e resolvida no filho.
+    """
+
+    def __init__(self, function: Callable, name: str, task_executor: Optional[TaskExecutor]):
+
+        self.function = function
+
+        self.name = name
+
+        self.task_executor = task_executor
+
+        self.__name__ = function.__name__
+
+        self.__doc__ = function.__doc__
+
+    def __call__(self, *args, **kwargs):
+
+        return self.function(*args, **kwargs)
+
+    def __reduce__(self):
+
+        return _resolve, (self.function.__module__, self.function.__qualname__)
+
+    def submit(self, *args, **kwargs) -> str:
+
+        return (self.task_executor or executor).submit(self, *args, name=self.name, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """
+        Enfileira a tarefa e retorna a resposta para o Resource: 202 Accepted com o
+        Location do status, ou 503 com Retry-After se a fila estiver cheia.
+        """
+
+        try:
+
+            task_id = self.submit(*args, **kwargs)
+
+        except QueueFull:
+
+            return {"message": "Fila de tarefas cheia, tente novamente"}, 503, {"Retry-After": "1"}
+
+        url = status_url(task_id)
+
+        return {"task_id": task_id, "status_url": url}, 202, {"Location": url}
+
+
+def background_task(name: Optional[str] = None, task_executor: Optional[TaskExecutor] = None):
+    """
+    Decorator que registra uma função para execução em background.
+    Parâmetros:
+        name (str, opcional): Nome da tarefa (status e métricas do timer).
+            Padrão: nome da função.
+        task_executor (TaskExecutor, opcional): Padrão: o executor global.
+    Retorna:
+        BackgroundTask: com submit(*args) -> task_id e enqueue(*args) -> resposta 202.
+    Observações:
+        - Os argumentos e o retorno devem ser serializáveis (JSON no resultado; pickle no
+          backend "process", onde a função também precisa ser de nível de módulo).
+        - O contexto da requisição (flask.request, g) não está disponível na tarefa: passe
+          os dados necessários como argumentos.
+    Exemplo:
+        @background_task("relatorio")
+        def gerar_relatorio(filtros): ...
+
+        class RelatorioResource(Resource):
+            def post(self):
+                return gerar_relatorio.enqueue(request.get_json())
+    """
+
+    def decorator(function: Callable) -> BackgroundTask:
+
+        return BackgroundTask(function, name or function.__name__, task_executor)
+
+    return decorator
@@ -1,40 +1,556 @@
-from datetime import datetime
+import contextvars
+import inspect
+import os
+import random
+import threading
+import time
+import weakref
 from functools import wraps
+from typing import Dict, Optional
 
 from components.logger import logger
+from components.tracing import end_span, start_span
 
+# Chamadas acima deste tempo (ms) geram um WARNING; 0 desativa
+TIMER_SLOW_MS = float(os.getenv("TIMER_SLOW_MS", "0"))
 
-def timer(func_name: str):
+# Intervalo (s) do flush periódico das estatísticas; 0 desativa
+TIMER_FLUSH_INTERVAL = float(os.getenv("TIMER_FLUSH_INTERVAL", "0"))
+
+# Buckets logarítmicos: 4 sub-buckets por potência de 2 (erro relativo <= 25%)
+_SUB_BUCKET_BITS = 2
+
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+_LINEAR_LIMIT = 2 * _SUB_BUCKETS
+
+_NUM_BUCKETS = 64 * _SUB_BUCKETS
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _bucket_index(ns: int) -> int:
+
+    if ns < _LINEAR_LIMIT:
+
+        return ns if ns > 0 else 0
+
+    exponent = ns.bit_length()
+
+    sub = (ns >> (exponent - _SUB_BUCKET_BITS - 1)) & (_SUB_BUCKETS - 1)
+
+    return (exponent - _SUB_BUCKET_BITS) * _SUB_BUCKETS + sub
+
+
+def _bucket_upper_bound(index: int) -> int:
+
+    if index < _LINEAR_LIMIT:
+
+        return index
+
+    exponent = index // _SUB_BUCKETS + _SUB_BUCKET_BITS
+
+    sub = index % _SUB_BUCKETS
+
+    return ((_SUB_BUCKETS + sub + 1) << (exponent - _SUB_BUCKET_BITS - 1)) - 1
+
+
+class _Shard:
+    """
+    Histograma de uma única thread. Apenas a thread dona escreve nele, por isso o
+    registro de uma medição não precisa de lock.
+    """
+
+    __slots__ = ("buckets", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+
+        self.buckets = [0] * _NUM_BUCKETS
+
+        self.count = 0
+
+        self.total_ns = 0
+
+        self.max_ns = 0
+
+    def record(self, ns: int):
+
+        self.buckets[_bucket_index(ns)] += 1
+
+        self.count += 1
+
+        self.total_ns += ns
+
+        if ns > self.max_ns:
+
+            self.max_ns = ns
+
+    def merge(self, other: "_Shard"):
+
+        buckets = self.buckets
+
+        for i, value in enumerate(other.buckets):
+
+            if value:
+
+                buckets[i] += value
+
+        self.count += other.count
+
+        self.total_ns += other.total_ns
+
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+
+class _Histogram:
     """
-    Decorator de cronômetro para medir e logar o tempo de execução de funções.
+    Histograma agregado de um func_name: um shard por thread mais um shard "aposentado"
+    que acumula os dados de threads já encerradas.
+    """
+
+    def __init__(self, sample_rate: float):
+
+        self.sample_rate = sample_rate
+
+        self.retired = _Shard()
+
+        self.shards = []
+
+    def compact(self):
+
+        alive = []
+
+        for thread_ref, shard in self.shards:
+
+            if thread_ref() is None or not thread_ref().is_alive():
+
+                self.retired.merge(shard)
+
+            else:
+
+                alive.append((thread_ref, shard))
+
+        self.shards = alive
+
+    def snapshot(self) -> _Shard:
+
+        self.compact()
+
+        total = _Shard()
+
+        total.merge(self.retired)
+
+        for _, shard in self.shards:
+
+            total.merge(shard)
+
+        return total
+
+
+_histograms: Dict[str, _Histogram] = {}
+
+_registry_lock = threading.Lock()
+
+_local = threading.local()
+
+# Incrementado por reset_stats(): shards de gerações anteriores são abandonados pelas threads
+_generation = 0
+
+# Threads criadas por requisição são comuns no servidor threaded; compacta ao passar disso
+_MAX_LIVE_SHARDS = 64
+
+
+def _thread_shard(func_name: str, sample_rate: float) -> _Shard:
+
+    shards = getattr(_local, "shards", None)
+
+    if shards is None or _local.generation != _generation:
+
+        shards = _local.shards = {}
+
+        _local.generation = _generation
+
+    shard = shards.get(func_name)
+
+    if shard is not None:
+
+        return shard
+
+    shard = shards[func_name] = _Shard()
+
+    with _registry_lock:
+
+        histogram = _histograms.get(func_name)
+
+        if histogram is None:
+
+            histogram = _histograms[func_name] = _Histogram(sample_rate)
+
+        if len(histogram.shards) >= _MAX_LIVE_SHARDS:
+
+            histogram.compact()
+
+        histogram.shards.append((weakref.ref(threading.current_thread()), shard))
+
+    return shard
+
+
+def record(func_name: str, elapsed_ns: int, sample_rate: float = 1.0):
+    """
+    Registra uma medição (em nanossegundos) no histograma de func_name.
     Parâmetros:
-        func_name (str): Nome descritivo usado nas mensagens de log para identificar a função.
+        func_name (str): Nome da série.
+        elapsed_ns (int): Duração medida em nanossegundos.
+        sample_rate (float): Taxa de amostragem usada pelo chamador, usada para estimar
+            o total de chamadas em get_stats().
+    Observações:
+        - Escreve apenas no shard da thread atual, sem lock no caminho quente.
+        - Pode ser usado diretamente por outros componentes que já medem o tempo.
+    """
+
+    _thread_shard(func_name, sample_rate).record(elapsed_ns)
+
+
+def _summarize(histogram: _Histogram) -> dict:
+
+    shard = histogram.snapshot()
+
+    summary = {
+        "count": shard.count,
+        "estimated_calls": int(shard.count / histogram.sample_rate),
+        "sample_rate": histogram.sample_rate,
+        "mean_ms": (shard.total_ns / shard.count / 1e6) if shard.count else 0.0,
+        "max_ms": shard.max_ns / 1e6,
+    }
+
+    targets = [(q, int(q * shard.count + 0.999999) or 1) for q in QUANTILES]
+
+    seen = 0
+
+    position = 0
+
+    for index, value in enumerate(shard.buckets):
+
+        if not value:
+
+            continue
+
+        seen += value
+
+        while position < len(targets) and seen >= targets[position][1]:
+
+            quantile = targets[position][0]
+
+            estimate = min(_bucket_upper_bound(index), shard.max_ns)
+
+            summary[f"p{int(quantile * 100)}_ms"] = estimate / 1e6
+
+            position += 1
+
+    for quantile, _ in targets[position:]:
+
+        summary[f"p{int(quantile * 100)}_ms"] = 0.0
+
+    return summary
+
+
+def get_stats(func_name: Optional[str] = None) -> dict:
+    """
+    Retorna as estatísticas agregadas dos timers.
+    Parâmetros:
+        func_name (str, opcional): Quando informado, retorna apenas a série correspondente.
     Retorna:
-        Callable: Um decorator que, quando aplicado a uma função, realiza as seguintes ações:
-            - Registra uma mensagem de início no logger: "Iniciando {func_name}".
-            - Executa a função decorada e captura seu resultado.
-            - Registra uma mensagem de término com o tempo decorrido: "{func_name} finalizado em {duração}".
-            - Retorna o resultado original da função decorada.
+        dict: {func_name: {"count", "estimated_calls", "sample_rate", "mean_ms",
+               "max_ms", "p50_ms", "p95_ms", "p99_ms"}}. Os percentis são estimados a
+               partir de buckets logarítmicos (erro relativo de até 25%).
+    """
+
+    with _registry_lock:
+
+        names = [func_name] if func_name else list(_histograms)
+
+        return {
+            name: _summarize(_histograms[name]) for name in names if name in _histograms
+        }
+
+
+def reset_stats():
+    """
+    Descarta todas as estatísticas acumuladas.
+    Observações:
+        - Os shards não são zerados no lugar (as threads donas podem estar escrevendo):
+          são desligados do histograma e cada thread cria um novo na próxima medição.
+    """
+
+    global _generation
+
+    with _registry_lock:
+
+        _generation += 1
+
+        for histogram in _histograms.values():
+
+            histogram.retired = _Shard()
+
+            histogram.shards = []
+
+
+def flush_stats(reset: bool = True) -> dict:
+    """
+    Registra no logger um resumo das estatísticas e, opcionalmente, as zera.
+    Parâmetros:
+        reset (bool): Se True (padrão), zera os histogramas após o flush.
+    Retorna:
+        dict: O mesmo conteúdo de get_stats() no momento do flush.
+    """
+
+    stats = get_stats()
+
+    for name, summary in stats.items():
+
+        if summary["count"]:
+
+            logger.info(
+                "timer %s count=%d p50=%.3fms p95=%.3fms p99=%.3fms max=%.3fms",
+                name,
+                summary["count"],
+                summary["p50_ms"],
+                summary["p95_ms"],
+                summary["p99_ms"],
+                summary["max_ms"],
+            )
+
+    if reset:
+
+        reset_stats()
+
+    return stats
+
+
+_flush_thread: Optional[threading.Thread] = None
+
+_flush_interval = TIMER_FLUSH_INTERVAL
+
+
+def start_periodic_flush(interval: Optional[float] = None):
+    """
+    Inicia uma thread daemon que chama flush_stats() a cada `interval` segundos.
+    Parâmetros:
+        interval (float): Intervalo em segundos. Valores <= 0 não iniciam nada.
+    Observações:
+        - Idempotente: chamadas repetidas não criam threads adicionais.
+        - Padrão de interval: variável de ambiente TIMER_FLUSH_INTERVAL.
+    """
+
+    global _flush_thread, _flush_interval
+
+    interval = _flush_interval = TIMER_FLUSH_INTERVAL if interval is None else interval
+
+    if interval <= 0 or (_flush_thread is not None and _flush_thread.is_alive()):
+
+        return
+
+    def loop():
+
+        while True:
+
+            time.sleep(interval)
+
+            flush_stats()
+
+    _flush_thread = threading.Thread(target=loop, name="timer-flush", daemon=True)
+
+    _flush_thread.start()
+
+
+def _after_fork_in_child():
+
+    global _flush_thread, _registry_lock
+
+    _registry_lock = threading.Lock()
+
+    # Threads não sobrevivem ao fork: recria o flush periódico no worker
+    if _flush_thread is not None:
+
+        _flush_thread = None
+
+        start_periodic_flush(_flush_interval)
+
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+# Medições abertas como context manager: (timer, span, início). Um ContextVar mantém
+# pilhas separadas por thread e por task do asyncio
+_open: contextvars.ContextVar = contextvars.ContextVar("timer_open", default=())
+
+
+class Timer:
+    """
+    Cronômetro de alta resolução usável como decorator (sync ou async) ou context manager.
+    Parâmetros:
+        func_name (str): Nome da série de estatísticas.
+        sample_rate (float): Fração das chamadas medidas (1.0 mede todas).
+        slow_ms (float): Chamadas acima deste tempo geram um WARNING (0 desativa).
+        log (bool): Se True, registra cada chamada medida em DEBUG.
     Observações:
-        - Presume-se que 'logger', 'datetime' e 'wraps' estejam disponíveis no escopo onde o decorator é utilizado.
-        - Mantém a assinatura e o comportamento da função decorada, apenas adicionando logging e medição de tempo.
+        - Usa time.perf_counter_ns; nada é alocado além do próprio int da medição.
+        - O mesmo objeto pode ser usado por várias threads e coroutines como context
+          manager (with/async with): o início de cada medição fica em um ContextVar, então
+          tasks intercaladas no mesmo event loop não trocam os inícios entre si.
+        - Dentro de uma requisição amostrada por components.tracing, cada chamada vira um
+          span filho do span atual, independente do sample_rate das estatísticas.
     """
 
-    def calculate_time(function):
+    def __init__(
+        self,
+        func_name: str,
+        sample_rate: float = 1.0,
+        slow_ms: float = TIMER_SLOW_MS,
+        log: bool = False,
+    ):
+
+        if not 0 < sample_rate <= 1:
+
+            raise ValueError("sample_rate deve estar no intervalo (0, 1]")
+
+        self.func_name = func_name
+
+        self.sample_rate = sample_rate
+
+        self.slow_ns = int(slow_ms * 1_000_000)
+
+        self.log = log
+
+    def _sampled(self) -> bool:
+
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _finish(self, start: int):
+
+        elapsed = time.perf_counter_ns() - start
+
+        record(self.func_name, elapsed, self.sample_rate)
+
+        if self.slow_ns and elapsed > self.slow_ns:
+
+            logger.warning("%s lento: %.3fms", self.func_name, elapsed / 1e6)
+
+        elif self.log:
+
+            logger.debug("%s finalizado em %.3fms", self.func_name, elapsed / 1e6)
+
+    def __enter__(self):
+
+        start = time.perf_counter_ns() if self._sampled() else None
+
+        _open.set(_open.get() + ((self, start_span(self.func_name), start),))
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+
+        stack = _open.get()
+
+        # A entrada mais recente deste timer (normalmente a última da pilha)
+        index = len(stack) - 1
+
+        while stack[index][0] is not self:
+
+            index -= 1
+
+        _, span, start = stack[index]
+
+        _open.set(stack[:index] + stack[index + 1 :])
+
+        end_span(span)
+
+        if start is not None:
+
+            self._finish(start)
+
+        return False
+
+    async def __aenter__(self):
+
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+
+        return self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, function):
+
+        if inspect.iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+
+                span = start_span(self.func_name)
+
+                start = time.perf_counter_ns() if self._sampled() else None
+
+                try:
+
+                    return await function(*args, **kwargs)
+
+                finally:
+
+                    end_span(span)
+
+                    if start is not None:
+
+                        self._finish(start)
+
+            return async_wrapper
 
         @wraps(function)
         def wrapper(*args, **kwargs):
 
-            start = datetime.now()
+            span = start_span(self.func_name)
+
+            start = time.perf_counter_ns() if self._sampled() else None
+
+            try:
+
+                return function(*args, **kwargs)
 
-            logger.info(f"Iniciando {func_name}")
+            finally:
 
-            result = function(*args, **kwargs)
+                end_span(span)
 
-            logger.info(f"{func_name} finalizado em {datetime.now() - start}")
+                if start is not None:
 
-            return result
+                    self._finish(start)
 
         return wrapper
 
-    return calculate_time
+
+def timer(
+    func_name: str,
+    sample_rate: float = 1.0,
+    slow_ms: float = TIMER_SLOW_MS,
+    log: bool = False,
+) -> Timer:
+    """
+    Cronômetro para medir o tempo de execução de funções ou blocos de código.
+    Parâmetros:
+        func_name (str): Nome descritivo usado para agrupar as medições.
+        sample_rate (float, opcional): Fração das chamadas medidas. Padrão: 1.0.
+        slow_ms (float, opcional): Limite (ms) a partir do qual a chamada é logada como
+            WARNING. Padrão: variável de ambiente TIMER_SLOW_MS (0 desativa).
+        log (bool, opcional): Se True, loga cada chamada medida em DEBUG. Padrão: False.
+    Retorna:
+        Timer: Objeto que pode ser usado como decorator de funções sync ou async
+        (@timer("nome")) ou como context manager (with timer("nome"): ... ou
+        async with timer("nome"): ...).
+    Observações:
+        - As medições vão para histogramas em memória por func_name em vez de gerar
+          uma linha de log por chamada; consulte com get_stats() e publique com
+          flush_stats() ou start_periodic_flush().
+        - Mantém a assinatura e o comportamento da função decorada.
+    """
+
+    return Timer(func_name, sample_rate=sample_rate, slow_ms=slow_ms, log=log)
@@ -0,0 +1,560 @@
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from flask import Flask, g, request
+
+from components.logger import logger
+
+# Fração das requisições rastreadas (quando não há decisão do chamador no traceparent)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+
+# Orçamento de traces amostrados por segundo por processo; 0 = sem limite
+TRACE_MAX_PER_SECOND = float(os.getenv("TRACE_MAX_PER_SECOND", "50"))
+
+# Destino dos spans: "none", "stdout", "file" ou "memory"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "spans.jsonl")
+
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "2.0"))
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class Span:
+    """
+    Trecho de execução dentro de um trace (requisição, função decorada com timer...).
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "sampled",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "_start_perf",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool):
+
+        self.trace_id = trace_id
+
+        self.span_id = f"{random.getrandbits(64):016x}"
+
+        self.parent_id = parent_id
+
+        self.name = name
+
+        self.sampled = sampled
+
+        self.start_ns = time.time_ns()
+
+        self._start_perf = time.perf_counter_ns()
+
+        self.end_ns = 0
+
+        self.attributes = {}
+
+    def end(self):
+
+        # Duração medida com relógio monotônico, ancorada no início em wall-clock
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start_perf)
+
+        if self.sampled:
+
+            exporter.submit(self)
+
+    def to_dict(self) -> dict:
+
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+        }
+
+    def traceparent(self) -> str:
+
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+_request_id: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+# Último request_id da thread/contexto, não resetado no teardown: a linha de acesso do
+# werkzeug é logada depois do teardown_request
+_access_request_id: contextvars.ContextVar = contextvars.ContextVar(
+    "access_request_id", default=None
+)
+
+
+def current_span() -> Optional[Span]:
+
+    return _current_span.get()
+
+
+def current_request_id() -> Optional[str]:
+
+    return _request_id.get()
+
+
+def parse_traceparent(header: str):
+    """
+    Interpreta um header W3C traceparent.
+    Retorna:
+        tuple | None: (trace_id, parent_span_id, sampled) ou None se inválido.
+    """
+
+    parts = header.strip().split("-")
+
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+
+        return None
+
+    version, trace_id, parent_id, flags = parts
+
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+
+        return None
+
+    try:
+
+        int(trace_id, 16)
+
+        int(parent_id, 16)
+
+        sampled = bool(int(flags, 16) & 1)
+
+    except ValueError:
+
+        return None
+
+    return trace_id.lower(), parent_id.lower(), sampled
+
+
+class Sampler:
+    """
+    Decide quais traces são registrados: TRACE_SAMPLE_RATE limitado por um orçamento de
+    TRACE_MAX_PER_SECOND traces por segundo (token bucket), mantendo o overhead estável
+    mesmo sob picos de tráfego.
+    """
+
+    def __init__(self, rate: float = TRACE_SAMPLE_RATE, max_per_second: float = TRACE_MAX_PER_SECOND):
+
+        self.rate = rate
+
+        self.max_per_second = max_per_second
+
+        self._tokens = max_per_second
+
+        self._last = time.monotonic()
+
+        self._lock = threading.Lock()
+
+    def sample(self, parent_sampled: Optional[bool] = None) -> bool:
+
+        wanted = parent_sampled if parent_sampled is not None else random.random() < self.rate
+
+        if not wanted or not self.max_per_second:
+
+            return wanted
+
+        with self._lock:
+
+            now = time.monotonic()
+
+            self._tokens = min(
+                self.max_per_second, self._tokens + (now - self._last) * self.max_per_second
+            )
+
+            self._last = now
+
+            if self._tokens >= 1:
+
+                self._tokens -= 1
+
+                return True
+
+        return False
+
+
+sampler = Sampler()
+
+
+def start_span(name: str) -> Optional[contextvars.Token]:
+    """
+    Abre um span filho do span atual, se houver um trace amostrado em andamento.
+    Retorna:
+        contextvars.Token | None: Token a ser passado para end_span(); None quando não há
+        trace amostrado (custo de uma leitura de ContextVar).
+    """
+
+    parent = _current_span.get()
+
+    if parent is None or not parent.sampled:
+
+        return None
+
+    return _current_span.set(Span(name, parent.trace_id, parent.span_id, True))
+
+
+def end_span(token: Optional[contextvars.Token]):
+    """
+    Fecha o span aberto por start_span() e restaura o span pai.
+    """
+
+    if token is None:
+
+        return
+
+    span = _current_span.get()
+
+    _current_span.reset(token)
+
+    span.end()
+
+
+def wrap_context(function: Callable) -> Callable:
+    """
+    Captura o contexto atual (request ID e span) para executar `function` em outra thread,
+    ex.: executor.submit(wrap_context(tarefa), ...). Tasks asyncio já herdam o contexto.
+    """
+
+    context = contextvars.copy_context()
+
+    def runner(*args, **kwargs):
+
+        return context.run(function, *args, **kwargs)
+
+    return runner
+
+
+class SpanExporter:
+    """
+    Interface dos destinos de spans. export() recebe um lote de dicts (Span.to_dict()).
+    """
+
+    def export(self, spans: List[dict]):
+
+        raise NotImplementedError
+
+
+class StdoutExporter(SpanExporter):
+
+    def export(self, spans: List[dict]):
+
+        sys.stdout.write("".join(json.dumps(span) + "\n" for span in spans))
+
+        sys.stdout.flush()
+
+
+class FileExporter(SpanExporter):
+
+    def __init__(self, path: str = TRACE_EXPORT_FILE):
+
+        self.path = path
+
+    def export(self, spans: List[dict]):
+
+        with open(self.path, "a") as f:
+
+            f.write("".join(json.dumps(span) + "\n" for span in spans))
+
+
+class InMemoryExporter(SpanExporter):
+    """
+    Coletor local (stand-in de um collector real): mantém os últimos `max_spans` spans
+    para inspeção em testes e depuração.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+
+        self.spans = deque(maxlen=max_spans)
+
+    def export(self, spans: List[dict]):
+
+        self.spans.extend(spans)
+
+    def trace(self, trace_id: str) -> List[dict]:
+
+        return [span for span in self.spans if span["trace_id"] == trace_id]
+
+
+class BatchExporter:
+    """
+    Fila limitada de spans enviada em lotes ao SpanExporter por uma thread em background.
+    Spans excedentes com a fila cheia são descartados e contados em `dropped`, para que o
+    tracing nunca bloqueie a requisição.
+    """
+
+    def __init__(self, target: Optional[SpanExporter] = None):
+
+        self.target = target
+
+        self.dropped = 0
+
+        self._thread: Optional[threading.Thread] = None
+
+        self._queue: queue.Queue = queue.Queue(TRACE_QUEUE_SIZE)
+
+    def set_target(self, target: Optional[SpanExporter]):
+
+        self.target = target
+
+        if target is not None:
+
+            self._start()
+
+    def _start(self):
+
+        if self._thread is not None and self._thread.is_alive():
+
+            return
+
+        self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+
+        self._thread.start()
+
+    def submit(self, span: Span):
+
+        if self.target is None:
+
+            return
+
+        try:
+
+            self._queue.put_nowait(span)
+
+        except queue.Full:
+
+            self.dropped += 1
+
+    def flush(self):
+
+        batch = []
+
+        while True:
+
+            try:
+
+                batch.append(self._queue.get_nowait().to_dict())
+
+            except queue.Empty:
+
+                break
+
+            if len(batch) >= TRACE_BATCH_SIZE:
+
+                self._export(batch)
+
+                batch = []
+
+        if batch:
+
+            self._export(batch)
+
+    def _export(self, batch: List[dict]):
+
+        try:
+
+            self.target.export(batch)
+
+        except Exception as e:
+
+            logger.error("Erro ao exportar %d spans: %s", len(batch), e)
+
+    def _loop(self):
+
+        while True:
+
+            time.sleep(TRACE_EXPORT_INTERVAL)
+
+            self.flush()
+
+    def reinit_after_fork(self):
+
+        self._queue = queue.Queue(TRACE_QUEUE_SIZE)
+
+        self._thread = None
+
+        if self.target is not None:
+
+            self._start()
+
+
+exporter = BatchExporter()
+
+if hasattr(os, "register_at_fork"):
+
+    os.register_at_fork(after_in_child=exporter.reinit_after_fork)
+
+
+def build_exporter(name: str = TRACE_EXPORTER) -> Optional[SpanExporter]:
+
+    if name == "stdout":
+
+        return StdoutExporter()
+
+    if name == "file":
+
+        return FileExporter()
+
+    if name == "memory":
+
+        return InMemoryExporter()
+
+    return None
+
+
+class LogContextFilter(logging.Filter):
+    """
+    Adiciona request_id, trace_id e span_id aos registros de log (aparecem como campos
+    no formato JSON de components.logger e como [request_id] no formato texto).
+    Fora de uma requisição request_id é "-"; a linha de acesso do werkzeug, logada após o
+    fim da requisição, recebe o request_id da requisição que acabou de ser atendida.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+
+        request_id = _request_id.get()
+
+        if request_id is None:
+
+            access_id = _access_request_id.get() if record.name == "werkzeug" else None
+
+            record.request_id = access_id or "-"
+
+        else:
+
+            record.request_id = request_id
+
+            span = _current_span.get()
+
+            if span is not None:
+
+                record.trace_id = span.trace_id
+
+                record.span_id = span.span_id
+
+        return True
+
+
+def _before_request():
+
+    incoming = request.headers.get("traceparent")
+
+    parsed = parse_traceparent(incoming) if incoming else None
+
+    if parsed is not None:
+
+        trace_id, parent_id, parent_sampled = parsed
+
+    else:
+
+        trace_id, parent_id, parent_sampled = f"{random.getrandbits(128):032x}", None, None
+
+    request_id = request.headers.get(REQUEST_ID_HEADER) or trace_id
+
+    endpoint = request.endpoint.rsplit(".", 1)[-1] if request.endpoint else "unmatched"
+
+    span = Span(f"{request.method} {endpoint}", trace_id, parent_id, sampler.sample(parent_sampled))
+
+    span.attributes["http.path"] = request.path
+
+    g.trace_tokens = (_request_id.set(request_id), _current_span.set(span))
+
+    _access_request_id.set(request_id)
+
+    g.trace_span = span
+
+
+def _after_request(response):
+
+    span = getattr(g, "trace_span", None)
+
+    if span is None:
+
+        return response
+
+    span.attributes["http.status_code"] = response.status_code
+
+    response.headers[REQUEST_ID_HEADER] = _request_id.get()
+
+    response.headers["traceparent"] = span.traceparent()
+
+    return response
+
+
+def _teardown_request(exc):
+
+    span = g.pop("trace_span", None)
+
+    tokens = g.pop("trace_tokens", None)
+
+    if span is None:
+
+        return
+
+    if exc is not None:
+
+        span.attributes["error"] = repr(exc)
+
+    span.end()
+
+    request_token, span_token = tokens
+
+    _current_span.reset(span_token)
+
+    _request_id.reset(request_token)
+
+
+def init_tracing(app: Flask, *loggers: logging.Logger, target: Optional[SpanExporter] = None):
+    """
+    Habilita o tracing por requisição.
+    Parâmetros:
+        app (Flask): Aplicação a instrumentar.
+        *loggers (logging.Logger): Loggers que recebem request_id/trace_id/span_id.
+        target (SpanExporter, opcional): Destino dos spans. Padrão: TRACE_EXPORTER.
+    Comportamento:
+        - Lê ou gera o X-Request-ID e o traceparent (W3C) da requisição e os devolve na
+          resposta; o contexto fica em ContextVars, herdado por tasks asyncio e por threads
+          iniciadas com wrap_context().
+        - Funções decoradas com components.timer viram spans filhos do span da requisição.
+        - Apenas traces amostrados (TRACE_SAMPLE_RATE, limitado por TRACE_MAX_PER_SECOND)
+          são exportados, em lotes, por uma thread em background.
+    """
+
+    exporter.set_target(target or build_exporter())
+
+    # Chamadas repetidas de handle_app() não duplicam o filtro
+    for item in loggers:
+
+        if not any(isinstance(existing, LogContextFilter) for existing in item.filters):
+
+            item.addFilter(LogContextFilter())
+
+    app.before_request(_before_request)
+
+    app.after_request(_after_request)
+
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,319 @@
+import os
+import threading
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, jsonify, request
+from flask_restx import Api, abort, fields
+from jsonschema import Draft4Validator, FormatChecker
+
+from components.logger import logger
+
+try:
+
+    import fastjsonschema
+
+except ImportError:
+
+    fastjsonschema = None
+
+# "fastjsonschema" (gera código Python por schema) ou "jsonschema"; "auto" usa o primeiro disponível
+VALIDATION_BACKEND = os.getenv("VALIDATION_BACKEND", "auto").lower()
+
+if VALIDATION_BACKEND == "auto":
+
+    VALIDATION_BACKEND = "fastjsonschema" if fastjsonschema is not None else "jsonschema"
+
+# Tamanho máximo (bytes) do corpo das requisições; 0 desativa o limite
+MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(1024 * 1024)))
+
+# Se "1", valida todos os @ns.expect(model) mesmo sem validate=True (RESTX_VALIDATE)
+VALIDATE_PAYLOADS = os.getenv("VALIDATE_PAYLOADS", "0") == "1"
+
+# Se "1", @validate_response confere as respostas contra o modelo (desenvolvimento/homologação)
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "0") == "1"
+
+# Os modelos do flask-restx seguem o Swagger 2.0, que usa o JSON Schema draft 4
+DRAFT4 = "http://json-schema.org/draft-04/schema#"
+
+
+def _collect(model, definitions: dict):
+
+    if model.name in definitions:
+
+        return
+
+    definitions[model.name] = model.__schema__
+
+    for parent in model.__parents__:
+
+        _collect(parent, definitions)
+
+    for field in model.values():
+
+        _collect_field(field, definitions)
+
+
+def _collect_field(field, definitions: dict):
+
+    if isinstance(field, fields.Polymorph):
+
+        for model in field.mapping.values():
+
+            _collect(model, definitions)
+
+    elif isinstance(field, fields.Nested):
+
+        _collect(field.nested, definitions)
+
+    elif isinstance(field, (fields.List, fields.Wildcard)):
+
+        _collect_field(field.container, definitions)
+
+
+def _format_error(error) -> tuple:
+
+    # Mesmo formato do flask-restx (ModelBase.format_error): "a.b.0.c" -> mensagem
+    path = list(error.path)
+
+    if error.validator == "required":
+
+        path.append(error.message.split("'")[1])
+
+    return ".".join(str(part) for part in path), error.message
+
+
+class CompiledSchema:
+    """
+    Schema de um modelo do flask-restx compilado uma única vez.
+    Parâmetros:
+        model (Model): Modelo do flask-restx (inclui os modelos aninhados e pais).
+        format_checker (FormatChecker, opcional): Valida "format" (date-time, email...).
+            Padrão: None, como no flask-restx.
+        backend (str, opcional): "fastjsonschema" ou "jsonschema". Padrão: VALIDATION_BACKEND.
+    Comportamento:
+        - O schema (com as definitions dos modelos referenciados) é montado no construtor;
+          o flask-restx refaz esse trabalho e cria um novo validador a cada requisição.
+        - O caminho válido usa só a função gerada pelo fastjsonschema (ou o validador
+          jsonschema reaproveitado); os erros detalhados são coletados com o jsonschema
+          apenas quando o payload é inválido.
+    """
+
+    __slots__ = ("name", "schema", "_check", "_validator")
+
+    def __init__(self, model, format_checker=None, backend: str = VALIDATION_BACKEND):
+
+        definitions: Dict[str, dict] = {}
+
+        _collect(model, definitions)
+
+        self.name = model.name
+
+        self.schema = {**model.__schema__, "$schema": DRAFT4, "definitions": definitions}
+
+        self._validator = Draft4Validator(self.schema, format_checker=format_checker)
+
+        self._check = None
+
+        if backend == "fastjsonschema":
+
+            self._check = fastjsonschema.compile(
+                self.schema, use_formats=format_checker is not None
+            )
+
+    def errors(self, data) -> Optional[dict]:
+        """
+        Retorna None se `data` for válido, senão {caminho: mensagem}.
+        """
+
+        if self._check is not None:
+
+            try:
+
+                self._check(data)
+
+                return None
+
+            except fastjsonschema.JsonSchemaException as e:
+
+                return dict(map(_format_error, self._validator.iter_errors(data))) or {
+                    "": e.message
+                }
+
+        if self._validator.is_valid(data):
+
+            return None
+
+        return dict(map(_format_error, self._validator.iter_errors(data)))
+
+
+# (nome do modelo, com format_checker) -> (modelo, schema compilado); o modelo fica
+# referenciado para que um objeto novo com o mesmo nome seja detectado e recompilado
+_compiled: Dict[Tuple[object, bool], Tuple[object, CompiledSchema]] = {}
+
+_compiled_lock = threading.Lock()
+
+
+def compile_model(model, format_checker=None) -> CompiledSchema:
+    """
+    Retorna o CompiledSchema do modelo, compilando-o na primeira chamada.
+    Modelos iguais pedidos com e sem format_checker são compilados separadamente.
+    """
+
+    key = (model.name or id(model), format_checker is not None)
+
+    entry = _compiled.get(key)
+
+    if entry is None or entry[0] is not model:
+
+        with _compiled_lock:
+
+            entry = _compiled.get(key)
+
+            if entry is None or entry[0] is not model:
+
+                entry = _compiled[key] = (model, CompiledSchema(model, format_checker))
+
+    return entry[1]
+
+
+def _install(model, compiled: CompiledSchema):
+
+    # Substitui ModelBase.validate na instância; o Resource do flask-restx chama
+    # expect.validate(data, resolver, format_checker) para cada @expect(validate=True)
+    def validate(data, resolver=None, format_checker=None):
+
+        errors = compiled.errors(data)
+
+        if errors is not None:
+
+            abort(400, message="Input payload validation failed", errors=errors)
+
+    model.validate = validate
+
+
+def _reject_oversized():
+
+    # Recusa pelo Content-Length, antes de qualquer leitura do corpo; corpos chunked sem
+    # Content-Length são limitados pelo Werkzeug (MAX_CONTENT_LENGTH) durante a leitura
+    length = request.content_length
+
+    if MAX_CONTENT_LENGTH and length is not None and length > MAX_CONTENT_LENGTH:
+
+        response = jsonify({"message": "Corpo da requisição excede o tamanho máximo"})
+
+        response.status_code = 413
+
+        response.headers["Connection"] = "close"
+
+        return response
+
+    return None
+
+
+def init_validation(app: Flask, api: Api) -> int:
+    """
+    Configura a validação das requisições para todos os modelos registrados no Api.
+    Parâmetros:
+        app (Flask): Aplicação.
+        api (Api): Api com os namespaces já adicionados (api.models).
+    Retorna:
+        int: Quantidade de modelos compilados.
+    Comportamento:
+        - Define MAX_CONTENT_LENGTH no app e recusa com 413 requisições cujo Content-Length
+          exceda o limite, antes do parse do JSON.
+        - Compila o schema de cada modelo uma vez (CompiledSchema) e o usa no lugar da
+          validação por requisição do flask-restx, com as mesmas respostas 400.
+        - VALIDATE_PAYLOADS=1 liga a validação de todos os @expect (RESTX_VALIDATE).
+    Observações:
+        - Deve ser chamado antes de app.register_blueprint: o flask-restx lê
+          RESTX_VALIDATE ao ser registrado.
+        - Modelos criados após esta chamada, ou fora de api/ns.model, continuam com a
+          validação padrão do flask-restx.
+    """
+
+    if MAX_CONTENT_LENGTH:
+
+        app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
+
+        app.before_request(_reject_oversized)
+
+    if VALIDATE_PAYLOADS:
+
+        app.config["RESTX_VALIDATE"] = True
+
+    format_checker = FormatChecker() if api.format_checker is not None else None
+
+    models = [model for model in api.models.values() if isinstance(model, dict)]
+
+    for model in models:
+
+        _install(model, compile_model(model, format_checker))
+
+    logger.info(
+        "Validação: %s modelos compilados (%s), corpo máximo=%s bytes",
+        len(models),
+        VALIDATION_BACKEND,
+        MAX_CONTENT_LENGTH or "sem limite",
+    )
+
+    return len(models)
+
+
+def validate_response(model, as_list: bool = False):
+    """
+    Decorator que confere a resposta de um método de Resource contra `model`.
+    Parâmetros:
+        model (Model): Modelo esperado na resposta.
+        as_list (bool, opcional): A resposta é uma lista de `model`. Padrão: False.
+    Comportamento:
+        - Com VALIDATE_RESPONSES=0 (padrão, produção) retorna o método sem alterações:
+          nenhum custo por requisição.
+        - Com VALIDATE_RESPONSES=1, respostas 2xx fora do contrato são logadas e viram 500
+          com os erros, para que a divergência apareça nos testes e em homologação.
+    Exemplo:
+        @validate_response(usuario_model)
+        def get(self, id): ...
+    """
+
+    def decorator(function):
+
+        if not VALIDATE_RESPONSES:
+
+            return function
+
+        compiled = compile_model(model)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+
+            result = function(*args, **kwargs)
+
+            data, status = (result[0], result[1]) if isinstance(result, tuple) else (result, 200)
+
+            if not isinstance(status, int) or not 200 <= status < 300:
+
+                return result
+
+            items = data if as_list and isinstance(data, list) else [data]
+
+            for item in items:
+
+                errors = compiled.errors(item)
+
+                if errors is not None:
+
+                    logger.error(
+                        "Resposta de %s fora do modelo %s: %s",
+                        function.__qualname__,
+                        compiled.name,
+                        errors,
+                    )
+
+                    return {"message": "Resposta fora do modelo", "errors": errors}, 500
+
+            return result
+
+        return wrapper
+
+    return decorator
@@ -2,6 +2,10 @@
 from flask import request
 from flask_restx import Namespace, Resource
 
+# Componentes
+from components.health import health
+from components.idempotency import idempotent
+
 api = Namespace("healthy", "Rotas destinadas apenas para o teste de conexão com a API")
 
 
@@ -25,21 +29,56 @@ class TestResource(Resource):
     - Respostas intencionais simples para facilitar testes automatizados e manuais.
     Observações:
     - Todas as respostas retornam código HTTP 200.
-    - Pode ser estendido para incluir checks mais detalhados (ex.: dependências de
-        banco, fila, serviços externos) conforme necessidade.
+    - POST, PUT, DELETE e PATCH aceitam o header Idempotency-Key
+        (components.idempotency): repetições recebem a resposta guardada.
+    - Checks de dependências (banco, fila, serviços externos) ficam em
+        /healthy/ready, registrados via components.health.register_probe.
     """
 
     def get(self):
         return {"message": "API is healthy and get method is working"}, 200
 
+    @idempotent()
     def post(self):
         return {"message": "API is healthy and post method is working"}, 200
 
+    @idempotent()
     def put(self):
         return {"message": "API is healthy and put method is working"}, 200
 
+    @idempotent()
     def delete(self):
         return {"message": "API is healthy and delete method is working"}, 200
 
+    @idempotent()
     def patch(self):
         return {"message": "API is healthy and patch method is working"}, 200
+
+
+@api.route("/live")
+class LivenessResource(Resource):
+    """
+    Liveness probe: indica apenas que o processo está respondendo.
+    Não consulta dependências, para que uma falha externa não provoque o restart
+    do container.
+    """
+
+    def get(self):
+        return {"status": "ok"}, 200
+
+
+@api.route("/ready")
+class ReadinessResource(Resource):
+    """
+    Readiness probe: executa em paralelo as probes registradas em components.health.
+    Métodos suportados:
+    - get(self): Retorna o status agregado e, por dependência, status e latência (ms).
+        Responde 503 se alguma probe crítica falhar ou estourar o timeout.
+    Observações:
+    - O resultado é reaproveitado por HEALTH_CACHE_TTL segundos, então polls frequentes
+        do load balancer não se multiplicam em carga nas dependências.
+    """
+
+    def get(self):
+        result = health.check()
+        return result, 200 if result["status"] == "ok" else 503
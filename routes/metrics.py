@@ -0,0 +1,24 @@
+# Flask
+from flask import Response
+from flask_restx import Namespace, Resource
+
+# Componentes
+from components.metrics import CONTENT_TYPE, render_metrics
+
+api = Namespace("metrics", "Métricas da API no formato texto do Prometheus")
+
+
+@api.route("")
+class MetricsResource(Resource):
+    """
+    Recurso de exposição de métricas para o Prometheus.
+    Métodos suportados:
+    - get(self): Retorna as métricas agregadas de todos os workers (contagem de
+        requisições, requisições em andamento, latência e tamanho das respostas).
+    Observações:
+    - A resposta é texto puro (não JSON), por isso é montada diretamente em um
+        flask.Response em vez de passar pela serialização do flask-restx.
+    """
+
+    def get(self):
+        return Response(render_metrics(), status=200, content_type=CONTENT_TYPE)
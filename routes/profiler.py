@@ -0,0 +1,89 @@
+# Flask
+from flask import Response, request
+from flask_restx import Namespace, Resource
+
+# Componentes
+from components.profiler import (
+    PROFILER_MAX_SECONDS,
+    admin_required,
+    profiler,
+    render_collapsed,
+    slow_requests,
+)
+
+api = Namespace("profiler", "Profiling sob demanda e requisições lentas (restrito a administradores)")
+
+
+@api.route("/cpu")
+class CpuProfileResource(Resource):
+    """
+    Profiling por amostragem de todas as threads do processo.
+    Métodos suportados:
+    - get(self): Amostra por ?seconds=N (padrão 5, máximo PROFILER_MAX_SECONDS) e retorna
+        as pilhas no formato collapsed (texto), pronto para flamegraph.pl/speedscope.
+    Observações:
+    - Exige PROFILER_ENABLED=1 e um JWT com a claim "admin": true.
+    - A requisição fica aberta durante a amostragem; apenas uma sessão por processo
+        (as demais recebem 409). Com vários workers, cada chamada perfila um deles.
+    """
+
+    @admin_required
+    def get(self):
+
+        try:
+
+            seconds = float(request.args.get("seconds", "5"))
+
+        except ValueError:
+
+            return {"message": "seconds deve ser numérico"}, 400
+
+        seconds = min(max(seconds, 0.1), PROFILER_MAX_SECONDS)
+
+        stacks = profiler.profile(seconds)
+
+        if stacks is None:
+
+            return {"message": "Já existe uma sessão de profiling em andamento"}, 409
+
+        return Response(render_collapsed(stacks), status=200, content_type="text/plain; charset=utf-8")
+
+
+@api.route("/slow")
+class SlowRequestListResource(Resource):
+    """
+    Requisições que passaram de PROFILER_SLOW_MS, mais recentes por último.
+    Métodos suportados:
+    - get(self): Lista as capturas (sem as pilhas).
+    - delete(self): Limpa o buffer.
+    """
+
+    @admin_required
+    def get(self):
+
+        return {"items": slow_requests.summaries()}, 200
+
+    @admin_required
+    def delete(self):
+
+        slow_requests.clear()
+
+        return {"message": "Capturas removidas"}, 200
+
+
+@api.route("/slow/<int:entry_id>")
+class SlowRequestResource(Resource):
+    """
+    Pilhas (formato collapsed) capturadas durante uma requisição lenta.
+    """
+
+    @admin_required
+    def get(self, entry_id):
+
+        entry = slow_requests.get(entry_id)
+
+        if entry is None:
+
+            return {"message": "Captura não encontrada"}, 404
+
+        return Response(entry["stacks"], status=200, content_type="text/plain; charset=utf-8")
@@ -0,0 +1,58 @@
+# Flask
+from flask_restx import Namespace, Resource
+
+# Componentes
+from components.tasks import PENDING, executor
+
+api = Namespace("tasks", "Status e resultado das tarefas executadas em background")
+
+
+@api.route("/<string:task_id>")
+class TaskResource(Resource):
+    """
+    Status de uma tarefa enviada com components.tasks (URL retornada no Location do 202).
+    Métodos suportados:
+    - get(self, task_id): Retorna id, name, status (queued, running, succeeded, failed) e
+        os instantes de envio, início e fim. 404 se a tarefa não existir ou já tiver expirado
+        (TASKS_RESULT_TTL).
+    """
+
+    def get(self, task_id):
+
+        state = executor.status(task_id)
+
+        if state is None:
+
+            return {"message": "Tarefa não encontrada"}, 404
+
+        state.pop("result", None)
+
+        return state, 200
+
+
+@api.route("/<string:task_id>/result")
+class TaskResultResource(Resource):
+    """
+    Resultado de uma tarefa.
+    Métodos suportados:
+    - get(self, task_id): 200 com o retorno da tarefa; 202 enquanto ela estiver pendente;
+        500 com a mensagem de erro se ela falhou; 404 se não existir ou tiver expirado.
+    """
+
+    def get(self, task_id):
+
+        state = executor.status(task_id)
+
+        if state is None:
+
+            return {"message": "Tarefa não encontrada"}, 404
+
+        if state["status"] in PENDING:
+
+            return {"status": state["status"]}, 202
+
+        if state["status"] == "failed":
+
+            return {"status": "failed", "error": state.get("error")}, 500
+
+        return {"status": "succeeded", "result": state.get("result")}, 200
@@ -0,0 +1,161 @@
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+# Componentes
+from components.logger import logger
+from components.metrics import METRICS_MULTIPROC_DIR, retire_worker, write_snapshot
+from components.pool import init_worker_pools
+
+HOST = os.getenv("HOST", "0.0.0.0")
+
+PORT = int(os.getenv("PORT", "5000"))
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+
+THREADS = int(os.getenv("WEB_THREADS", "4"))
+
+# Recicla o worker após N requisições (+ jitter para não reciclar todos juntos)
+MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "1000"))
+
+MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "100"))
+
+KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+TIMEOUT = int(os.getenv("WEB_TIMEOUT", "30"))
+
+GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+
+# Arquivo criado quando o master está pronto para aceitar conexões (readiness probe)
+READY_FILE = os.getenv("READY_FILE", "/tmp/api-ready")
+
+
+def on_starting(server):
+    """
+    Remove snapshots de métricas de execuções anteriores antes de iniciar os workers.
+    """
+
+    if not METRICS_MULTIPROC_DIR or not os.path.isdir(METRICS_MULTIPROC_DIR):
+
+        return
+
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+
+        if name.startswith("metrics_"):
+
+            os.remove(os.path.join(METRICS_MULTIPROC_DIR, name))
+
+
+def when_ready(server):
+    """
+    Chamado no master após o preload da aplicação e o bind do socket.
+    Congela os objetos já alocados (gc.freeze) para que o coletor não os toque nos
+    workers, preservando o compartilhamento copy-on-write, e sinaliza readiness.
+    """
+
+    gc.freeze()
+
+    with open(READY_FILE, "w") as f:
+
+        f.write(str(os.getpid()))
+
+    logger.info("Servidor pronto em %s:%d com %d workers", HOST, PORT, WORKERS)
+
+
+def post_fork(server, worker):
+    """
+    Chamado no worker logo após o fork: inicia os recursos por worker dos pools de conexão.
+    """
+
+    init_worker_pools()
+
+
+def worker_exit(server, worker):
+    """
+    Chamado no worker ao sair (reciclagem por WEB_MAX_REQUESTS, HUP, shutdown): grava o
+    snapshot final de métricas, com os incrementos posteriores ao último flush periódico.
+    """
+
+    write_snapshot()
+
+
+def child_exit(server, worker):
+    """
+    Chamado no master após a saída de um worker, inclusive quando ele é morto sem passar
+    por worker_exit: consolida o snapshot do worker no acumulador de workers encerrados.
+    """
+
+    retire_worker(worker.pid)
+
+
+def on_exit(server):
+
+    try:
+
+        os.remove(READY_FILE)
+
+    except FileNotFoundError:
+
+        pass
+
+
+class ProductionServer(BaseApplication):
+    """
+    Servidor de produção pre-fork (gunicorn) em torno de handle_app().
+    Parâmetros:
+        options (dict, opcional): Configurações do gunicorn que sobrescrevem os padrões
+            lidos das variáveis de ambiente.
+    Comportamento:
+        - preload_app: a aplicação é criada no master antes do fork, compartilhando memória
+          entre os workers via copy-on-write.
+        - Workers gthread com WEB_THREADS threads cada quando WEB_THREADS > 1, sync caso contrário.
+        - Reciclagem graciosa dos workers após WEB_MAX_REQUESTS requisições (com jitter).
+        - Keep-alive configurável (WEB_KEEPALIVE) para reaproveitar conexões do proxy.
+        - Readiness sinalizada pelo arquivo READY_FILE.
+    """
+
+    def __init__(self, options: dict = None):
+
+        self.options = {
+            "bind": f"{HOST}:{PORT}",
+            "workers": WORKERS,
+            "threads": THREADS,
+            "worker_class": "gthread" if THREADS > 1 else "sync",
+            "preload_app": True,
+            "max_requests": MAX_REQUESTS,
+            "max_requests_jitter": MAX_REQUESTS_JITTER,
+            "keepalive": KEEPALIVE,
+            "timeout": TIMEOUT,
+            "graceful_timeout": GRACEFUL_TIMEOUT,
+            "on_starting": on_starting,
+            "when_ready": when_ready,
+            "post_fork": post_fork,
+            "worker_exit": worker_exit,
+            "child_exit": child_exit,
+            "on_exit": on_exit,
+        }
+
+        self.options.update(options or {})
+
+        super().__init__()
+
+    def load_config(self):
+
+        for key, value in self.options.items():
+
+            if key in self.cfg.settings and value is not None:
+
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+
+        from app import handle_app
+
+        return handle_app()
+
+
+if __name__ == "__main__":
+
+    ProductionServer().run()
@@ -0,0 +1,368 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config
+from jwt import get_unverified_header
+
+from components.logger import logger
+from components.secrets import get_secret
+
+# Quantidade máxima de tokens verificados mantidos em cache; 0 desativa
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
+# kid usado quando apenas jwt_secret_key está configurada
+DEFAULT_KID = "default"
+
+
+def token_digest(encoded_token: str) -> bytes:
+    """
+    Digest curto (16 bytes) de um token, usado como chave do cache para não manter o
+    token completo em memória.
+    """
+
+    return hashlib.blake2b(encoded_token.encode(), digest_size=16).digest()
+
+
+def key_fingerprint(secret: str) -> bytes:
+    """
+    Digest curto de uma chave de verificação: entradas do TokenCache verificadas com uma
+    chave diferente da atual (ex.: jwt_secret_key rotacionada) são descartadas.
+    """
+
+    return hashlib.blake2b(secret.encode(), digest_size=16).digest()
+
+
+class KeyRing:
+    """
+    Conjunto de chaves HMAC ativas, identificadas por kid.
+    Fontes (via get_secret, portanto com cache e recarga do SecretStore):
+        - jwt_keys: JSON {"kid": "segredo", ...} com todas as chaves aceitas na verificação.
+        - jwt_active_kid: kid usado para assinar novos tokens.
+        - jwt_secret_key: usada como kid "default" quando jwt_keys não existe.
+        jwt_keys e jwt_active_kid são opcionais: a ausência não gera log de erro.
+    Comportamento:
+        - Na rotação, publique a nova chave em jwt_keys, troque jwt_active_kid e mantenha a
+          antiga até os tokens emitidos com ela expirarem; apenas tokens do kid removido
+          deixam de ser aceitos.
+        - O JSON só é reprocessado quando o valor da secret muda.
+    """
+
+    def __init__(self):
+
+        self._raw: Optional[Tuple] = None
+
+        self._keys: Dict[str, str] = {}
+
+        self._fingerprints: Dict[str, bytes] = {}
+
+        self._active = DEFAULT_KID
+
+    def _refresh(self):
+
+        raw = (
+            get_secret("jwt_keys", optional=True),
+            get_secret("jwt_active_kid", optional=True),
+            get_secret("jwt_secret_key"),
+        )
+
+        if raw == self._raw:
+
+            return
+
+        keys_json, active_kid, secret_key = raw
+
+        keys: Dict[str, str] = {}
+
+        if keys_json:
+
+            try:
+
+                keys = dict(json.loads(keys_json))
+
+            except (TypeError, ValueError) as e:
+
+                logger.error("jwt_keys inválido: %s", e)
+
+        if not keys and secret_key:
+
+            keys = {DEFAULT_KID: secret_key}
+
+        active = active_kid or (
+            DEFAULT_KID if DEFAULT_KID in keys else next(iter(keys), DEFAULT_KID)
+        )
+
+        if active not in keys:
+
+            logger.error("jwt_active_kid %s não está entre as chaves configuradas", active)
+
+        self._fingerprints = {kid: key_fingerprint(secret) for kid, secret in keys.items()}
+
+        self._keys, self._active, self._raw = keys, active, raw
+
+    @property
+    def keys(self) -> Dict[str, str]:
+
+        self._refresh()
+
+        return self._keys
+
+    @property
+    def fingerprints(self) -> Dict[str, bytes]:
+
+        self._refresh()
+
+        return self._fingerprints
+
+    @property
+    def active_kid(self) -> str:
+
+        self._refresh()
+
+        return self._active
+
+    def signing_key(self) -> str:
+
+        return self.keys.get(self.active_kid, "")
+
+    def verification_key(self, kid: Optional[str]) -> str:
+
+        return self.keys.get(kid or DEFAULT_KID, "")
+
+
+class RevocationStore:
+    """
+    Interface do armazenamento de tokens revogados (blocklist) por jti.
+    Implementações compartilhadas (ex.: Redis com expiração) devem implementar estes métodos;
+    MemoryRevocationStore é a implementação em processo.
+    """
+
+    def revoke(self, jti: str, expires_at: float):
+
+        raise NotImplementedError
+
+    def is_revoked(self, jti: str) -> bool:
+
+        raise NotImplementedError
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    Blocklist em memória compacta: guarda um hash de 64 bits do jti e a expiração do token.
+    Entradas expiradas são descartadas periodicamente, já que um token expirado é rejeitado
+    de qualquer forma.
+    """
+
+    def __init__(self, purge_every: int = 1024):
+
+        self._entries: Dict[int, float] = {}
+
+        self._lock = threading.Lock()
+
+        self._purge_every = purge_every
+
+        self._ops = 0
+
+    @staticmethod
+    def _hash(jti: str) -> int:
+
+        return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), "big")
+
+    def revoke(self, jti: str, expires_at: float):
+
+        with self._lock:
+
+            self._entries[self._hash(jti)] = expires_at
+
+            self._ops += 1
+
+            if self._ops % self._purge_every == 0:
+
+                now = time.time()
+
+                self._entries = {k: v for k, v in self._entries.items() if v > now}
+
+    def is_revoked(self, jti: str) -> bool:
+
+        return self._hash(jti) in self._entries
+
+    def __len__(self) -> int:
+
+        return len(self._entries)
+
+
+class TokenCache:
+    """
+    LRU limitado de claims já verificados, indexado pelo digest do token.
+    Cada entrada guarda (claims, exp, kid, fingerprint da chave): expira junto com o token
+    (respeitando o JWT_DECODE_LEEWAY, como o flask_jwt_extended) e é descartada se o kid
+    deixar de estar no KeyRing ou se a chave desse kid mudar, inclusive a jwt_secret_key
+    do kid "default".
+    """
+
+    def __init__(self, max_size: int = JWT_CACHE_SIZE):
+
+        self.max_size = max_size
+
+        self._entries: "OrderedDict[bytes, Tuple[dict, float, str, bytes]]" = OrderedDict()
+
+        self._lock = threading.Lock()
+
+        self.hits = 0
+
+        self.misses = 0
+
+    def get(
+        self, digest: bytes, fingerprints: Dict[str, bytes], leeway: float = 0
+    ) -> Optional[dict]:
+
+        with self._lock:
+
+            entry = self._entries.get(digest)
+
+            if entry is None:
+
+                self.misses += 1
+
+                return None
+
+            claims, exp, kid, fingerprint = entry
+
+            if exp + leeway <= time.time() or fingerprints.get(kid) != fingerprint:
+
+                del self._entries[digest]
+
+                self.misses += 1
+
+                return None
+
+            self._entries.move_to_end(digest)
+
+            self.hits += 1
+
+            return claims
+
+    def set(self, digest: bytes, claims: dict, kid: str, fingerprint: bytes):
+
+        exp = claims.get("exp")
+
+        if not self.max_size or exp is None:
+
+            return
+
+        with self._lock:
+
+            self._entries[digest] = (claims, float(exp), kid, fingerprint)
+
+            self._entries.move_to_end(digest)
+
+            while len(self._entries) > self.max_size:
+
+                self._entries.popitem(last=False)
+
+    def clear(self):
+
+        with self._lock:
+
+            self._entries.clear()
+
+
+class CachedJWTManager(JWTManager):
+    """
+    JWTManager com caminho rápido de verificação e suporte a múltiplas chaves (kid).
+    Comportamento:
+        - Tokens já verificados e ainda não expirados são servidos do TokenCache, sem
+          nova decodificação/verificação HMAC. Blocklist, tipo do token e demais checagens
+          do flask_jwt_extended continuam sendo executados a cada requisição.
+        - A chave de verificação é escolhida pelo kid do header; novos tokens são assinados
+          com a chave ativa e recebem o kid no header.
+        - Tokens revogados (revoke_token) são rejeitados via token_in_blocklist_loader.
+    Parâmetros:
+        app (Flask, opcional): Aplicação a inicializar.
+        key_ring (KeyRing, opcional): Fonte das chaves. Padrão: KeyRing().
+        revocations (RevocationStore, opcional): Blocklist. Padrão: MemoryRevocationStore().
+        cache_size (int, opcional): Tamanho do TokenCache. Padrão: JWT_CACHE_SIZE.
+    """
+
+    def __init__(
+        self,
+        app=None,
+        key_ring: Optional[KeyRing] = None,
+        revocations: Optional[RevocationStore] = None,
+        cache_size: int = JWT_CACHE_SIZE,
+    ):
+
+        self.key_ring = key_ring or KeyRing()
+
+        self.revocations = revocations or MemoryRevocationStore()
+
+        self.token_cache = TokenCache(cache_size)
+
+        super().__init__(app)
+
+        self.encode_key_loader(lambda identity: self.key_ring.signing_key())
+
+        self.decode_key_loader(
+            lambda jwt_header, jwt_data: self.key_ring.verification_key(jwt_header.get("kid"))
+        )
+
+        self.additional_headers_loader(lambda identity: {"kid": self.key_ring.active_kid})
+
+        self.token_in_blocklist_loader(self._is_revoked)
+
+    def _is_revoked(self, jwt_header: dict, jwt_data: dict) -> bool:
+
+        jti = jwt_data.get("jti")
+
+        return jti is not None and self.revocations.is_revoked(jti)
+
+    def _decode_jwt_from_config(
+        self, encoded_token: str, csrf_value=None, allow_expired: bool = False
+    ) -> dict:
+
+        if allow_expired or not self.token_cache.max_size:
+
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        digest = token_digest(encoded_token)
+
+        leeway = config.leeway
+
+        if isinstance(leeway, timedelta):
+
+            leeway = leeway.total_seconds()
+
+        claims = self.token_cache.get(digest, self.key_ring.fingerprints, leeway)
+
+        if claims is not None and (csrf_value is None or claims.get("csrf") == csrf_value):
+
+            return claims
+
+        # Fingerprint lido antes da verificação: se a chave mudar no meio, a entrada fica
+        # com o fingerprint antigo e é descartada na próxima consulta
+        kid = get_unverified_header(encoded_token).get("kid") or DEFAULT_KID
+
+        fingerprint = self.key_ring.fingerprints.get(kid)
+
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        if fingerprint is not None:
+
+            self.token_cache.set(digest, claims, kid, fingerprint)
+
+        return claims
+
+    def revoke_token(self, jwt_data: dict):
+        """
+        Revoga o token (pelo jti) até a sua expiração.
+        """
+
+        expires_at = float(jwt_data.get("exp", time.time() + 86400))
+
+        self.revocations.revoke(jwt_data["jti"], expires_at)
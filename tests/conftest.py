@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Permite importar components/, routes/ e src/ ao rodar "pytest tests/" da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,212 @@
+import time
+
+import pytest
+from flask import Flask, request
+from flask_restx import Api, Resource
+
+from components.cache import (
+    CachedResponse,
+    LRUCache,
+    cached,
+    get_cache_backend,
+    invalidate_tags,
+    set_cache_backend,
+)
+
+
+@pytest.fixture
+def calls():
+
+    set_cache_backend(LRUCache())
+
+    return []
+
+
+@pytest.fixture
+def items():
+
+    return ["a"]
+
+
+@pytest.fixture
+def client(calls, items):
+
+    app = Flask(__name__)
+
+    api = Api(app)
+
+    @api.route("/items")
+    class Items(Resource):
+
+        @cached(ttl=60, tags=("items",))
+        def get(self):
+
+            calls.append(request.query_string)
+
+            return {"args": request.args.to_dict(flat=False), "items": list(items)}
+
+        def post(self):
+
+            items.append(request.get_json()["item"])
+
+            invalidate_tags("items")
+
+            return {"items": items}, 201
+
+    return app.test_client()
+
+
+def entry(size: int = 1, tags=(), ttl: float = 60) -> CachedResponse:
+
+    return CachedResponse(b"x" * size, 200, [], '"e"', tuple(tags), time.time() + ttl)
+
+
+def test_second_request_is_a_hit(client, calls):
+
+    first = client.get("/items?a=1")
+
+    second = client.get("/items?a=1")
+
+    assert first.headers["X-Cache"] == "MISS"
+
+    assert second.headers["X-Cache"] == "HIT"
+
+    assert first.get_json() == second.get_json()
+
+    assert len(calls) == 1
+
+
+def test_argument_order_shares_entry(client, calls):
+
+    client.get("/items?a=1&b=2")
+
+    client.get("/items?b=2&a=1")
+
+    assert len(calls) == 1
+
+
+def test_encoded_separators_do_not_collide(client, calls):
+
+    plain = client.get("/items?a=1&b=2")
+
+    encoded = client.get("/items?a=1%26b%3D2")
+
+    assert plain.get_json() != encoded.get_json()
+
+    assert encoded.headers["X-Cache"] == "MISS"
+
+    assert len(calls) == 2
+
+
+def test_missing_and_empty_vary_header_do_not_collide(client, calls):
+
+    client.get("/items")
+
+    client.get("/items", headers={"Accept": ""})
+
+    assert len(calls) == 2
+
+
+def test_vary_header_is_sent(client):
+
+    miss = client.get("/items")
+
+    hit = client.get("/items")
+
+    assert "Accept" in miss.headers["Vary"]
+
+    assert "Accept" in hit.headers["Vary"]
+
+
+def test_matching_etag_returns_not_modified(client):
+
+    etag = client.get("/items").headers["ETag"]
+
+    response = client.get("/items", headers={"If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 304
+
+    assert response.data == b""
+
+    assert "Accept" in response.headers["Vary"]
+
+
+def test_invalidate_tags_drops_entries(client, calls):
+
+    client.get("/items")
+
+    assert invalidate_tags("items") == 1
+
+    client.get("/items")
+
+    assert len(calls) == 2
+
+
+def test_write_with_tag_invalidation_serves_fresh_data(client, items):
+
+    before = client.get("/items")
+
+    items.append("invisível")
+
+    # Sem invalidação o cache continua servindo o estado anterior
+    assert client.get("/items").get_json() == before.get_json()
+
+    items.pop()
+
+    client.post("/items", json={"item": "b"})
+
+    after = client.get("/items")
+
+    assert after.headers["X-Cache"] == "MISS"
+
+    assert after.get_json()["items"] == ["a", "b"]
+
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_expired_entry_is_a_miss():
+
+    cache = LRUCache()
+
+    cache.set("k", entry(ttl=-1))
+
+    assert cache.get("k") is None
+
+
+def test_lru_evicts_least_recently_used_entry():
+
+    cache = LRUCache(max_entries=2)
+
+    cache.set("a", entry())
+
+    cache.set("b", entry())
+
+    cache.get("a")
+
+    cache.set("c", entry())
+
+    assert cache.get("a") is not None
+
+    assert cache.get("b") is None
+
+
+def test_lru_respects_byte_limit():
+
+    cache = LRUCache(max_bytes=10)
+
+    cache.set("a", entry(6))
+
+    cache.set("b", entry(6))
+
+    assert cache.get("a") is None
+
+    assert cache.get("b") is not None
+
+
+def test_set_cache_backend_replaces_default():
+
+    backend = LRUCache()
+
+    set_cache_backend(backend)
+
+    assert get_cache_backend() is backend
@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+from flask import Flask, Response
+
+from components import compression
+from components.compression import PrecompressedCache, init_compression, negotiate
+
+BODY = b'{"data": "' + b"x" * 4096 + b'"}'
+
+
+@pytest.fixture
+def levels(monkeypatch):
+
+    calls = []
+
+    original = compression.compress
+
+    def spy(data, encoding, level=None):
+
+        calls.append((encoding, level))
+
+        return original(data, encoding, level)
+
+    monkeypatch.setattr(compression, "compress", spy)
+
+    monkeypatch.setattr(compression, "precompressed", PrecompressedCache())
+
+    return calls
+
+
+@pytest.fixture
+def client():
+
+    app = Flask(__name__)
+
+    def etagged(etag: str) -> Response:
+
+        response = Response(BODY, mimetype="application/json")
+
+        response.headers["ETag"] = etag
+
+        return response
+
+    app.add_url_rule("/swagger.json", "specs", lambda: etagged('"spec"'))
+
+    app.add_url_rule("/items", "items", lambda: etagged('"items"'))
+
+    init_compression(app)
+
+    return app.test_client()
+
+
+def test_static_content_uses_max_level(client, levels):
+
+    response = client.get("/swagger.json", headers={"Accept-Encoding": "gzip"})
+
+    assert gzip.decompress(response.data) == BODY
+
+    assert levels == [("gzip", PrecompressedCache.MAX_LEVELS["gzip"])]
+
+
+def test_dynamic_content_uses_configured_level(client, levels):
+
+    response = client.get("/items", headers={"Accept-Encoding": "gzip"})
+
+    assert gzip.decompress(response.data) == BODY
+
+    assert response.headers["ETag"] == 'W/"items"'
+
+    assert levels == [("gzip", None)]
+
+
+def test_variant_is_compressed_once_per_etag(client, levels):
+
+    for _ in range(3):
+
+        client.get("/items", headers={"Accept-Encoding": "gzip"})
+
+    assert len(levels) == 1
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip;q=0, identity", None),
+        ("", None),
+        ("*", compression.ENCODINGS[0]),
+    ],
+)
+def test_negotiate(header, expected):
+
+    assert negotiate(header) == expected
@@ -0,0 +1,319 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, request
+from flask_jwt_extended import JWTManager, create_access_token
+from flask_restx import Api, Resource
+
+from components import idempotency
+from components.idempotency import (
+    MemoryIdempotencyBackend,
+    StoredResponse,
+    idempotent,
+    set_idempotency_backend,
+)
+
+
+@pytest.fixture
+def calls():
+
+    set_idempotency_backend(MemoryIdempotencyBackend())
+
+    return []
+
+
+@pytest.fixture
+def client(calls):
+
+    app = Flask(__name__)
+
+    app.config["JWT_SECRET_KEY"] = "segredo-de-teste-com-tamanho-suficiente"
+
+    JWTManager(app)
+
+    api = Api(app)
+
+    started = threading.Event()
+
+    release = threading.Event()
+
+    release.set()
+
+    @api.route("/orders")
+    class Orders(Resource):
+
+        @idempotent()
+        def post(self):
+
+            calls.append(request.get_json())
+
+            started.set()
+
+            release.wait(5)
+
+            return {"id": len(calls)}, 201
+
+    @api.route("/slow-orders")
+    class SlowOrders(Resource):
+
+        @idempotent(wait=0.2)
+        def post(self):
+
+            calls.append(request.get_json())
+
+            return {"id": len(calls)}, 201
+
+    client = app.test_client()
+
+    client.app = app
+
+    client.started = started
+
+    client.release = release
+
+    return client
+
+
+def post(client, key: str, body: dict, **kwargs):
+
+    return client.post("/orders", json=body, headers={"Idempotency-Key": key}, **kwargs)
+
+
+def test_repeated_key_replays_stored_response(client, calls):
+
+    first = post(client, "k1", {"item": 1})
+
+    second = post(client, "k1", {"item": 1})
+
+    assert first.status_code == second.status_code == 201
+
+    assert first.get_json() == second.get_json() == {"id": 1}
+
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+    assert len(calls) == 1
+
+
+def test_same_key_with_other_body_is_rejected(client, calls):
+
+    post(client, "k1", {"item": 1})
+
+    response = post(client, "k1", {"item": 2})
+
+    assert response.status_code == 422
+
+    assert len(calls) == 1
+
+
+def test_requests_without_key_always_execute(client, calls):
+
+    client.post("/orders", json={"item": 1})
+
+    client.post("/orders", json={"item": 1})
+
+    assert len(calls) == 2
+
+
+def test_concurrent_repetition_waits_for_leader(client, calls):
+
+    client.release.clear()
+
+    responses = []
+
+    leader = threading.Thread(
+        target=lambda: responses.append(post(client, "k1", {"item": 1}))
+    )
+
+    leader.start()
+
+    assert client.started.wait(5)
+
+    follower = threading.Thread(
+        target=lambda: responses.append(post(client, "k1", {"item": 1}))
+    )
+
+    follower.start()
+
+    # Dá tempo para a repetição encontrar a execução em andamento antes de liberá-la
+    time.sleep(0.1)
+
+    client.release.set()
+
+    leader.join(5)
+
+    follower.join(5)
+
+    assert [response.status_code for response in responses] == [201, 201]
+
+    assert len(calls) == 1
+
+
+def test_anonymous_clients_are_scoped_by_ip(client, calls):
+
+    first = post(client, "k1", {"item": 1}, environ_base={"REMOTE_ADDR": "10.0.0.1"})
+
+    second = post(client, "k1", {"item": 1}, environ_base={"REMOTE_ADDR": "10.0.0.2"})
+
+    assert "Idempotent-Replayed" not in first.headers
+
+    assert "Idempotent-Replayed" not in second.headers
+
+    assert len(calls) == 2
+
+
+def test_authorization_scopes_key(client, calls):
+
+    for token in ("a", "b", "a"):
+
+        client.post(
+            "/orders",
+            json={"item": 1},
+            headers={"Idempotency-Key": "k1", "Authorization": f"Bearer {token}"},
+        )
+
+    assert len(calls) == 2
+
+
+def test_jwt_identity_scopes_key_across_token_refresh(client, calls):
+
+    with client.app.app_context():
+
+        first, refreshed, other = (
+            create_access_token(identity=identity) for identity in ("ana", "ana", "bia")
+        )
+
+    responses = [
+        client.post(
+            "/orders",
+            json={"item": 1},
+            headers={"Idempotency-Key": "k1", "Authorization": f"Bearer {token}"},
+        )
+        for token in (first, refreshed, other)
+    ]
+
+    assert responses[1].headers["Idempotent-Replayed"] == "true"
+
+    assert "Idempotent-Replayed" not in responses[2].headers
+
+    assert len(calls) == 2
+
+
+class OtherProcessBackend(MemoryIdempotencyBackend):
+    """Backend em que outro processo detém a reserva de toda chave."""
+
+    def __init__(self):
+
+        super().__init__()
+
+        self.response = None
+
+    def get(self, key):
+
+        return self.response
+
+    def claim(self, key, ttl):
+
+        return False
+
+
+def test_claim_held_by_other_process_waits_for_its_response(client, calls):
+
+    backend = OtherProcessBackend()
+
+    set_idempotency_backend(backend)
+
+    body = {"item": 1}
+
+    with client.app.test_request_context("/orders", method="POST", json=body):
+
+        fingerprint = idempotency._fingerprint()
+
+    stored = StoredResponse(
+        b'{"id": 99}', 201, [("Content-Type", "application/json")], fingerprint, time.time() + 60
+    )
+
+    timer = threading.Timer(0.1, lambda: setattr(backend, "response", stored))
+
+    timer.start()
+
+    responses = []
+
+    threads = [
+        threading.Thread(target=lambda: responses.append(post(client, "k1", body)))
+        for _ in range(2)
+    ]
+
+    for thread in threads:
+
+        thread.start()
+
+    for thread in threads:
+
+        thread.join(5)
+
+    timer.join()
+
+    assert [response.status_code for response in responses] == [201, 201]
+
+    assert all(response.get_json() == {"id": 99} for response in responses)
+
+    assert calls == []
+
+
+def test_claim_never_released_returns_409_after_wait(client, calls):
+
+    set_idempotency_backend(OtherProcessBackend())
+
+    started = time.monotonic()
+
+    response = client.post("/slow-orders", json={"item": 1}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 409
+
+    assert response.headers["Retry-After"] == "1"
+
+    assert time.monotonic() - started >= 0.2
+
+    assert calls == []
+
+
+def test_stored_response_uses_wall_clock_expiry(client, calls, monkeypatch):
+
+    post(client, "k1", {"item": 1})
+
+    (stored,) = idempotency._backend._entries.values()
+
+    assert stored.expires_at > time.time()
+
+    monkeypatch.setattr(time, "time", lambda: stored.expires_at + 1)
+
+    post(client, "k1", {"item": 1})
+
+    assert len(calls) == 2
+
+
+def test_memory_backend_evicts_least_recently_used():
+
+    backend = MemoryIdempotencyBackend(max_entries=2)
+
+    for key in ("a", "b", "c"):
+
+        backend.set(key, StoredResponse(b"", 200, [], "", time.time() + 60))
+
+    assert backend.get("a") is None
+
+    assert backend.get("c") is not None
+
+
+def test_memory_backend_claim_is_exclusive():
+
+    backend = MemoryIdempotencyBackend()
+
+    assert backend.claim("k", 60)
+
+    assert not backend.claim("k", 60)
+
+    backend.release("k")
+
+    assert backend.claim("k", 60)
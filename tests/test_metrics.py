@@ -0,0 +1,163 @@
+import json
+import os
+
+import pytest
+
+from components import metrics
+from components.metrics import DEAD_WORKERS_FILE, aggregate, retire_worker
+
+# Pids fictícios de workers encerrados
+DEAD_PID = 999_990
+
+OTHER_PID = 999_991
+
+REQUESTS = ("http_requests_total", (("endpoint", "x"), ("method", "GET"), ("status", "200")))
+
+
+@pytest.fixture
+def multiproc_dir(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(metrics, "METRICS_MULTIPROC_DIR", str(tmp_path))
+
+    metrics.registry.reset()
+
+    yield tmp_path
+
+    metrics.registry.reset()
+
+
+def write_worker(directory, pid: int, snapshot_id: str, requests: float, latency: float = 0.1):
+
+    snapshot = {
+        "pid": pid,
+        "id": snapshot_id,
+        "counters": [[REQUESTS[0], [list(label) for label in REQUESTS[1]], requests]],
+        "gauges": [["http_requests_in_flight", [], 3.0]],
+        "histograms": [
+            ["http_request_duration_seconds", [], [1] + [0] * 11, latency, 1],
+        ],
+    }
+
+    (directory / f"metrics_{pid}.json").write_text(json.dumps(snapshot))
+
+
+def total_requests() -> float:
+
+    return aggregate()["counters"].get(REQUESTS, 0.0)
+
+
+def test_retire_worker_keeps_counters_and_removes_file(multiproc_dir):
+
+    write_worker(multiproc_dir, DEAD_PID, "a", 5)
+
+    before = total_requests()
+
+    retire_worker(DEAD_PID)
+
+    assert not (multiproc_dir / f"metrics_{DEAD_PID}.json").exists()
+
+    assert total_requests() == before == 5
+
+    histogram = aggregate()["histograms"][("http_request_duration_seconds", ())]
+
+    assert histogram[2] == 1
+
+
+def test_retired_gauges_are_dropped(multiproc_dir):
+
+    write_worker(multiproc_dir, DEAD_PID, "a", 5)
+
+    retire_worker(DEAD_PID)
+
+    assert ("http_requests_in_flight", ()) not in aggregate()["gauges"]
+
+
+def test_directory_does_not_grow_with_recycling(multiproc_dir):
+
+    for generation in range(50):
+
+        write_worker(multiproc_dir, DEAD_PID + generation % 2, f"g{generation}", 1)
+
+        retire_worker(DEAD_PID + generation % 2)
+
+    names = set(os.listdir(multiproc_dir))
+
+    assert names <= {DEAD_WORKERS_FILE, f"metrics_{os.getpid()}.json"}
+
+    assert total_requests() == 50
+
+
+def test_reused_pid_does_not_overwrite_dead_worker(multiproc_dir):
+
+    write_worker(multiproc_dir, DEAD_PID, "first", 7)
+
+    retire_worker(DEAD_PID)
+
+    # Novo worker com o mesmo pid começa do zero
+    write_worker(multiproc_dir, DEAD_PID, "second", 2)
+
+    assert total_requests() == 9
+
+
+def test_stale_snapshot_already_merged_is_not_counted_twice(multiproc_dir):
+
+    write_worker(multiproc_dir, DEAD_PID, "a", 5)
+
+    retire_worker(DEAD_PID)
+
+    # Leitura atrasada: o arquivo do worker reaparece depois de consolidado
+    write_worker(multiproc_dir, DEAD_PID, "a", 5)
+
+    assert total_requests() == 5
+
+    retire_worker(DEAD_PID)
+
+    assert total_requests() == 5
+
+
+def test_retire_accumulates_several_workers(multiproc_dir):
+
+    write_worker(multiproc_dir, DEAD_PID, "a", 5)
+
+    write_worker(multiproc_dir, OTHER_PID, "b", 3)
+
+    retire_worker(DEAD_PID)
+
+    assert total_requests() == 8
+
+    retire_worker(OTHER_PID)
+
+    assert total_requests() == 8
+
+
+def test_retire_unknown_pid_is_noop(multiproc_dir):
+
+    retire_worker(DEAD_PID)
+
+    assert not (multiproc_dir / DEAD_WORKERS_FILE).exists()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+def test_forked_worker_final_snapshot_is_retired(multiproc_dir):
+
+    pid = os.fork()
+
+    if pid == 0:
+
+        try:
+
+            metrics.registry.inc(*REQUESTS)
+
+            metrics.write_snapshot()
+
+        finally:
+
+            os._exit(0)
+
+    os.waitpid(pid, 0)
+
+    retire_worker(pid)
+
+    assert total_requests() == 1
+
+    assert not (multiproc_dir / f"metrics_{pid}.json").exists()
@@ -0,0 +1,259 @@
+import http.client
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from components import pool as pool_module
+from components.pool import DBPool, HTTPPool, PoolTimeout
+
+
+def make_db_pool(tmp_path, **kwargs) -> DBPool:
+
+    return DBPool(
+        "test",
+        sqlite3.connect,
+        dsn=str(tmp_path / "pool.db"),
+        connect_kwargs={"check_same_thread": False},
+        **kwargs,
+    )
+
+
+def test_prewarm_opens_min_size(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=2, max_size=4)
+
+    pool.prewarm()
+
+    assert pool.stats() == {"size": 2, "idle": 2, "in_use": 0, "waiting": 0, "max_size": 4}
+
+
+def test_connections_are_reused(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=0)
+
+    with pool.connection() as first:
+
+        pass
+
+    with pool.connection() as second:
+
+        pass
+
+    assert first is second
+
+    assert pool.stats()["size"] == 1
+
+
+def test_release_rolls_back_open_transaction(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=0)
+
+    with pool.connection() as conn:
+
+        conn.execute("CREATE TABLE items (id INTEGER)")
+
+        conn.commit()
+
+        conn.execute("INSERT INTO items VALUES (1)")
+
+    with pool.connection() as conn:
+
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone() == (0,)
+
+
+def test_exhausted_pool_raises_pool_timeout(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=0, max_size=1)
+
+    conn = pool.acquire()
+
+    with pytest.raises(PoolTimeout):
+
+        pool.acquire(timeout=0.05)
+
+    pool.release(conn)
+
+
+def test_waiter_receives_released_connection(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=0, max_size=1)
+
+    conn = pool.acquire()
+
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+
+    waiter.start()
+
+    time.sleep(0.05)
+
+    pool.release(conn)
+
+    waiter.join(5)
+
+    assert acquired == [conn]
+
+
+def test_evict_idle_keeps_min_size(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=1, max_size=3, idle_timeout=0)
+
+    conns = [pool.acquire() for _ in range(3)]
+
+    for conn in conns:
+
+        pool.release(conn)
+
+    time.sleep(0.01)
+
+    assert pool.evict_idle() == 2
+
+    assert pool.stats()["size"] == 1
+
+
+def test_check_runs_select_one(tmp_path):
+
+    pool = make_db_pool(tmp_path, min_size=0)
+
+    assert pool.check()["idle"] == 1
+
+
+def test_reinit_after_fork_keeps_inherited_connections(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(pool_module, "_inherited", [])
+
+    pool = make_db_pool(tmp_path, min_size=1)
+
+    pool.prewarm()
+
+    conn, _ = pool._idle[0]
+
+    pool.reinit_after_fork()
+
+    assert pool_module._inherited == [conn]
+
+    assert pool.stats()["size"] == 0
+
+    # A conexão herdada não foi fechada
+    assert conn.execute("SELECT 1").fetchone() == (1,)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    hits = []
+
+    def _respond(self):
+
+        length = int(self.headers.get("Content-Length") or 0)
+
+        self.rfile.read(length)
+
+        StubHandler.hits.append(self.command)
+
+        body = b"ok"
+
+        self.send_response(200)
+
+        self.send_header("Content-Length", str(len(body)))
+
+        self.end_headers()
+
+        self.wfile.write(body)
+
+        # Fecha a conexão sem avisar o cliente, como um keep-alive expirado
+        self.close_connection = self.server.drop_connections
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+
+        pass
+
+
+@pytest.fixture
+def server():
+
+    StubHandler.hits = []
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+
+    httpd.drop_connections = False
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+
+    thread.start()
+
+    yield httpd
+
+    httpd.shutdown()
+
+    httpd.server_close()
+
+
+def make_http_pool(server) -> HTTPPool:
+
+    host, port = server.server_address
+
+    return HTTPPool("stub", f"http://{host}:{port}", timeout=5, min_size=0, max_size=2)
+
+
+def test_http_pool_reuses_keep_alive_connection(server):
+
+    pool = make_http_pool(server)
+
+    assert pool.request("GET", "/")[0] == 200
+
+    assert pool.request("POST", "/", body=b"{}")[0] == 200
+
+    assert pool.stats()["size"] == 1
+
+    assert StubHandler.hits == ["GET", "POST"]
+
+
+def test_http_pool_retries_idempotent_request_after_disconnect(server):
+
+    server.drop_connections = True
+
+    pool = make_http_pool(server)
+
+    pool.request("GET", "/")
+
+    time.sleep(0.05)
+
+    status, _, body = pool.request("GET", "/")
+
+    assert (status, body) == (200, b"ok")
+
+    assert StubHandler.hits == ["GET", "GET"]
+
+
+def test_http_pool_does_not_retry_post_after_disconnect(server):
+
+    server.drop_connections = True
+
+    pool = make_http_pool(server)
+
+    pool.request("GET", "/")
+
+    time.sleep(0.05)
+
+    with pytest.raises((http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)):
+
+        pool.request("POST", "/", body=b"{}")
+
+    assert StubHandler.hits == ["GET"]
+
+    # Com retry=True o chamador declara a requisição segura para repetir
+    time.sleep(0.05)
+
+    pool.request("GET", "/")
+
+    time.sleep(0.05)
+
+    assert pool.request("POST", "/", body=b"{}", retry=True)[0] == 200
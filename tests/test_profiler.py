@@ -0,0 +1,80 @@
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from flask_restx import Api
+
+from components import profiler
+from routes.profiler import api as profiler_ns
+
+
+@pytest.fixture
+def app(monkeypatch):
+
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", True)
+
+    app = Flask(__name__)
+
+    app.config["JWT_SECRET_KEY"] = "test-secret-key-with-at-least-32-bytes"
+
+    JWTManager(app)
+
+    api = Api(app)
+
+    api.add_namespace(profiler_ns, path="/profiler")
+
+    return app
+
+
+def get_slow(app, token: str = None):
+
+    headers = {"Authorization": f"Bearer {token}"} if token is not None else {}
+
+    return app.test_client().get("/profiler/slow", headers=headers)
+
+
+def token(app, **claims) -> str:
+
+    with app.app_context():
+
+        return create_access_token(identity="usuario", additional_claims=claims)
+
+
+def test_disabled_profiler_hides_routes(app, monkeypatch):
+
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", False)
+
+    assert get_slow(app, token(app, admin=True)).status_code == 404
+
+
+def test_missing_token_is_unauthorized(app):
+
+    assert get_slow(app).status_code == 401
+
+
+@pytest.mark.parametrize("bad_token", ["garbage", "a.b.c"])
+def test_invalid_token_is_unauthorized(app, bad_token):
+
+    assert get_slow(app, bad_token).status_code == 401
+
+
+def test_token_signed_with_other_key_is_unauthorized(app):
+
+    other = Flask(__name__)
+
+    other.config["JWT_SECRET_KEY"] = "another-secret-key-with-at-least-32-bytes"
+
+    JWTManager(other)
+
+    assert get_slow(app, token(other, admin=True)).status_code == 401
+
+
+def test_non_admin_token_is_forbidden(app):
+
+    assert get_slow(app, token(app)).status_code == 403
+
+
+def test_admin_token_is_allowed(app):
+
+    response = get_slow(app, token(app, admin=True))
+
+    assert response.status_code == 200
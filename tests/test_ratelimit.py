@@ -0,0 +1,168 @@
+import threading
+import time
+
+from flask import Flask
+
+from components.ratelimit import MemoryRateLimitBackend, RateLimiter
+
+
+def make_client(limiter: RateLimiter, gate: threading.Event = None):
+
+    app = Flask(__name__)
+
+    started = threading.Event()
+
+    @app.get("/users/")
+    def users():
+
+        started.set()
+
+        if gate is not None:
+
+            gate.wait(5)
+
+        return {"ok": True}
+
+    @app.get("/healthy/live")
+    def live():
+
+        return {"ok": True}
+
+    limiter.init_app(app)
+
+    client = app.test_client()
+
+    client.started = started
+
+    return client
+
+
+def test_bucket_allows_burst_then_rejects():
+
+    backend = MemoryRateLimitBackend()
+
+    results = [backend.consume("k", 1, 3)[0] for _ in range(4)]
+
+    assert results == [True, True, True, False]
+
+
+def test_retry_after_reflects_refill_rate():
+
+    backend = MemoryRateLimitBackend()
+
+    backend.consume("k", 0.5, 1)
+
+    allowed, retry_after = backend.consume("k", 0.5, 1)
+
+    assert not allowed
+
+    assert 1.9 < retry_after <= 2
+
+
+def test_clients_have_independent_buckets():
+
+    backend = MemoryRateLimitBackend()
+
+    backend.consume("a", 1, 1)
+
+    assert backend.consume("b", 1, 1)[0]
+
+
+def test_backend_is_bounded_by_max_clients():
+
+    backend = MemoryRateLimitBackend(max_clients=10)
+
+    for i in range(1000):
+
+        backend.consume(f"client-{i}", 1, 1)
+
+    assert len(backend) == 10
+
+
+def test_idle_buckets_are_evicted():
+
+    backend = MemoryRateLimitBackend(idle_ttl=0.05)
+
+    backend.consume("a", 1, 1)
+
+    time.sleep(0.1)
+
+    backend.consume("b", 1, 1)
+
+    assert len(backend) == 1
+
+
+def test_exceeding_limit_returns_429_with_retry_after():
+
+    client = make_client(RateLimiter(default=(1, 2)))
+
+    statuses = [client.get("/users/").status_code for _ in range(3)]
+
+    response = client.get("/users/")
+
+    assert statuses == [200, 200, 429]
+
+    assert response.status_code == 429
+
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_limit_is_per_client_ip():
+
+    client = make_client(RateLimiter(default=(1, 1)))
+
+    first = client.get("/users/", environ_base={"REMOTE_ADDR": "10.0.0.1"})
+
+    second = client.get("/users/", environ_base={"REMOTE_ADDR": "10.0.0.2"})
+
+    assert first.status_code == second.status_code == 200
+
+
+def test_exempt_namespace_is_not_limited():
+
+    client = make_client(RateLimiter(default=(1, 1), namespaces={"healthy": None}))
+
+    statuses = {client.get("/healthy/live").status_code for _ in range(5)}
+
+    assert statuses == {200}
+
+
+def test_namespace_limit_overrides_default():
+
+    client = make_client(RateLimiter(default=None, namespaces={"users": (1, 1)}))
+
+    assert client.get("/users/").status_code == 200
+
+    assert client.get("/users/").status_code == 429
+
+    assert client.get("/healthy/live").status_code == 200
+
+
+def test_concurrency_cap_sheds_with_503():
+
+    gate = threading.Event()
+
+    client = make_client(RateLimiter(max_concurrent=1), gate)
+
+    responses = []
+
+    worker = threading.Thread(target=lambda: responses.append(client.get("/users/")))
+
+    worker.start()
+
+    assert client.started.wait(5)
+
+    shed = client.get("/users/")
+
+    gate.set()
+
+    worker.join(5)
+
+    assert shed.status_code == 503
+
+    assert shed.headers["Retry-After"] == "1"
+
+    assert responses[0].status_code == 200
+
+    # O slot é devolvido no teardown da requisição
+    assert client.get("/users/").status_code == 200
@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+
+from components.secrets import SecretStore, get_secret, secret_store
+from src.login import DEFAULT_KID, KeyRing
+
+
+@pytest.fixture
+def secrets_dir(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(secret_store, "directory", str(tmp_path))
+
+    secret_store.invalidate()
+
+    yield tmp_path
+
+    secret_store.invalidate()
+
+
+def errors(caplog) -> list:
+
+    return [record.getMessage() for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_missing_required_secret_logs_error(tmp_path, caplog):
+
+    store = SecretStore(str(tmp_path))
+
+    with caplog.at_level(logging.DEBUG):
+
+        assert store.get("database_dsn") is False
+
+    assert errors(caplog) == ["database_dsn não encontrado"]
+
+
+def test_missing_optional_secret_logs_debug(tmp_path, caplog):
+
+    store = SecretStore(str(tmp_path))
+
+    with caplog.at_level(logging.DEBUG):
+
+        assert store.get("jwt_keys", optional=True) is False
+
+    assert errors(caplog) == []
+
+    assert "jwt_keys não encontrado" in caplog.text
+
+
+def test_secret_file_is_read(tmp_path):
+
+    (tmp_path / "api_token").write_text("valor\n")
+
+    assert SecretStore(str(tmp_path)).get("api_token") == "valor"
+
+
+def test_key_ring_with_only_secret_key_logs_no_errors(secrets_dir, caplog):
+
+    (secrets_dir / "jwt_secret_key").write_text("segredo")
+
+    with caplog.at_level(logging.DEBUG):
+
+        ring = KeyRing()
+
+        assert ring.keys == {DEFAULT_KID: "segredo"}
+
+        assert ring.active_kid == DEFAULT_KID
+
+    assert errors(caplog) == []
+
+
+def test_key_ring_uses_jwt_keys_and_active_kid(secrets_dir):
+
+    (secrets_dir / "jwt_keys").write_text('{"k1": "um", "k2": "dois"}')
+
+    (secrets_dir / "jwt_active_kid").write_text("k2")
+
+    ring = KeyRing()
+
+    assert ring.signing_key() == "dois"
+
+    assert ring.verification_key("k1") == "um"
+
+
+def test_get_secret_prefers_environment(secrets_dir, monkeypatch):
+
+    (secrets_dir / "api_token").write_text("arquivo")
+
+    monkeypatch.setenv("api_token", "ambiente")
+
+    assert get_secret("api_token") == "ambiente"
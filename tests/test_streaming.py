@@ -0,0 +1,145 @@
+import tracemalloc
+
+import pytest
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+
+from components.streaming import (
+    decode_cursor,
+    encode_cursor,
+    keyset_where,
+    page_args,
+    paginate,
+    stream_json,
+    stream_ndjson,
+)
+
+ROWS = 1_000_000
+
+# O corpo de 1 milhão de linhas tem ~70 MB; o streaming deve ficar limitado a poucos chunks
+PEAK_LIMIT = 8 * 1024 * 1024
+
+
+def rows(count: int):
+
+    for i in range(count):
+
+        yield {"id": i, "name": f"usuario-{i}", "active": i % 2 == 0, "score": i * 0.5}
+
+
+def peak_while_consuming(response) -> tuple:
+
+    tracemalloc.start()
+
+    try:
+
+        size = sum(len(chunk) for chunk in response.response)
+
+        _, peak = tracemalloc.get_traced_memory()
+
+    finally:
+
+        tracemalloc.stop()
+
+    return size, peak
+
+
+@pytest.mark.parametrize("stream", [stream_json, stream_ndjson])
+def test_stream_peak_memory_is_bounded(stream):
+
+    size, peak = peak_while_consuming(stream(rows(ROWS)))
+
+    assert size > 50 * 1024 * 1024
+
+    assert peak < PEAK_LIMIT
+
+
+def test_stream_json_is_valid_array():
+
+    body = b"".join(stream_json(rows(2500), chunk_size=1000).response)
+
+    assert body.startswith(b'[{"id":0,') and body.endswith(b"}]")
+
+    assert body.count(b'"id"') == 2500
+
+
+def test_stream_ndjson_emits_one_document_per_line():
+
+    lines = b"".join(stream_ndjson(rows(10), chunk_size=3).response).split(b"\n")
+
+    assert lines[-1] == b""
+
+    assert len(lines) == 11
+
+
+def test_cursor_roundtrip():
+
+    assert decode_cursor(encode_cursor(["2024-01-01", 42])) == ("2024-01-01", 42)
+
+
+@pytest.mark.parametrize("values", [[{}], [[1]], [1, {"a": 1}]])
+def test_decode_cursor_rejects_non_scalar_values(values):
+
+    with pytest.raises(ValueError):
+
+        decode_cursor(encode_cursor(values))
+
+
+@pytest.mark.parametrize("cursor", ["%%%", encode_cursor([{}]), "eyJhIjoxfQ"])
+def test_page_args_rejects_invalid_cursor(cursor):
+
+    app = Flask(__name__)
+
+    with app.test_request_context(f"/?cursor={cursor}"):
+
+        with pytest.raises(HTTPException) as error:
+
+            page_args()
+
+    assert error.value.code == 400
+
+
+def test_page_args_clamps_limit():
+
+    app = Flask(__name__)
+
+    with app.test_request_context("/?limit=100000"):
+
+        assert page_args(max_limit=1000) == (1000, None)
+
+
+def test_keyset_where():
+
+    assert keyset_where(("created_at", "id"), None) == ("1=1", [])
+
+    assert keyset_where(("created_at", "id"), ("x", 1), descending=True) == (
+        "(created_at, id) < (?, ?)",
+        ["x", 1],
+    )
+
+
+def test_paginate_walks_all_pages():
+
+    data = list(range(25))
+
+    def fetch(after, n):
+
+        start = after[0] + 1 if after else 0
+
+        return data[start : start + n]
+
+    seen, after = [], None
+
+    while True:
+
+        page = paginate(fetch, lambda item: (item,), 10, after)
+
+        seen.extend(page["items"])
+
+        if not page["next_cursor"]:
+
+            break
+
+        after = decode_cursor(page["next_cursor"])
+
+    assert seen == data
@@ -0,0 +1,236 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+from flask_restx import Api, Resource
+
+from components.tasks import (
+    MemoryResultStore,
+    QueueFull,
+    TaskExecutor,
+    background_task,
+    executor,
+)
+from routes.tasks import api as tasks_ns
+
+
+def square(value: int) -> int:
+
+    return value * value
+
+
+def wait_for(function, timeout: float = 5.0):
+
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+
+        result = function()
+
+        if result:
+
+            return result
+
+        time.sleep(0.01)
+
+    raise AssertionError("condição não atingida")
+
+
+@pytest.fixture
+def gate():
+
+    gate = threading.Event()
+
+    yield gate
+
+    gate.set()
+
+
+@pytest.fixture
+def small_executor():
+
+    # Mesmo store do executor global, consultado pelas rotas de /tasks
+    small = TaskExecutor(backend="thread", workers=1, queue_size=0, store=executor.store)
+
+    yield small
+
+    small.shutdown(wait=False)
+
+
+@pytest.fixture
+def client(gate, small_executor):
+
+    app = Flask(__name__)
+
+    api = Api(app)
+
+    api.add_namespace(tasks_ns, path="/tasks")
+
+    @background_task("quadrado")
+    def quadrado(value):
+
+        return value * value
+
+    @background_task("bloqueada", task_executor=small_executor)
+    def bloqueada():
+
+        gate.wait(5)
+
+    @api.route("/jobs/square/<int:value>")
+    class Square(Resource):
+
+        def post(self, value):
+
+            return quadrado.enqueue(value)
+
+    @api.route("/jobs/blocking")
+    class Blocking(Resource):
+
+        def post(self):
+
+            return bloqueada.enqueue()
+
+    return app.test_client()
+
+
+def test_enqueue_returns_202_with_location_to_result(client):
+
+    response = client.post("/jobs/square/7")
+
+    assert response.status_code == 202
+
+    location = response.headers["Location"]
+
+    assert location == response.get_json()["status_url"]
+
+    status = wait_for(
+        lambda: (r := client.get(location)).get_json()["status"] == "succeeded" and r
+    )
+
+    assert status.status_code == 200
+
+    result = client.get(f"{location}/result")
+
+    assert result.status_code == 200
+
+    assert result.get_json() == {"status": "succeeded", "result": 49}
+
+
+def test_full_queue_returns_503_with_retry_after(client, gate):
+
+    first = client.post("/jobs/blocking")
+
+    second = client.post("/jobs/blocking")
+
+    assert first.status_code == 202
+
+    assert second.status_code == 503
+
+    assert second.headers["Retry-After"] == "1"
+
+    # O slot é devolvido quando a tarefa termina
+    gate.set()
+
+    wait_for(lambda: client.post("/jobs/blocking").status_code == 202)
+
+
+def test_pending_result_returns_202(client, gate):
+
+    location = client.post("/jobs/blocking").headers["Location"]
+
+    assert client.get(f"{location}/result").status_code == 202
+
+
+def test_unknown_task_returns_404(client):
+
+    assert client.get("/tasks/inexistente").status_code == 404
+
+
+def test_executor_raises_queue_full(small_executor, gate):
+
+    small_executor.submit(gate.wait, 5)
+
+    with pytest.raises(QueueFull):
+
+        small_executor.submit(gate.wait, 5)
+
+
+def test_failed_task_records_error():
+
+    failing = TaskExecutor(backend="thread", workers=1, queue_size=1)
+
+    task_id = failing.submit(square, "x")
+
+    state = wait_for(lambda: (s := failing.status(task_id))["status"] == "failed" and s)
+
+    assert state["error"].startswith("TypeError")
+
+    failing.shutdown()
+
+
+def test_result_store_entries_expire():
+
+    store = MemoryResultStore()
+
+    store.set("a", {"status": "succeeded"}, 0.05)
+
+    assert store.get("a") == {"status": "succeeded"}
+
+    time.sleep(0.1)
+
+    assert store.get("a") is None
+
+
+def test_result_store_is_bounded():
+
+    store = MemoryResultStore(max_entries=2)
+
+    for task_id in ("a", "b", "c"):
+
+        store.set(task_id, {}, 60)
+
+    assert store.get("a") is None
+
+    assert store.get("c") == {}
+
+
+def test_status_expires_after_result_ttl():
+
+    short = TaskExecutor(backend="thread", workers=1, queue_size=1, result_ttl=0.05)
+
+    task_id = short.submit(square, 3)
+
+    short.shutdown()
+
+    time.sleep(0.1)
+
+    assert short.status(task_id) is None
+
+
+def test_process_backend_rejects_non_picklable_callable():
+
+    processes = TaskExecutor(backend="process", workers=1, queue_size=0)
+
+    with pytest.raises(TypeError):
+
+        processes.submit(lambda: 1)
+
+    def nested():
+
+        return 1
+
+    with pytest.raises(TypeError):
+
+        processes.submit(nested)
+
+    # A recusa não consome a vaga da fila nem cria o pool de processos
+    assert processes._executor is None
+
+    task_id = processes.submit(square, 4)
+
+    state = wait_for(lambda: (s := processes.status(task_id))["status"] == "succeeded" and s)
+
+    assert state["result"] == 16
+
+    processes.shutdown()
@@ -0,0 +1,134 @@
+import http.client
+import io
+import logging
+import threading
+
+import pytest
+from flask import Flask
+from werkzeug.serving import make_server
+
+from components.logger import console_formatter
+from components.tracing import REQUEST_ID_HEADER, LogContextFilter, init_tracing
+
+
+@pytest.fixture
+def captured():
+
+    stream = io.StringIO()
+
+    handler = logging.StreamHandler(stream)
+
+    handler.setFormatter(console_formatter(stream))
+
+    loggers = [logging.getLogger("test_tracing"), logging.getLogger("werkzeug")]
+
+    levels = [item.level for item in loggers]
+
+    for item in loggers:
+
+        item.addHandler(handler)
+
+        item.setLevel(logging.INFO)
+
+    yield stream, loggers
+
+    for item, level in zip(loggers, levels):
+
+        item.removeHandler(handler)
+
+        item.setLevel(level)
+
+        for existing in [f for f in item.filters if isinstance(f, LogContextFilter)]:
+
+            item.removeFilter(existing)
+
+
+def make_app(loggers) -> Flask:
+
+    app = Flask(__name__)
+
+    @app.get("/ping")
+    def ping():
+
+        loggers[0].info("dentro da requisição")
+
+        return {"ok": True}
+
+    init_tracing(app, *loggers)
+
+    return app
+
+
+def test_text_format_shows_request_id(captured):
+
+    stream, loggers = captured
+
+    response = make_app(loggers).test_client().get("/ping", headers={REQUEST_ID_HEADER: "req-1"})
+
+    assert response.headers[REQUEST_ID_HEADER] == "req-1"
+
+    assert "[req-1] - dentro da requisição" in stream.getvalue()
+
+
+def test_text_format_outside_request_uses_dash(captured):
+
+    stream, loggers = captured
+
+    make_app(loggers)
+
+    loggers[0].info("fora")
+
+    assert "[-] - fora" in stream.getvalue()
+
+
+def test_logger_without_filter_does_not_break_format():
+
+    stream = io.StringIO()
+
+    record = logging.LogRecord("x", logging.INFO, "", 0, "sem filtro", (), None)
+
+    assert "[-] - sem filtro" in console_formatter(stream).format(record)
+
+
+def test_repeated_init_does_not_duplicate_filter(captured):
+
+    _, loggers = captured
+
+    for _ in range(3):
+
+        make_app(loggers)
+
+    for item in loggers:
+
+        assert sum(isinstance(f, LogContextFilter) for f in item.filters) == 1
+
+
+def test_werkzeug_access_line_has_request_id(captured):
+
+    stream, loggers = captured
+
+    server = make_server("127.0.0.1", 0, make_app(loggers), threaded=True)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+
+    thread.start()
+
+    try:
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+
+        conn.request("GET", "/ping", headers={REQUEST_ID_HEADER: "req-access"})
+
+        conn.getresponse().read()
+
+        conn.close()
+
+    finally:
+
+        server.shutdown()
+
+        server.server_close()
+
+    access = [line for line in stream.getvalue().splitlines() if "GET /ping" in line]
+
+    assert access and "[req-access]" in access[0]
@@ -0,0 +1,147 @@
+import pytest
+from flask import Blueprint, Flask
+from flask_restx import Api, Namespace, Resource, fields
+from jsonschema import FormatChecker
+
+from components import validation
+from components.validation import compile_model, init_validation
+
+
+@pytest.fixture
+def client(monkeypatch):
+
+    monkeypatch.setattr(validation, "MAX_CONTENT_LENGTH", 256)
+
+    monkeypatch.setattr(validation, "VALIDATE_RESPONSES", True)
+
+    app = Flask(__name__)
+
+    blueprint = Blueprint("api", __name__)
+
+    api = Api(blueprint)
+
+    orders = Namespace("orders")
+
+    item_model = orders.model(
+        "ValidationItem",
+        {
+            "sku": fields.String(required=True),
+            "quantity": fields.Integer(required=True, min=1),
+        },
+    )
+
+    order_model = orders.model(
+        "ValidationOrder",
+        {
+            "id": fields.Integer(required=True),
+            "items": fields.List(fields.Nested(item_model), required=True),
+        },
+    )
+
+    @orders.route("/")
+    class Orders(Resource):
+
+        @orders.expect(order_model, validate=True)
+        def post(self):
+
+            return {"ok": True}, 201
+
+    @orders.route("/<int:order_id>")
+    class Order(Resource):
+
+        @validation.validate_response(order_model)
+        def get(self, order_id):
+
+            if order_id == 1:
+
+                return {"id": 1, "items": []}
+
+            return {"id": "não é inteiro"}
+
+    api.add_namespace(orders)
+
+    init_validation(app, api)
+
+    app.register_blueprint(blueprint)
+
+    return app.test_client()
+
+
+def test_valid_payload_is_accepted(client):
+
+    response = client.post("/orders/", json={"id": 1, "items": [{"sku": "a", "quantity": 1}]})
+
+    assert response.status_code == 201
+
+
+def test_invalid_payload_returns_400_with_paths(client):
+
+    response = client.post("/orders/", json={"id": 1, "items": [{"sku": "a", "quantity": 0}]})
+
+    assert response.status_code == 400
+
+    assert "items.0.quantity" in response.get_json()["errors"]
+
+
+def test_missing_required_field_is_reported(client):
+
+    response = client.post("/orders/", json={"items": []})
+
+    assert response.status_code == 400
+
+    assert "id" in response.get_json()["errors"]
+
+
+def test_oversized_body_is_rejected_before_parsing(client):
+
+    response = client.post(
+        "/orders/",
+        data=b"{" + b" " * 1024 + b"}",
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 413
+
+    assert response.headers["Connection"] == "close"
+
+
+def test_validate_response_accepts_valid_result(client):
+
+    assert client.get("/orders/1").status_code == 200
+
+
+def test_validate_response_turns_invalid_result_into_500(client):
+
+    response = client.get("/orders/2")
+
+    assert response.status_code == 500
+
+    assert "id" in response.get_json()["errors"]
+
+
+def test_compiled_schema_depends_on_format_checker():
+
+    model = Namespace("events").model("ValidationEvent", {"at": fields.DateTime(required=True)})
+
+    plain = compile_model(model)
+
+    checked = compile_model(model, FormatChecker())
+
+    assert plain is not checked
+
+    assert plain is compile_model(model)
+
+    assert plain.errors({"at": "ontem"}) is None
+
+    assert checked.errors({"at": "ontem"}) is not None
+
+
+def test_new_model_with_same_name_is_recompiled():
+
+    first = Namespace("a").model("ValidationSameName", {"a": fields.String(required=True)})
+
+    second = Namespace("b").model("ValidationSameName", {"b": fields.String(required=True)})
+
+    assert compile_model(first).errors({"b": "x"}) is not None
+
+    assert compile_model(second).errors({"b": "x"}) is None